@@ -2,6 +2,12 @@ from flask_restx import Namespace, Resource, fields
 from app.services import facade
 import uuid
 from werkzeug.exceptions import NotFound
+from app.api.v1.etag import (
+    etag_header, if_match_version, precondition_failed)
+from app.persistence.repository import VersionConflict
+from app.api.v1.pagination import PAGE_PARAMS, page_request, paginate
+from app.api.v1.streaming import STREAM_PARAMS, stream_requested, stream_json
+from app.api.v1.text_search import AUTOCOMPLETE_PARAMS, autocomplete_args
 
 api = Namespace('amenities', description='Amenity operations')
 
@@ -23,25 +29,49 @@ class AmenityList(Resource):
             if not amenity_data.get("name") or not amenity_data["name"].strip():
                 return {'error': 'Name must be a non-empty string.'}, 400
 
-            existing_amenity = next((a for a in facade.get_all_amenities()
-                                    if a.name.lower() == amenity_data['name'].lower()), None)
-            if existing_amenity:
-                return {'error': 'Amenity already exists.'}, 400
-
             new_amenity = facade.create_amenity(amenity_data)
 
-            return {'id': new_amenity.id, 'name': new_amenity.name}, 201
+            return ({'id': new_amenity.id, 'name': new_amenity.name}, 201,
+                    etag_header(new_amenity))
 
         except ValueError as e:
             return {'error': str(e)}, 400
 
+    @api.doc(params={**PAGE_PARAMS, **STREAM_PARAMS})
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
     def get(self):
         """Retrieve a list of all amenities"""
+        try:
+            page = page_request()
+            stream = stream_requested()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        if stream:
+            return stream_json(facade.get_amenities_page,
+                               lambda a: {'id': a.id, 'name': a.name})
+        if page:
+            return paginate(facade.get_amenities_page,
+                            lambda a: {'id': a.id, 'name': a.name}, *page)
         amenities = facade.get_all_amenities()
         return [{'id': a.id, 'name': a.name} for a in amenities], 200
 
 
+@api.route('/autocomplete')
+class AmenityAutocomplete(Resource):
+    @api.doc(params=AUTOCOMPLETE_PARAMS)
+    @api.response(200, 'Amenities with a word starting with the prefix')
+    @api.response(400, 'Invalid prefix or limit')
+    def get(self):
+        """Suggest amenities from the start of a word of their name"""
+        try:
+            prefix, limit = autocomplete_args()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return [{'id': a.id, 'name': a.name} for a in
+                facade.autocomplete_amenities(prefix, limit)], 200
+
+
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
     @api.response(200, 'Amenity details retrieved successfully')
@@ -58,12 +88,14 @@ class AmenityResource(Resource):
         if not amenity:
             return {'error': 'Amenity not found'}, 404
 
-        return {'id': amenity.id, 'name': amenity.name}, 200
+        return ({'id': amenity.id, 'name': amenity.name}, 200,
+                etag_header(amenity))
 
     @api.expect(amenity_model)
     @api.response(200, 'Amenity updated successfully')
     @api.response(404, 'Amenity not found')
     @api.response(400, 'Invalid input data')
+    @api.response(412, 'Amenity modified since it was read')
     def put(self, amenity_id):
         """Update an amenity's information"""
         amenity_data = api.payload
@@ -72,9 +104,14 @@ class AmenityResource(Resource):
 
         try:
             uuid.UUID(amenity_id)  # Vérifie que l'ID est bien au format UUID
-            updated_amenity = facade.update_amenity(amenity_id, amenity_data)
+            updated_amenity = facade.update_amenity(amenity_id, amenity_data,
+                                                    if_match_version())
+
+            return ({'message': 'Amenity updated successfully', 'id': updated_amenity.id, 'name': updated_amenity.name}, 200,
+                    etag_header(updated_amenity))
 
-            return {'message': 'Amenity updated successfully', 'id': updated_amenity.id, 'name': updated_amenity.name}, 200
+        except VersionConflict as e:
+            return precondition_failed(e)
 
         except NotFound as e:
             return {"error": "Amenity not found"}, 404  # Correction ici
@@ -0,0 +1,42 @@
+"""
+ETag / If-Match support for the single-entity endpoints.
+
+The entity tag of an entity is its version number. A PUT carrying an
+If-Match header is only applied if the entity is still at that version;
+the check is made by the repository at write time, so no lock is held
+across the request.
+"""
+
+from flask import request
+from app.persistence.repository import VersionConflict
+
+
+def etag_header(obj):
+    """Response headers advertising the current version of an entity."""
+    return {'ETag': f'"{obj.version}"'}
+
+
+def if_match_version():
+    """
+    Version required by the If-Match header, or None when the header is
+    absent or '*'. Raises VersionConflict when it can match no version.
+    """
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return None
+    tags = if_match.as_set()
+    # Only a single strong tag holding a version number can match
+    if len(tags) != 1:
+        raise VersionConflict(None)
+    tag = tags.pop()
+    if not tag.isdigit():
+        raise VersionConflict(None)
+    return int(tag)
+
+
+def precondition_failed(error):
+    """412 response for a VersionConflict, with the current ETag if known."""
+    headers = {}
+    if error.current_version is not None:
+        headers['ETag'] = f'"{error.current_version}"'
+    return {'error': str(error)}, 412, headers
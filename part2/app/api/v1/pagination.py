@@ -0,0 +1,100 @@
+"""
+Keyset pagination for the list endpoints.
+
+`?limit=N` returns the first N entities in creation order. When more
+remain, the `X-Next-Cursor` response header holds an opaque cursor to
+send back as `?cursor=...` for the next page. Pages are read from the
+repository's (created_at, id) index: each costs O(limit), and entities
+created meanwhile never shift or duplicate the following pages.
+Without `limit` or `cursor` the whole collection is returned.
+
+Cursors encode the ordering key of the last entity of a page, so the
+same mechanism pages through other orders, such as places by price.
+With time-ordered (UUIDv7) ids, the id of an entity is also a cursor
+for the entities created after it.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from flask import request
+
+from app.models.ids import id_time
+from app.persistence.repository import order_key
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+PAGE_PARAMS = {
+    'limit': f'Page size, 1 to {MAX_PAGE_SIZE} (default {DEFAULT_PAGE_SIZE})',
+    'cursor': 'X-Next-Cursor header of the previous page',
+}
+
+
+# Value types of the ordering keys a cursor can encode
+CREATED_KEY = (datetime, str)
+PRICE_KEY = (float, str)
+RATING_KEY = (float, str)
+
+
+def encode_cursor(key):
+    """Opaque cursor pointing just after the ordering key `key`."""
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in key]
+    raw = json.dumps(values).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, types=CREATED_KEY):
+    """Ordering key encoded by encode_cursor(), checked against `types`."""
+    if types == CREATED_KEY:
+        created_at = id_time(cursor)
+        if created_at is not None:
+            return created_at, cursor
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise TypeError
+        key = []
+        for value, kind in zip(values, types):
+            if kind is datetime:
+                value = datetime.fromisoformat(value)
+            elif kind is float and isinstance(value, int) \
+                    and not isinstance(value, bool):
+                value = float(value)
+            elif not isinstance(value, kind):
+                raise TypeError
+            key.append(value)
+        return tuple(key)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor.")
+
+
+def page_request(key_types=CREATED_KEY):
+    """(limit, after) from the query string, or None when not paginating."""
+    args = request.args
+    if 'limit' not in args and 'cursor' not in args:
+        return None
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer.")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+    cursor = args.get('cursor')
+    return limit, decode_cursor(cursor, key_types) if cursor else None
+
+
+def paginate(fetch, serialize, limit, after, key=order_key):
+    """
+    One page as a (body, status, headers) response. `fetch(limit, after)`
+    is a facade page method ordered by `key`; one extra entity is read to
+    know whether a next page exists.
+    """
+    objects = fetch(limit + 1, after)
+    headers = {}
+    if len(objects) > limit:
+        objects = objects[:limit]
+        headers['X-Next-Cursor'] = encode_cursor(key(objects[-1]))
+    return [serialize(obj) for obj in objects], 200, headers
@@ -1,6 +1,18 @@
 #!/usr/bin/python3
+import math
+from flask import request
 from flask_restx import Namespace, Resource, fields
+from werkzeug.exceptions import NotFound
 from app.services import facade
+from app.services.ranking import DEFAULT_WEIGHTS
+from app.api.v1.etag import (
+    etag_header, if_match_version, precondition_failed)
+from app.persistence.repository import VersionConflict
+from app.api.v1.pagination import (
+    CREATED_KEY, PAGE_PARAMS, PRICE_KEY, RATING_KEY, page_request, paginate)
+from app.api.v1.streaming import STREAM_PARAMS, stream_requested, stream_json
+from app.api.v1.text_search import (
+    SCORE_KEY, SEARCH_PARAMS, search_results, text_query)
 
 api = Namespace('places', description='Place operations')
 
@@ -42,6 +54,109 @@ place_model = api.model('Place', {
                            default=[], description='List of reviews')
 })
 
+# Define the model used to attach or detach amenities in bulk
+place_amenities_model = api.model('PlaceAmenityIds', {
+    'amenity_ids': fields.List(fields.String, required=True,
+                               description='IDs of the amenities')
+})
+
+
+PRICE_PARAMS = {
+    'min_price': 'Lowest price per night (inclusive)',
+    'max_price': 'Highest price per night (inclusive)',
+    'sort': 'price, -price, rating or -rating (best rated first); '
+            'min_price/max_price imply price',
+}
+
+
+AMENITY_PARAMS = {
+    'amenities': 'Comma-separated amenity IDs: only places offering all '
+                 'of them, in creation order',
+}
+
+
+def _amenities_arg():
+    """The amenity IDs of an ?amenities= filter, or None."""
+    value = request.args.get('amenities')
+    if value is None:
+        return None
+    amenity_ids = [a.strip() for a in value.split(',') if a.strip()]
+    if not amenity_ids:
+        raise ValueError("amenities must list at least one amenity ID.")
+    return amenity_ids
+
+
+def _price_bounds():
+    """(min_price, max_price) of the query string, None when absent."""
+    bounds = []
+    for name in ('min_price', 'max_price'):
+        value = request.args.get(name)
+        if value is not None:
+            try:
+                value = float(value)
+            except ValueError:
+                raise ValueError(f"{name} must be a number.")
+            if not math.isfinite(value):
+                raise ValueError(f"{name} must be a number.")
+        bounds.append(value)
+    min_price, max_price = bounds
+    if min_price is not None and max_price is not None \
+            and min_price > max_price:
+        raise ValueError("min_price cannot be greater than max_price.")
+    return min_price, max_price
+
+
+def _price_args():
+    """(min_price, max_price, descending) of a price query, or None."""
+    sort = request.args.get('sort')
+    if sort not in (None, 'price', '-price', 'rating', '-rating'):
+        raise ValueError("sort must be price, -price, rating or -rating.")
+    min_price, max_price = _price_bounds()
+    if sort in ('rating', '-rating'):
+        if min_price is not None or max_price is not None:
+            raise ValueError(
+                "Price filters cannot be combined with a rating sort.")
+        return None
+    if sort is None and min_price is None and max_price is None:
+        return None
+    return min_price, max_price, sort == '-price'
+
+
+def _ordered_query():
+    """
+    (fetch, key, key types) of a price or rating ordered list, or None
+    for the default creation order.
+    """
+    price_query = _price_args()
+    if price_query:
+        def fetch(limit, after):
+            return facade.get_places_by_price(limit, after, *price_query)
+        return fetch, _price_key, PRICE_KEY
+    sort = request.args.get('sort')
+    if sort in ('rating', '-rating'):
+        def fetch(limit, after):
+            return facade.get_places_by_rating(limit, after,
+                                               descending=sort == '-rating')
+        return fetch, _rating_key, RATING_KEY
+    return None
+
+
+def _price_key(place):
+    return float(place.price), place.id
+
+
+def _rating_key(place):
+    average = facade.get_place_rating(place.id)['average']
+    return average or 0.0, place.id
+
+
+def _place_dict(place):
+    """Representation of a place with its review aggregates."""
+    rating = facade.get_place_rating(place.id)
+    if rating['average'] is not None:
+        rating['average'] = round(rating['average'], 2)
+    return dict(place.to_dict(), rating=rating)
+
 
 @api.route('/')
 class PlaceList(Resource):
@@ -53,22 +168,298 @@ class PlaceList(Resource):
         try:
             place_data = api.payload
             place = facade.create_place(place_data)
-            return place.to_dict(), 201
+            return _place_dict(place), 201, etag_header(place)
         except ValueError as e:
             return {"message": str(e)}, 400
 
+    @api.doc(params={**PAGE_PARAMS, **STREAM_PARAMS, **PRICE_PARAMS,
+                     **SEARCH_PARAMS, **AMENITY_PARAMS})
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(400, 'Invalid pagination, price or search parameters')
+    @api.response(404, 'Amenity not found')
     def get(self):
         """Retrieve a list of all places"""
         try:
+            query = text_query()
+            ordered = _ordered_query()
+            amenity_ids = _amenities_arg()
+            if query and ordered:
+                raise ValueError(
+                    "q cannot be combined with price filters or sort.")
+            if amenity_ids and (query or ordered):
+                raise ValueError("amenities cannot be combined with q, "
+                                 "price filters or sort.")
+            page = page_request(SCORE_KEY if query else
+                                ordered[2] if ordered else CREATED_KEY)
+            stream = stream_requested()
+            if stream and (query or ordered or amenity_ids):
+                raise ValueError("stream cannot be combined with q, "
+                                 "amenities, price filters or sort.")
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        if amenity_ids:
+            def fetch(limit, after):
+                return facade.get_places_with_amenities(amenity_ids,
+                                                        limit, after)
+            try:
+                if page:
+                    return paginate(fetch, _place_dict, *page)
+                return [_place_dict(place) for place in fetch(None, None)], 200
+            except NotFound as e:
+                return {"message": e.description}, 404
+            except ValueError as e:
+                return {"message": str(e)}, 400
+        if query:
+            return search_results(facade.search_places_text, query, page,
+                                  serialize=_place_dict)
+        if ordered:
+            fetch, key, _ = ordered
+            if page:
+                return paginate(fetch, _place_dict, *page, key=key)
+            return [_place_dict(place) for place in fetch(None, None)], 200
+        if stream:
+            return stream_json(facade.get_places_page, _place_dict)
+        try:
+            if page:
+                return paginate(facade.get_places_page, _place_dict, *page)
             places = facade.get_all_places()
             if not places:
                 return [], 200
-            return [place.to_dict() for place in places], 200
+            return [_place_dict(place) for place in places], 200
         except Exception as e:
             return {"message": str(e)}, 500
 
 
+SEARCH_DEFAULT_LIMIT = 100
+SEARCH_MAX_LIMIT = 1000
+
+
+def _float_arg(name, low, high):
+    try:
+        value = float(request.args[name])
+    except KeyError:
+        raise ValueError(f"Missing parameter: {name}")
+    except ValueError:
+        raise ValueError(f"{name} must be a number.")
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}.")
+    return value
+
+
+def _bbox_arg():
+    """
+    Parse bbox=min_lon,min_lat,max_lon,max_lat (GeoJSON order) into
+    (min_lat, min_lon, max_lat, max_lon).
+    """
+    try:
+        min_lon, min_lat, max_lon, max_lat = (
+            float(v) for v in request.args['bbox'].split(','))
+    except KeyError:
+        raise ValueError("Missing parameter: bbox")
+    except ValueError:
+        raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat.")
+    if not (-90.0 <= min_lat <= max_lat <= 90.0 and
+            -180.0 <= min_lon <= 180.0 and -180.0 <= max_lon <= 180.0):
+        raise ValueError("bbox is out of range.")
+    return min_lat, min_lon, max_lat, max_lon
+
+
+def _limit_arg():
+    try:
+        limit = int(request.args.get('limit', SEARCH_DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError("limit must be an integer.")
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {SEARCH_MAX_LIMIT}.")
+    return limit
+
+
+def _search_args():
+    """Parse the bbox or lat/lon/radius_km query of /places/search."""
+    limit = _limit_arg()
+
+    if 'bbox' in request.args:
+        return 'box', _bbox_arg(), limit
+
+    latitude = _float_arg('lat', -90.0, 90.0)
+    longitude = _float_arg('lon', -180.0, 180.0)
+    radius_km = _float_arg('radius_km', 0.0, 20037.5)
+    return 'radius', (latitude, longitude, radius_km), limit
+
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.doc(params={
+        'bbox': 'min_lon,min_lat,max_lon,max_lat (min_lon > max_lon '
+                'crosses the antimeridian)',
+        'lat': 'Latitude of the centre of a radius search',
+        'lon': 'Longitude of the centre of a radius search',
+        'radius_km': 'Radius of the search, in kilometres',
+        'limit': f'Maximum number of places (default {SEARCH_DEFAULT_LIMIT})',
+    })
+    @api.response(200, 'Places found, nearest first')
+    @api.response(400, 'Invalid search parameters')
+    def get(self):
+        """Search places in a bounding box or around a point"""
+        try:
+            kind, area, limit = _search_args()
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        if kind == 'box':
+            results = facade.search_places_in_box(*area, limit=limit)
+        else:
+            results = facade.search_places_near(*area, limit=limit)
+        return [dict(_place_dict(place), distance_km=round(distance, 3))
+                for place, distance in results], 200
+
+
+@api.route('/clusters')
+class PlaceClusters(Resource):
+    @api.doc(params={
+        'bbox': 'Viewport: min_lon,min_lat,max_lon,max_lat',
+        'zoom': 'Map zoom level, 0 to 11',
+    })
+    @api.response(200, 'Clustered markers for the viewport')
+    @api.response(400, 'Invalid viewport')
+    def get(self):
+        """Get clustered place markers for a map viewport"""
+        try:
+            area = _bbox_arg()
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        zoom = request.args.get('zoom', type=int)
+        if zoom is None or not 0 <= zoom <= 11:
+            return {"message": "zoom must be an integer between 0 and 11."}, 400
+        return facade.get_place_clusters(*area, zoom), 200
+
+
+TOP_DEFAULT_K = 20
+TOP_MAX_K = 100
+WEIGHT_PARAMS = {
+    f'w_{name}': f'Weight of the {name} score (default {weight})'
+    for name, weight in DEFAULT_WEIGHTS.items()
+}
+
+
+def _top_args():
+    """Keyword arguments of facade.get_top_places() from the query."""
+    try:
+        k = int(request.args.get('k', TOP_DEFAULT_K))
+    except ValueError:
+        raise ValueError("k must be an integer.")
+    if not 1 <= k <= TOP_MAX_K:
+        raise ValueError(f"k must be between 1 and {TOP_MAX_K}.")
+    weights = {}
+    for name in DEFAULT_WEIGHTS:
+        value = request.args.get(f'w_{name}')
+        if value is not None:
+            try:
+                weights[name] = float(value)
+            except ValueError:
+                raise ValueError(f"w_{name} must be a number.")
+            if not math.isfinite(weights[name]):
+                raise ValueError(f"w_{name} must be a number.")
+    latitude = longitude = radius_km = None
+    if 'lat' in request.args or 'lon' in request.args:
+        latitude = _float_arg('lat', -90.0, 90.0)
+        longitude = _float_arg('lon', -180.0, 180.0)
+    if 'radius_km' in request.args:
+        if latitude is None:
+            raise ValueError("radius_km needs lat and lon.")
+        radius_km = _float_arg('radius_km', 0.0, 20037.5)
+    min_price, max_price = _price_bounds()
+    return dict(k=k, weights=weights, latitude=latitude,
+                longitude=longitude, radius_km=radius_km,
+                min_price=min_price, max_price=max_price,
+                amenity_ids=_amenities_arg())
+
+
+@api.route('/top')
+class PlaceTop(Resource):
+    @api.doc(params={
+        'k': f'Number of places, 1 to {TOP_MAX_K} (default {TOP_DEFAULT_K})',
+        'lat': 'Latitude of the user, for the distance score',
+        'lon': 'Longitude of the user, for the distance score',
+        'radius_km': 'Only places within this distance of lat/lon',
+        'min_price': 'Lowest price per night (inclusive)',
+        'max_price': 'Highest price per night (inclusive)',
+        **AMENITY_PARAMS,
+        **WEIGHT_PARAMS,
+    })
+    @api.response(200, 'Best places, highest score first')
+    @api.response(400, 'Invalid ranking parameters')
+    @api.response(404, 'Amenity not found')
+    def get(self):
+        """Get the best places by rating, reviews, price and distance"""
+        try:
+            results = facade.get_top_places(**_top_args())
+        except NotFound as e:
+            return {"message": e.description}, 404
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        top = []
+        for place, score, distance in results:
+            body = dict(_place_dict(place), score=round(score, 4))
+            if distance is not None:
+                body['distance_km'] = round(distance, 3)
+            top.append(body)
+        return top, 200
+
+
+@api.route('/filter')
+class PlaceFilter(Resource):
+    @api.doc(params={
+        'min_price': 'Lowest price per night (inclusive)',
+        'max_price': 'Highest price per night (inclusive)',
+        'bbox': 'min_lon,min_lat,max_lon,max_lat (min_lon > max_lon '
+                'crosses the antimeridian)',
+        'min_rating': 'Lowest average rating, 0 to 5 (unrated places '
+                      'count as 0)',
+        'owner_id': 'ID of the owner',
+        'limit': f'Maximum number of places (default {SEARCH_DEFAULT_LIMIT})',
+    })
+    @api.response(200, 'Matching places; X-Total-Count holds their number')
+    @api.response(400, 'Invalid filter parameters')
+    def get(self):
+        """Filter places by price, area, rating and owner at once"""
+        try:
+            limit = _limit_arg()
+            min_price, max_price = _price_bounds()
+            box = _bbox_arg() if 'bbox' in request.args else None
+            min_rating = (_float_arg('min_rating', 0.0, 5.0)
+                          if 'min_rating' in request.args else None)
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        count, places = facade.filter_places(
+            min_price, max_price, box, min_rating,
+            request.args.get('owner_id'), limit)
+        return ([_place_dict(place) for place in places], 200,
+                {'X-Total-Count': str(count)})
+
+
+@api.route('/facets')
+class PlaceFacets(Resource):
+    @api.doc(params={
+        'amenities': 'Comma-separated amenity IDs the places must offer '
+                     '(default: none, i.e. every place)',
+    })
+    @api.response(200, 'Amenity counts of the matching places')
+    @api.response(400, 'Invalid amenities parameter')
+    @api.response(404, 'Amenity not found')
+    def get(self):
+        """Count the places offering every given amenity, per amenity"""
+        try:
+            amenity_ids = _amenities_arg() or []
+            count, facets = facade.get_amenity_facets(amenity_ids)
+        except NotFound as e:
+            return {"message": e.description}, 404
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        return {'count': count,
+                'amenities': [{'id': a.id, 'name': a.name, 'count': n}
+                              for a, n in facets]}, 200
+
+
 @api.route('/<place_id>')
 class PlaceResource(Resource):
     @api.response(200, 'Place details retrieved successfully')
@@ -80,7 +471,10 @@ class PlaceResource(Resource):
             if not place:
                 # Ajout d'une vérification
                 return {"message": "Place not found"}, 404
-            return place.to_dict(), 200
+            representation = _place_dict(place)
+            representation['amenities'] = [
+                {'id': a.id, 'name': a.name} for a in place.amenities]
+            return representation, 200, etag_header(place)
         except ValueError:
             return {"message": "Place not found"}, 404
         except Exception as e:
@@ -90,6 +484,7 @@ class PlaceResource(Resource):
     @api.response(200, 'Place updated successfully')
     @api.response(404, 'Place not found')
     @api.response(400, 'Invalid input data')
+    @api.response(412, 'Place modified since it was read')
     def put(self, place_id):
         """Update a place's information"""
         place_data = api.payload
@@ -106,9 +501,67 @@ class PlaceResource(Resource):
             if 'title' in place_data and not place_data['title'].strip():
                 return {"message": "Title is required"}, 400
 
-            updated_place = facade.update_place(place_id, place_data)
-            return updated_place.to_dict(), 200
+            updated_place = facade.update_place(place_id, place_data,
+                                                if_match_version())
+            return (_place_dict(updated_place), 200,
+                    etag_header(updated_place))
+        except VersionConflict as e:
+            return precondition_failed(e)
         except ValueError:
             return {"message": "Place not found"}, 404
         except Exception as e:
             return {"message": str(e)}, 400
+
+    @api.response(200, 'Place deleted successfully')
+    @api.response(404, 'Place not found')
+    def delete(self, place_id):
+        """Delete a place, its reviews and its amenity links"""
+        try:
+            facade.delete_place(place_id)
+        except ValueError:
+            return {"message": "Place not found"}, 404
+        return {"message": "Place deleted successfully"}, 200
+
+
+@api.route('/<place_id>/amenities')
+class PlaceAmenityList(Resource):
+    @api.response(200, 'List of amenities for the place retrieved successfully')
+    @api.response(404, 'Place not found')
+    def get(self, place_id):
+        """Get all amenities of a place"""
+        try:
+            place = facade.get_place(place_id)
+        except ValueError:
+            return {"message": "Place not found"}, 404
+        return [{'id': a.id, 'name': a.name} for a in place.amenities], 200
+
+    @api.expect(place_amenities_model)
+    @api.response(200, 'Amenities attached successfully')
+    @api.response(404, 'Place or amenity not found')
+    @api.response(400, 'Invalid input data')
+    def post(self, place_id):
+        """Attach amenities to a place"""
+        amenity_ids = (api.payload or {}).get('amenity_ids')
+        try:
+            amenities = facade.add_amenities_to_place(place_id, amenity_ids)
+        except NotFound as e:
+            return {"message": e.description}, 404
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        return [{'id': a.id, 'name': a.name} for a in amenities], 200
+
+    @api.expect(place_amenities_model)
+    @api.response(200, 'Amenities detached successfully')
+    @api.response(404, 'Place or amenity not found')
+    @api.response(400, 'Invalid input data')
+    def delete(self, place_id):
+        """Detach amenities from a place"""
+        amenity_ids = (api.payload or {}).get('amenity_ids')
+        try:
+            amenities = facade.remove_amenities_from_place(
+                place_id, amenity_ids)
+        except NotFound as e:
+            return {"message": e.description}, 404
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        return [{'id': a.id, 'name': a.name} for a in amenities], 200
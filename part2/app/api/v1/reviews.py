@@ -1,6 +1,16 @@
 #!/usr/bin/python3
+from datetime import datetime
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
+from app.api.v1.etag import (
+    etag_header, if_match_version, precondition_failed)
+from app.persistence.repository import VersionConflict
+from app.api.v1.pagination import (
+    CREATED_KEY, PAGE_PARAMS, page_request, paginate)
+from app.api.v1.streaming import STREAM_PARAMS, stream_requested, stream_json
+from app.api.v1.text_search import (
+    SCORE_KEY, SEARCH_PARAMS, search_results, text_query)
 
 api = Namespace('reviews', description='Review operations')
 
@@ -13,6 +23,52 @@ review_model = api.model('Review', {
     'place_id': fields.String(required=True, description='ID of the place')
 })
 
+TIME_PARAMS = {
+    'since': 'Oldest creation time, ISO 8601 (inclusive)',
+    'until': 'Newest creation time, ISO 8601 (inclusive)',
+    'order': 'oldest (default) or newest first',
+}
+
+
+def _datetime_arg(name):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 date or datetime.")
+    if moment.tzinfo is not None:
+        # Timestamps are stored as naive local times
+        moment = moment.astimezone().replace(tzinfo=None)
+    return moment
+
+
+def _time_args():
+    """(since, until, newest_first) of a time-ordered query, or None."""
+    order = request.args.get('order')
+    if order not in (None, 'oldest', 'newest'):
+        raise ValueError("order must be oldest or newest.")
+    since, until = _datetime_arg('since'), _datetime_arg('until')
+    if since is not None and until is not None and since > until:
+        raise ValueError("since cannot be later than until.")
+    if order is None and since is None and until is None:
+        return None
+    return since, until, order == 'newest'
+
+
+def _time_results(time_query, page, place_id=None):
+    """Response for a time-ordered query; `page` is page_request()."""
+    since, until, newest_first = time_query
+
+    def fetch(limit, after):
+        return facade.get_reviews_by_time(limit, after, since, until,
+                                          newest_first, place_id)
+
+    if page:
+        return paginate(fetch, lambda r: r.to_dict(), *page)
+    return [r.to_dict() for r in fetch(None, None)], 200
+
 
 @api.route('/')
 class ReviewList(Resource):
@@ -33,13 +89,39 @@ class ReviewList(Resource):
                 return {"message": "Owner cannot review their own place"}, 403
 
             review = facade.create_review(review_data)
-            return review.to_dict(), 201
+            return review.to_dict(), 201, etag_header(review)
         except ValueError as e:
             return {"message": str(e)}, 400
 
+    @api.doc(params={**PAGE_PARAMS, **STREAM_PARAMS, **SEARCH_PARAMS,
+                     **TIME_PARAMS})
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid pagination, search or time parameters')
     def get(self):
         """Retrieve a list of all reviews"""
+        try:
+            query = text_query()
+            time_query = _time_args()
+            if query and time_query:
+                raise ValueError(
+                    "q cannot be combined with since, until or order.")
+            page = page_request(SCORE_KEY if query else CREATED_KEY)
+            stream = stream_requested()
+            if stream and (query or time_query):
+                raise ValueError("stream cannot be combined with q, since, "
+                                 "until or order.")
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        if query:
+            return search_results(facade.search_reviews_text, query, page)
+        if time_query:
+            return _time_results(time_query, page)
+        if stream:
+            return stream_json(facade.get_reviews_page,
+                               lambda r: r.to_dict())
+        if page:
+            return paginate(facade.get_reviews_page, lambda r: r.to_dict(),
+                            *page)
         reviews = facade.get_all_reviews()
         return [r.to_dict() for r in reviews], 200
 
@@ -53,22 +135,26 @@ class ReviewResource(Resource):
         review = facade.get_review(review_id)
         if not review:
             return {'error': 'Review not found'}, 404
-        return review.to_dict(), 200
+        return review.to_dict(), 200, etag_header(review)
 
     @api.expect(review_model)
     @api.response(200, 'Review updated successfully')
     @api.response(404, 'Review not found')
     @api.response(400, 'Invalid input data')
+    @api.response(412, 'Review modified since it was read')
     def put(self, review_id):
         """Update a review's information"""
         review_data = api.payload
         if 'id' in review_data and review_data['id'] != review_id:
             return {"error": "Review ID cannot be modified"}, 400
         try:
-            updated_review = facade.update_review(review_id, review_data)
+            updated_review = facade.update_review(review_id, review_data,
+                                                  if_match_version())
             if not updated_review:
                 return {'error': 'User not found'}, 404
-            return updated_review.to_dict(), 200
+            return updated_review.to_dict(), 200, etag_header(updated_review)
+        except VersionConflict as e:
+            return precondition_failed(e)
         except ValueError as e:
             return {"error": str(e)}, 400
 
@@ -85,6 +171,7 @@ class ReviewResource(Resource):
 
 @api.route('/places/<place_id>/reviews')
 class PlaceReviewList(Resource):
+    @api.doc(params={**PAGE_PARAMS, **TIME_PARAMS})
     @api.response(200, 'List of reviews for the place retrieved successfully')
     @api.response(404, 'Place not found')
     def get(self, place_id):
@@ -94,6 +181,12 @@ class PlaceReviewList(Resource):
             if not place:
                 return {"message": "Place not found"}, 404
 
+            time_query = _time_args()
+            page = page_request()
+            if time_query or page:
+                return _time_results(time_query or (None, None, False),
+                                     page, place_id)
+
             reviews = facade.get_reviews_by_place(place_id)
             if not reviews:
                 return {"message": "No reviews found for this place"}, 200
@@ -0,0 +1,55 @@
+"""
+Streaming mode for the list endpoints.
+
+With `?stream=true` the collection is sent as a chunked JSON array.
+The body is produced by a generator that walks the repository one
+page at a time, so memory use does not depend on the collection size
+and the first bytes leave before the last entity is read.
+"""
+
+import json
+
+from flask import Response, request
+
+from app.persistence.repository import order_key
+
+STREAM_BATCH_SIZE = 500
+
+STREAM_PARAMS = {'stream': 'Send the whole collection as a chunked JSON array'}
+
+
+def stream_requested():
+    """True if the client asked for a streamed response."""
+    stream = request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+    if stream and ('limit' in request.args or 'cursor' in request.args):
+        raise ValueError("stream cannot be combined with limit or cursor.")
+    return stream
+
+
+def iter_pages(fetch, batch_size=STREAM_BATCH_SIZE):
+    """Yield lists of entities from a facade page method until exhausted."""
+    after = None
+    while True:
+        objects = fetch(batch_size, after)
+        if objects:
+            yield objects
+        if len(objects) < batch_size:
+            return
+        after = order_key(objects[-1])
+
+
+def json_array(pages, serialize):
+    """Encode pages of entities as a JSON array, one chunk per page."""
+    yield '['
+    separator = ''
+    for objects in pages:
+        yield separator + ','.join(json.dumps(serialize(obj))
+                                   for obj in objects)
+        separator = ','
+    yield ']\n'
+
+
+def stream_json(fetch, serialize):
+    """Chunked response listing every entity served by `fetch`."""
+    return Response(json_array(iter_pages(fetch), serialize),
+                    mimetype='application/json')
@@ -0,0 +1,79 @@
+"""
+Full-text search for the list endpoints.
+
+`?q=words` returns the entities matching any of the words, best first
+by BM25 relevance, each with its `score`. Results come from the
+facade's inverted indexes, so only the entities containing the words
+are read. They page with `limit` and `cursor` like the other orders,
+the cursor holding the (score, id) of the last result.
+
+The `/autocomplete` endpoints complete a prefix from the facade's
+prefix indexes instead, for type-ahead fields.
+"""
+
+from flask import request
+
+from app.api.v1.pagination import paginate
+from app.persistence.prefix_index import normalize_prefix
+from app.persistence.text_index import tokenize
+
+SEARCH_PARAMS = {'q': 'Keywords; matches are ranked by relevance'}
+
+# Value types of the (score, id) key of a search cursor
+SCORE_KEY = (float, str)
+
+AUTOCOMPLETE_DEFAULT_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 100
+
+AUTOCOMPLETE_PARAMS = {
+    'q': 'Prefix typed so far (case and accents are ignored)',
+    'limit': f'Maximum number of suggestions, 1 to {AUTOCOMPLETE_MAX_LIMIT} '
+             f'(default {AUTOCOMPLETE_DEFAULT_LIMIT})',
+}
+
+
+def text_query():
+    """The `q` keywords, or None when not searching."""
+    query = request.args.get('q')
+    if query is not None and not tokenize(query):
+        raise ValueError("q must contain at least one word.")
+    return query
+
+
+def _score_key(item):
+    obj, score = item
+    return score, obj.id
+
+
+def search_results(search, query, page, serialize=None):
+    """
+    Response for a search. `search(query, limit, after)` is a facade
+    method returning (entity, score) pairs; `page` is page_request();
+    `serialize` represents one entity (default: its to_dict()).
+    """
+    def fetch(limit, after):
+        return search(query, limit, after)
+
+    def serialize_item(item):
+        obj, score = item
+        body = serialize(obj) if serialize else obj.to_dict()
+        return dict(body, score=round(score, 4))
+
+    if page:
+        return paginate(fetch, serialize_item, *page, key=_score_key)
+    return [serialize_item(item) for item in fetch(None, None)], 200
+
+
+def autocomplete_args():
+    """(prefix, limit) of an /autocomplete request."""
+    prefix = request.args.get('q', '')
+    if not normalize_prefix(prefix):
+        raise ValueError("q must not be empty.")
+    try:
+        limit = int(request.args.get('limit', AUTOCOMPLETE_DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError("limit must be an integer.")
+    if not 1 <= limit <= AUTOCOMPLETE_MAX_LIMIT:
+        raise ValueError(
+            f"limit must be between 1 and {AUTOCOMPLETE_MAX_LIMIT}.")
+    return prefix, limit
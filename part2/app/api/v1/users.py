@@ -1,6 +1,12 @@
 #!/usr/bin/python3
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
+from app.api.v1.etag import (
+    etag_header, if_match_version, precondition_failed)
+from app.persistence.repository import VersionConflict
+from app.api.v1.pagination import PAGE_PARAMS, page_request, paginate
+from app.api.v1.streaming import STREAM_PARAMS, stream_requested, stream_json
+from app.api.v1.text_search import AUTOCOMPLETE_PARAMS, autocomplete_args
 
 api = Namespace('users', description='User operations')
 
@@ -23,23 +29,46 @@ class UserList(Resource):
         user_data = api.payload
 
         try:
-            existing_user = facade.get_user_by_email(user_data['email'])
-            if existing_user:
-                return {'error': 'Email already registered'}, 400
-
             new_user = facade.create_user(user_data)
-            return new_user.to_dict(), 201
+            return new_user.to_dict(), 201, etag_header(new_user)
 
         except ValueError as e:
             return {"error": str(e)}, 400
 
+    @api.doc(params={**PAGE_PARAMS, **STREAM_PARAMS})
     @api.response(200, 'List of users retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
     def get(self):
         """Retrieve a list of all users"""
+        try:
+            page = page_request()
+            stream = stream_requested()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        if stream:
+            return stream_json(facade.get_users_page, lambda u: u.to_dict())
+        if page:
+            return paginate(facade.get_users_page, lambda u: u.to_dict(),
+                            *page)
         users = facade.get_all_users()
         return [u.to_dict() for u in users], 200
 
 
+@api.route('/autocomplete')
+class UserAutocomplete(Resource):
+    @api.doc(params=AUTOCOMPLETE_PARAMS)
+    @api.response(200, 'Users whose name or email starts with the prefix')
+    @api.response(400, 'Invalid prefix or limit')
+    def get(self):
+        """Suggest users from the start of a name or email"""
+        try:
+            prefix, limit = autocomplete_args()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return [u.to_dict() for u in
+                facade.autocomplete_users(prefix, limit)], 200
+
+
 @api.route('/<user_id>')
 class UserResource(Resource):
     @api.response(200, 'User details retrieved successfully')
@@ -50,21 +79,25 @@ class UserResource(Resource):
         if not user:
             return {'error': 'User not found'}, 404
 
-        return user.to_dict(), 200
+        return user.to_dict(), 200, etag_header(user)
 
     @api.expect(user_model, validate=True)
     @api.response(200, 'User updated successfully')
     @api.response(404, 'User not found')
+    @api.response(412, 'User modified since it was read')
     def put(self, user_id):
         """Update an user's information"""
         user_data = api.payload
         if 'id' in user_data and user_data['id'] != user_id:
             return {"error": "ID cannot be modified"}, 400
         try:
-            updated_user = facade.update_user(user_id, user_data)
+            updated_user = facade.update_user(user_id, user_data,
+                                              if_match_version())
             if not updated_user:
                 return {'error': 'User not found'}, 404
-            return updated_user.to_dict(), 200
+            return updated_user.to_dict(), 200, etag_header(updated_user)
 
+        except VersionConflict as e:
+            return precondition_failed(e)
         except ValueError as e:
             return {"error": str(e)}, 400
@@ -21,6 +21,8 @@ from .basemodel import BaseModel
 class Amenity(BaseModel):
     """Represents an Amenity with validation for name."""
 
+    __slots__ = ('_name',)
+
     def __init__(self, name):
         super().__init__()  # Initialize BaseModel (UUID, created_at, updated_at)
         self._name = self._validate_name(name)
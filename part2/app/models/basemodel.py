@@ -1,21 +1,59 @@
 #!/usr/bin/python3
-import uuid
+import sys
 from datetime import datetime
 
+from app.models.ids import id_time, new_id
+
+
+def intern_string(value):
+    """
+    The canonical copy of a string, so that an id and the foreign keys
+    referencing it (the place_id of every review of a place) and
+    repeated names are stored once; other values are returned
+    unchanged.
+    """
+    return sys.intern(value) if type(value) is str else value
+
 
 class BaseModel:
+    # Models have no per-instance __dict__: subclasses list their own
+    # attributes in __slots__ too
+    __slots__ = ('id', 'created_at', 'updated_at', 'version')
+
+    # Whether other entities hold foreign keys to this model, whose ids
+    # are then interned. Unreferenced ids would only add an entry to the
+    # intern table each.
+    REFERENCED = True
+
+    # Managed by the model itself, never taken from an update payload:
+    # a client-supplied version would defeat optimistic concurrency
+    PROTECTED = frozenset(('id', 'created_at', 'updated_at', 'version'))
+
     def __init__(self):
-        self.id = str(uuid.uuid4())
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        if getattr(self, 'id', None) is not None:
+            # Restored by schema.from_record(), which set the stored id,
+            # timestamps and version before the fields are validated
+            return
+        obj_id = new_id()
+        self.id = intern_string(obj_id) if self.REFERENCED else obj_id
+        # Datetimes are immutable: both timestamps share one object
+        # until the first save(). A time-ordered id carries its own
+        # creation time, so that ids and created_at sort alike.
+        self.created_at = self.updated_at = id_time(obj_id) or datetime.now()
+        # Incremented on every save(), used for optimistic concurrency
+        self.version = 1
 
     def save(self):
-        """Update the updated_at timestamp whenever the object is modified"""
+        """Update the updated_at timestamp and the version whenever the object is modified"""
         self.updated_at = datetime.now()
+        self.version += 1
 
     def update(self, data):
         """Update the attributes of the object based on the provided dictionary"""
-        for key, value in data.items():
-            if hasattr(self, key):
-                setattr(self, key, value)
-        self.save()  # Update the updated_at timestamp
+        try:
+            for key, value in data.items():
+                if key not in self.PROTECTED and hasattr(self, key):
+                    setattr(self, key, value)
+        finally:
+            # A failed validation may have applied part of `data`
+            self.save()  # Update the updated_at timestamp
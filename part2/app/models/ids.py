@@ -0,0 +1,154 @@
+"""
+Id generation for the models.
+
+BaseModel takes its ids from the generator installed with
+set_id_generator(); the facade installs the one its configuration names
+(HBNB_ID_GENERATOR):
+
+    uuid4   random ids, like str(uuid.uuid4()) (the default)
+    uuid7   time-ordered UUIDv7 (RFC 9562): a 48-bit Unix timestamp in
+            milliseconds, 12 bits of sub-millisecond precision holding
+            the microseconds, and 62 random bits
+
+Both take their random bits from a pool filled by one os.urandom call
+per `batch` ids (HBNB_ID_BATCH) instead of one call per id. With a batch
+of 1, uuid4 is exactly str(uuid.uuid4()).
+
+UUIDv7 ids sort in creation order: they are appended at the end of an
+id index, such as the sqlite primary key, instead of landing at random
+places in it. A model with a UUIDv7 id takes its creation time from
+the id (see id_time): ids then sort exactly like the (created_at, id)
+ordering keys, and the id alone is a creation-order cursor.
+"""
+
+import os
+import threading
+import time
+import uuid
+import weakref
+from datetime import datetime
+
+# Random pools of the live generators, emptied in forked children so
+# that two processes never hand out the same buffered bits
+_GENERATORS = weakref.WeakSet()
+
+
+def _format(value):
+    digits = '%032x' % value
+    return (f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-"
+            f"{digits[16:20]}-{digits[20:]}")
+
+
+class _Generator:
+    def __init__(self, batch=1):
+        if batch < 1:
+            raise ValueError("The id batch must be at least 1.")
+        self.batch = batch
+        self._reset()
+        _GENERATORS.add(self)
+
+    def _reset(self):
+        self._pool = b''
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    def _random(self, size):
+        """`size` random bytes from the pool, refilled when empty."""
+        offset = self._offset
+        if offset + size > len(self._pool):
+            self._pool = os.urandom(size * self.batch)
+            offset = 0
+        self._offset = offset + size
+        return int.from_bytes(self._pool[offset:offset + size], 'big')
+
+
+class UUID4Generator(_Generator):
+    """Random (version 4) UUIDs."""
+
+    def __call__(self):
+        if self.batch == 1:
+            return str(uuid.uuid4())
+        with self._lock:
+            value = self._random(16)
+        # Version 4, RFC 4122 variant
+        value = value & ~(0xf << 76) | 4 << 76
+        return _format(value & ~(0x3 << 62) | 0x2 << 62)
+
+
+class UUID7Generator(_Generator):
+    """
+    Time-ordered (version 7) UUIDs with the increased clock precision of
+    RFC 9562 (method 3): the 12 bits after the version hold the
+    microseconds within the millisecond, scaled to 0-4095. Ids of one
+    microsecond are ordered by their random bits, like ties on
+    created_at are ordered by id.
+    """
+
+    def __call__(self):
+        millis, micros = divmod(time.time_ns() // 1000, 1000)
+        with self._lock:
+            bits = self._random(8) >> 2
+        return _format(millis << 80 | 7 << 76 | _scale(micros) << 64
+                       | 0x2 << 62 | bits)
+
+
+def _scale(micros):
+    """0-999 microseconds to 12 bits, inverted exactly by _unscale."""
+    return (micros * 4096 + 999) // 1000
+
+
+def _unscale(bits):
+    return bits * 1000 // 4096
+
+
+GENERATORS = {'uuid4': UUID4Generator, 'uuid7': UUID7Generator}
+
+
+def id_generator(name, batch=1):
+    """A new generator of the kind `name` ('uuid4' or 'uuid7')."""
+    try:
+        generator_class = GENERATORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown id generator: {name}")
+    return generator_class(batch)
+
+
+def id_time(obj_id):
+    """
+    Creation time encoded in a UUIDv7 id, as naive local time like
+    datetime.now(); None for any other id.
+    """
+    if type(obj_id) is not str or len(obj_id) != 36 or \
+            obj_id[14] != '7' or obj_id[19] not in '89ab':
+        return None
+    try:
+        uuid.UUID(obj_id)
+        millis = int(obj_id[:8] + obj_id[9:13], 16)
+        micros = _unscale(int(obj_id[15:18], 16))
+    except ValueError:
+        return None
+    seconds, millis = divmod(millis, 1000)
+    return datetime.fromtimestamp(seconds).replace(
+        microsecond=millis * 1000 + micros)
+
+
+_generator = UUID4Generator()
+
+
+def set_id_generator(generator):
+    """Make `generator` (a callable returning str ids) the source of new ids."""
+    global _generator
+    _generator = generator
+
+
+def new_id():
+    return _generator()
+
+
+def _after_fork():
+    for generator in list(_GENERATORS):
+        generator._reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
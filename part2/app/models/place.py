@@ -31,10 +31,13 @@ Example usage:
 
 """
 
-from .basemodel import BaseModel
+from .basemodel import BaseModel, intern_string
 
 
 class Place(BaseModel):
+    __slots__ = ('title', 'owner_id', '__price', '__latitude', '__longitude',
+                 'description', '_reviews', '_amenities')
+
     def __init__(self, title, price, latitude, longitude,
                  owner_id, description=None):
         """
@@ -49,7 +52,7 @@ class Place(BaseModel):
         if owner_id is None:
             raise ValueError("Owner ID is required.")
 
-        self.owner_id = owner_id
+        self.owner_id = intern_string(owner_id)
         self.price = price
         self.latitude = latitude
         self.longitude = longitude
@@ -58,8 +61,29 @@ class Place(BaseModel):
             raise TypeError("Description must be a string.")
         self.description = description
 
-        self.reviews = []
-        self.amenities = []
+        # Relationship lists are only allocated when first used
+        self._reviews = None
+        self._amenities = None
+
+    @property
+    def reviews(self):
+        if self._reviews is None:
+            self._reviews = []
+        return self._reviews
+
+    @reviews.setter
+    def reviews(self, value):
+        self._reviews = value
+
+    @property
+    def amenities(self):
+        if self._amenities is None:
+            self._amenities = []
+        return self._amenities
+
+    @amenities.setter
+    def amenities(self, value):
+        self._amenities = value
 
     @property
     def price(self):
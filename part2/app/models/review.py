@@ -26,12 +26,16 @@ Example usage:
     )
 """
 
-from .basemodel import BaseModel
+from .basemodel import BaseModel, intern_string
 from .place import Place
 from .user import User
 
 
 class Review(BaseModel):
+    __slots__ = ('text', 'rating', 'user_id', 'place_id')
+
+    REFERENCED = False
+
     def __init__(self, text, rating, place_id, user_id):
         """
         description
@@ -48,11 +52,11 @@ class Review(BaseModel):
 
         if not isinstance(user_id, str) or not user_id:
             raise ValueError
-        self.user_id = user_id
+        self.user_id = intern_string(user_id)
         
         if not isinstance(place_id, str) or not place_id:
             raise ValueError
-        self.place_id = place_id
+        self.place_id = intern_string(place_id)
 
     def to_dict(self):
         return {
@@ -23,12 +23,14 @@ Example usage:
     )
 """
 import re
-from .basemodel import BaseModel
+from .basemodel import BaseModel, intern_string
 
 
 class User(BaseModel):
     """User class model."""
 
+    __slots__ = ('first_name', 'last_name', '_email', '_is_admin', '_places')
+
     def __init__(self, first_name, last_name, email, is_admin=False):
         super().__init__()  # Initialize BaseModel (UUID, created_at, updated_at)
 
@@ -36,13 +38,13 @@ class User(BaseModel):
         if not isinstance(first_name, str) or not first_name.strip() or len(first_name.strip()) > 50:
             raise ValueError(
                 "First name must be a non-empty string with a maximum length of 50 characters.")
-        self.first_name = first_name.strip()
+        self.first_name = intern_string(first_name.strip())
 
         # Last name
         if not isinstance(last_name, str) or not last_name.strip() or len(last_name.strip()) > 50:
             raise ValueError(
                 "Last name must be a non-empty string with a maximum length of 50 characters.")
-        self.last_name = last_name.strip()
+        self.last_name = intern_string(last_name.strip())
 
         # Email
         self._email = self._validate_email(email)
@@ -52,8 +54,18 @@ class User(BaseModel):
             raise ValueError("is_admin must be a boolean.")
         self._is_admin = is_admin
 
-        # User places list
-        self.places = []
+        # User places list, only allocated when first used
+        self._places = None
+
+    @property
+    def places(self):
+        if self._places is None:
+            self._places = []
+        return self._places
+
+    @places.setter
+    def places(self, value):
+        self._places = value
 
     @staticmethod
     def _validate_email(email):
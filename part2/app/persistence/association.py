@@ -0,0 +1,53 @@
+import threading
+
+
+class AssociationStore:
+    """
+    Many-to-many links between two kinds of entities (e.g. place and
+    amenity), indexed in both directions.
+
+    Both sides are kept as {id: {other_id: None}} so that listing the
+    links of one entity costs O(links of that entity) and keeps the
+    order in which links were created.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._left = {}
+        self._right = {}
+
+    def link(self, left_id, right_id):
+        """Link two ids. Returns False if the link already existed."""
+        with self._lock:
+            rights = self._left.setdefault(left_id, {})
+            if right_id in rights:
+                return False
+            rights[right_id] = None
+            self._right.setdefault(right_id, {})[left_id] = None
+            return True
+
+    def unlink(self, left_id, right_id):
+        """Remove a link. Returns False if there was nothing to remove."""
+        with self._lock:
+            rights = self._left.get(left_id)
+            if not rights or right_id not in rights:
+                return False
+            del rights[right_id]
+            if not rights:
+                del self._left[left_id]
+            lefts = self._right[right_id]
+            del lefts[left_id]
+            if not lefts:
+                del self._right[right_id]
+            return True
+
+    def rights(self, left_id):
+        """Ids linked to a left-side id, in link order."""
+        return list(self._left.get(left_id, ()))
+
+    def lefts(self, right_id):
+        """Ids linked to a right-side id, in link order."""
+        return list(self._right.get(right_id, ()))
+
+    def is_linked(self, left_id, right_id):
+        return right_id in self._left.get(left_id, ())
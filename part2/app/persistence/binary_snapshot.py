@@ -0,0 +1,181 @@
+"""
+Compact binary snapshot format, read through mmap.
+
+Layout (little-endian):
+
+    header   magic, version, segment, record count, and the sizes and
+             offsets of the sections below
+    schema   JSON list of [field name, kind], kinds being
+             's' str, 'f' float, 'i' int, 'b' bool, 't' datetime
+    records  one fixed-width record per entity; strings are stored as
+             (heap offset, length) pairs, datetimes as microseconds
+             since the epoch
+    index    record numbers sorted by id, for binary search
+    heap     UTF-8 bytes of every string
+
+Opening a snapshot only maps the file: records are decoded on demand,
+so start-up cost does not depend on the number of entities and cold
+records stay out of the Python heap.
+"""
+
+import json
+import mmap
+import struct
+from datetime import datetime, timedelta
+
+MAGIC = b'HBNBSNP1'
+VERSION = 1
+HEADER = struct.Struct('<8sHQIIIQQQ')
+INDEX_ENTRY = struct.Struct('<I')
+NULL_OFFSET = 0xFFFFFFFFFFFFFFFF
+
+KIND_FORMATS = {'s': 'QI', 'f': 'd', 'i': 'q', 'b': '?', 't': 'q'}
+PYTHON_KINDS = {str: 's', float: 'f', int: 'i', bool: 'b'}
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def schema_for(fields):
+    """Snapshot schema from a schema.FIELDS entry."""
+    return ([('id', 's'), ('created_at', 't'), ('updated_at', 't'),
+             ('version', 'i')]
+            + [(name, PYTHON_KINDS[kind]) for name, kind in fields])
+
+
+def _record_struct(schema):
+    return struct.Struct('<' + ''.join(KIND_FORMATS[kind]
+                                       for _, kind in schema))
+
+
+def is_binary_snapshot(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_snapshot(f, schema, segment, records):
+    """Write `records` (dicts of Python values) to the binary file `f`."""
+    record_struct = _record_struct(schema)
+    schema_blob = json.dumps(schema).encode('utf-8')
+    heap = bytearray()
+    packed = bytearray()
+    ids = []
+
+    for record in records:
+        values = []
+        for name, kind in schema:
+            value = record.get(name)
+            if kind == 's':
+                if value is None:
+                    values += [NULL_OFFSET, 0]
+                else:
+                    data = value.encode('utf-8')
+                    values += [len(heap), len(data)]
+                    heap += data
+            elif kind == 't':
+                values.append((value - EPOCH) // MICROSECOND)
+            else:
+                values.append(value)
+        packed += record_struct.pack(*values)
+        ids.append(record['id'])
+
+    order = sorted(range(len(ids)), key=ids.__getitem__)
+    schema_offset = HEADER.size
+    records_offset = schema_offset + len(schema_blob)
+    index_offset = records_offset + len(packed)
+    heap_offset = index_offset + INDEX_ENTRY.size * len(order)
+
+    f.write(HEADER.pack(MAGIC, VERSION, segment, len(ids),
+                        record_struct.size, len(schema_blob),
+                        records_offset, index_offset, heap_offset))
+    f.write(schema_blob)
+    f.write(packed)
+    f.write(struct.pack(f'<{len(order)}I', *order))
+    f.write(heap)
+
+
+class BinarySnapshot:
+    """Read-only, memory-mapped view of a binary snapshot file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.segment, self._count, record_size,
+         schema_size, self._records_offset, self._index_offset,
+         self._heap_offset) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a binary snapshot: {path}")
+        self.schema = [tuple(field) for field in json.loads(
+            self._mm[HEADER.size:HEADER.size + schema_size])]
+        self._struct = _record_struct(self.schema)
+        if self._struct.size != record_size:
+            raise ValueError(f"Corrupted binary snapshot: {path}")
+        # Position of each field in the unpacked tuple
+        self._positions = {}
+        position = 0
+        for name, kind in self.schema:
+            self._positions[name] = (position, kind)
+            position += 2 if kind == 's' else 1
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, obj_id):
+        return self.find(obj_id) >= 0
+
+    def _raw(self, number):
+        return self._struct.unpack_from(
+            self._mm, self._records_offset + number * self._struct.size)
+
+    def _decode(self, raw, name):
+        position, kind = self._positions[name]
+        value = raw[position]
+        if kind == 's':
+            if value == NULL_OFFSET:
+                return None
+            start = self._heap_offset + value
+            return self._mm[start:start + raw[position + 1]].decode('utf-8')
+        if kind == 't':
+            return EPOCH + value * MICROSECOND
+        return value
+
+    def _id_at(self, number):
+        return self._decode(self._raw(number), 'id')
+
+    def find(self, obj_id):
+        """Record number of an id (binary search), or -1."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            number = INDEX_ENTRY.unpack_from(
+                self._mm, self._index_offset + middle * INDEX_ENTRY.size)[0]
+            current = self._id_at(number)
+            if current == obj_id:
+                return number
+            if current < obj_id:
+                low = middle + 1
+            else:
+                high = middle
+        return -1
+
+    def record(self, number):
+        """Decode a whole record into a dict."""
+        raw = self._raw(number)
+        return {name: self._decode(raw, name) for name, _ in self.schema}
+
+    def fields(self, number, names):
+        """Decode only some fields of a record into a dict."""
+        raw = self._raw(number)
+        return {name: self._decode(raw, name) for name in names}
+
+    def get(self, obj_id):
+        number = self.find(obj_id)
+        return self.record(number) if number >= 0 else None
+
+    def ids(self):
+        """Iterate over the ids in record order."""
+        for number in range(self._count):
+            yield number, self._id_at(number)
+
+    def close(self):
+        self._mm.close()
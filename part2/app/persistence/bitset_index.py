@@ -0,0 +1,196 @@
+import threading
+
+from app.persistence.surrogate_keys import SurrogateKeys
+
+
+def iter_bits(bits):
+    """Positions of the set bits of a non-negative int, lowest first."""
+    # The reversed binary string is scanned by str.find at C speed, so
+    # the Python loop only runs once per set bit
+    digits = bin(bits)[:1:-1]
+    position = digits.find('1')
+    while position != -1:
+        yield position
+        position = digits.find('1', position + 1)
+
+
+CHUNK_BITS = 4096
+
+
+def _set(bitmap, ordinal):
+    chunk, bit = divmod(ordinal, CHUNK_BITS)
+    bitmap[chunk] = bitmap.get(chunk, 0) | (1 << bit)
+
+
+def _test(bitmap, ordinal):
+    chunk, bit = divmod(ordinal, CHUNK_BITS)
+    return bool(bitmap.get(chunk, 0) >> bit & 1)
+
+
+def _clear(bitmap, ordinal):
+    chunk, bit = divmod(ordinal, CHUNK_BITS)
+    bits = bitmap.get(chunk, 0) & ~(1 << bit)
+    if bits:
+        bitmap[chunk] = bits
+    else:
+        bitmap.pop(chunk, None)
+
+
+class BitsetIndex:
+    """
+    Place <-> tag (amenity) links as bitmaps.
+
+    Places are numbered by their key in a SurrogateKeys map, shared with
+    the other indexes keyed by integers, and every tag gets a bitmap of
+    the keys of its places. Places having all
+    of several tags are the bitwise AND of their bitmaps, and the facet
+    count of a tag within a result is the popcount of one more AND, so
+    filtering and faceting never read the places themselves.
+
+    Bitmaps are split roaring-style into {chunk: int} of CHUNK_BITS bits
+    each: setting a bit only rebuilds one small int, and an AND only
+    visits the chunks present in every operand.
+
+    A removed place has its bits cleared and keeps its key until the
+    keys are compacted, which renumbers the bitmaps in the same order:
+    the key order stays the insertion order and a page can still resume
+    after a removed place. With shared keys, their owner discards a
+    removed place from them once every index has dropped it.
+    """
+
+    def __init__(self, keys=None):
+        # place_id <-> ordinal
+        self._own_keys = keys is None
+        self._keys = SurrogateKeys() if keys is None else keys
+        self._count = 0
+        # Bitmap of every place
+        self._all = {}
+        # tag -> bitmap of place ordinals
+        self._bitmaps = {}
+        # place_id -> set of its tags, to clear them on removal
+        self._tags = {}
+        self._lock = threading.Lock()
+        self._keys.attach(self)
+
+    def __len__(self):
+        return self._count
+
+    def _ordinal(self, place_id):
+        ordinal = self._keys.key(place_id)
+        if not _test(self._all, ordinal):
+            self._count += 1
+            _set(self._all, ordinal)
+        return ordinal
+
+    def add_place(self, place_id):
+        """Add a place, giving it a key if it has none yet."""
+        with self._lock:
+            self._ordinal(place_id)
+
+    def discard_place(self, place_id):
+        with self._lock:
+            ordinal = self._keys.get(place_id)
+            if ordinal is None or not _test(self._all, ordinal):
+                return
+            self._count -= 1
+            _clear(self._all, ordinal)
+            for tag in self._tags.pop(place_id, ()):
+                self._unset(tag, ordinal)
+        if self._own_keys:
+            self._keys.discard(place_id)
+
+    def link(self, place_id, tag):
+        with self._lock:
+            _set(self._bitmaps.setdefault(tag, {}), self._ordinal(place_id))
+            self._tags.setdefault(place_id, set()).add(tag)
+
+    def unlink(self, place_id, tag):
+        with self._lock:
+            tags = self._tags.get(place_id)
+            if not tags or tag not in tags:
+                return
+            tags.discard(tag)
+            self._unset(tag, self._keys.get(place_id))
+
+    def _unset(self, tag, ordinal):
+        bitmap = self._bitmaps[tag]
+        _clear(bitmap, ordinal)
+        if not bitmap:
+            del self._bitmaps[tag]
+
+    def _remap(self, remap):
+        """Move every bit to its key after compaction (lock held)."""
+        def moved(bitmap):
+            result = {}
+            for chunk, bits in bitmap.items():
+                offset = chunk * CHUNK_BITS
+                for bit in iter_bits(bits):
+                    if remap[offset + bit] >= 0:
+                        _set(result, remap[offset + bit])
+            return result
+
+        self._all = moved(self._all)
+        self._bitmaps = {tag: moved(bitmap)
+                         for tag, bitmap in self._bitmaps.items()}
+
+    def _match(self, tags):
+        """Bitmap of the places having every tag (all places if none)."""
+        if not tags:
+            return self._all
+        bitmaps = sorted((self._bitmaps.get(tag, {}) for tag in set(tags)),
+                         key=len)
+        result = {}
+        for chunk, bits in bitmaps[0].items():
+            for bitmap in bitmaps[1:]:
+                bits &= bitmap.get(chunk, 0)
+                if not bits:
+                    break
+            else:
+                result[chunk] = bits
+        return result
+
+    def match(self, tags, limit=None, after=None):
+        """
+        Ids of the places having every tag, in insertion order, after the
+        place `after`. Raises KeyError if `after` was never added.
+        """
+        with self._lock:
+            start = -1
+            if after is not None:
+                start = self._keys.position(after)
+                if start is None:
+                    raise KeyError(after)
+            result = self._match(tags)
+            place_id = self._keys.id
+            found = []
+            for chunk in sorted(result):
+                offset = chunk * CHUNK_BITS
+                if offset + CHUNK_BITS <= start:
+                    continue
+                bits = result[chunk]
+                if start >= offset:
+                    # Drop the bits up to and including `after`
+                    bits &= -1 << (start - offset + 1)
+                for bit in iter_bits(bits):
+                    found.append(place_id(offset + bit))
+                    if len(found) == limit:
+                        return found
+            return found
+
+    def facets(self, tags=()):
+        """
+        (count, {tag: count}) of the places having every tag in `tags`:
+        how many there are, and how many of them have each tag.
+        """
+        with self._lock:
+            result = self._match(tags)
+            counts = {}
+            for tag, bitmap in self._bitmaps.items():
+                count = 0
+                for chunk, bits in result.items():
+                    other = bitmap.get(chunk)
+                    if other:
+                        count += (bits & other).bit_count()
+                if count:
+                    counts[tag] = count
+            return sum(bits.bit_count() for bits in result.values()), counts
@@ -0,0 +1,155 @@
+import math
+import threading
+
+MAX_MERCATOR_LATITUDE = 85.05112878
+
+
+def tile_of(lat, lon, zoom):
+    """Web Mercator tile (x, y) containing a point at a zoom level."""
+    n = 1 << zoom
+    lat = max(-MAX_MERCATOR_LATITUDE, min(MAX_MERCATOR_LATITUDE, lat))
+    x = int((lon + 180.0) / 360.0 * n)
+    phi = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(phi)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+class _Node:
+    """Aggregates of the places inside one tile."""
+
+    __slots__ = ('count', 'lat_sum', 'lon_sum', 'min_price', 'max_price')
+
+    def __init__(self):
+        self.count = 0
+        self.lat_sum = 0.0
+        self.lon_sum = 0.0
+        self.min_price = math.inf
+        self.max_price = -math.inf
+
+    def add(self, lat, lon, price):
+        self.count += 1
+        self.lat_sum += lat
+        self.lon_sum += lon
+        self.min_price = min(self.min_price, price)
+        self.max_price = max(self.max_price, price)
+
+    def to_dict(self):
+        return {'count': self.count,
+                'latitude': self.lat_sum / self.count,
+                'longitude': self.lon_sum / self.count,
+                'min_price': self.min_price,
+                'max_price': self.max_price}
+
+
+class ClusterIndex:
+    """
+    Quadtree of Web Mercator tiles, one level per zoom, each node holding
+    the count, coordinate sums (for the centroid) and price range of the
+    places below it.
+
+    Inserting a place updates one node per level. Removing one updates
+    the same path; min/max prices are then recomputed from at most four
+    children per level, and from the few places of the leaf tile. A
+    cluster query reads the nodes of a single level, so its cost
+    follows the number of visible cells and not the number of places.
+    """
+
+    def __init__(self, max_zoom=14):
+        self.max_zoom = max_zoom
+        # zoom -> {(x, y): _Node}
+        self._levels = [{} for _ in range(max_zoom + 1)]
+        # leaf tile -> {place_id: (lat, lon, price)}
+        self._leaves = {}
+        # place_id -> (lat, lon, price, leaf tile)
+        self._places = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._places)
+
+    def add(self, obj_id, lat, lon, price):
+        """Index a place, moving it if it was already indexed."""
+        with self._lock:
+            self._discard(obj_id)
+            leaf = tile_of(lat, lon, self.max_zoom)
+            self._leaves.setdefault(leaf, {})[obj_id] = (lat, lon, price)
+            self._places[obj_id] = (lat, lon, price, leaf)
+            x, y = leaf
+            for zoom in range(self.max_zoom, -1, -1):
+                level = self._levels[zoom]
+                node = level.get((x, y))
+                if node is None:
+                    node = level[(x, y)] = _Node()
+                node.add(lat, lon, price)
+                x, y = x >> 1, y >> 1
+
+    def discard(self, obj_id):
+        with self._lock:
+            self._discard(obj_id)
+
+    def _discard(self, obj_id):
+        entry = self._places.pop(obj_id, None)
+        if entry is None:
+            return
+        lat, lon, price, (x, y) = entry
+        members = self._leaves[(x, y)]
+        del members[obj_id]
+        if not members:
+            del self._leaves[(x, y)]
+
+        for zoom in range(self.max_zoom, -1, -1):
+            level = self._levels[zoom]
+            node = level[(x, y)]
+            node.count -= 1
+            if not node.count:
+                del level[(x, y)]
+            else:
+                node.lat_sum -= lat
+                node.lon_sum -= lon
+                if price <= node.min_price or price >= node.max_price:
+                    self._refresh_prices(zoom, x, y, node)
+            x, y = x >> 1, y >> 1
+
+    def _refresh_prices(self, zoom, x, y, node):
+        """Recompute a node's price range from its children or leaf places."""
+        if zoom == self.max_zoom:
+            prices = [price for _, _, price in self._leaves[(x, y)].values()]
+        else:
+            children = self._levels[zoom + 1]
+            prices = []
+            for child in ((2 * x, 2 * y), (2 * x + 1, 2 * y),
+                          (2 * x, 2 * y + 1), (2 * x + 1, 2 * y + 1)):
+                child_node = children.get(child)
+                if child_node is not None:
+                    prices += (child_node.min_price, child_node.max_price)
+        node.min_price = min(prices)
+        node.max_price = max(prices)
+
+    def clusters(self, min_lat, min_lon, max_lat, max_lon, zoom):
+        """
+        Aggregates of the non-empty tiles of `zoom` overlapping a box;
+        `min_lon` > `max_lon` means the box crosses the antimeridian.
+        """
+        zoom = max(0, min(zoom, self.max_zoom))
+        if min_lon <= max_lon:
+            ranges = [(min_lon, max_lon)]
+        else:
+            ranges = [(min_lon, 180.0), (-180.0, max_lon)]
+        found = []
+        with self._lock:
+            level = self._levels[zoom]
+            for low, high in ranges:
+                # Tile rows grow southwards
+                x0, y0 = tile_of(max_lat, low, zoom)
+                x1, y1 = tile_of(min_lat, high, zoom)
+                if (x1 - x0 + 1) * (y1 - y0 + 1) <= len(level):
+                    tiles = ((x, y) for x in range(x0, x1 + 1)
+                             for y in range(y0, y1 + 1) if (x, y) in level)
+                else:
+                    tiles = (tile for tile in level
+                             if x0 <= tile[0] <= x1 and y0 <= tile[1] <= y1)
+                for x, y in tiles:
+                    cluster = level[(x, y)].to_dict()
+                    cluster.update(zoom=zoom, x=x, y=y)
+                    found.append(cluster)
+        return found
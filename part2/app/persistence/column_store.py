@@ -0,0 +1,172 @@
+"""
+Columnar mirror of the places, for vectorized filtering.
+
+Needs NumPy, which is optional: `COLUMNS_AVAILABLE` is False without it
+and the facade then filters through its other indexes instead.
+"""
+
+import threading
+
+from app.persistence.surrogate_keys import SurrogateKeys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+COLUMNS_AVAILABLE = np is not None
+
+
+def box_mask(latitude, longitude, box):
+    """
+    Mask of the points inside `box` (min_lat, min_lon, max_lat, max_lon),
+    which crosses the antimeridian when min_lon > max_lon.
+    """
+    min_lat, min_lon, max_lat, max_lon = box
+    mask = (latitude >= min_lat) & (latitude <= max_lat)
+    if min_lon <= max_lon:
+        return mask & (longitude >= min_lon) & (longitude <= max_lon)
+    return mask & ((longitude >= min_lon) | (longitude <= max_lon))
+
+
+class PlaceColumns:
+    """
+    Place attributes in contiguous NumPy arrays, one slot per place:
+    price, latitude, longitude, average rating, review count and an
+    integer ordinal of the owner. The slot of a place is its key in a
+    SurrogateKeys map, shared with the other indexes keyed by integers.
+
+    A combined filter (price range, bounding box, minimum rating, owner)
+    is a handful of vectorized comparisons ANDed into one boolean mask,
+    so it costs a few passes at C speed over the arrays instead of a
+    Python loop over the places. Deleted places are masked out until
+    the keys are compacted, which moves the live slots down and frees
+    the others for new places; the arrays double when full.
+    """
+
+    COLUMNS = (('price', 'f8'), ('latitude', 'f8'), ('longitude', 'f8'),
+               ('rating', 'f8'), ('reviews', 'i4'), ('owner', 'i4'))
+
+    def __init__(self, capacity=1024, keys=None):
+        if np is None:
+            raise RuntimeError("PlaceColumns needs NumPy.")
+        self._columns = {name: np.zeros(capacity, dtype)
+                         for name, dtype in self.COLUMNS}
+        self._alive = np.zeros(capacity, bool)
+        # place_id <-> slot
+        self._own_keys = keys is None
+        self._keys = SurrogateKeys() if keys is None else keys
+        self._count = 0
+        # One past the highest slot in use
+        self._size = 0
+        # owner_id -> ordinal
+        self._owners = {}
+        self._lock = threading.Lock()
+        self._keys.attach(self)
+
+    def __len__(self):
+        return self._count
+
+    def _grow(self, slot):
+        capacity = len(self._alive)
+        while capacity <= slot:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, column.dtype)
+            grown[:len(column)] = column
+            self._columns[name] = grown
+        alive = np.zeros(capacity, bool)
+        alive[:len(self._alive)] = self._alive
+        self._alive = alive
+
+    def _slot(self, place_id):
+        slot = self._keys.key(place_id)
+        if slot >= len(self._alive):
+            self._grow(slot)
+        if not self._alive[slot]:
+            self._alive[slot] = True
+            self._count += 1
+            self._size = max(self._size, slot + 1)
+            self._columns['rating'][slot] = 0.0
+            self._columns['reviews'][slot] = 0
+        return slot
+
+    def _live_slot(self, place_id):
+        slot = self._keys.get(place_id)
+        if slot is None or slot >= self._size or not self._alive[slot]:
+            return None
+        return slot
+
+    def _owner(self, owner_id):
+        return self._owners.setdefault(owner_id, len(self._owners))
+
+    def add(self, place_id, price, latitude, longitude, owner_id):
+        """Store a place, or update it, keeping its rating."""
+        with self._lock:
+            slot = self._slot(place_id)
+            columns = self._columns
+            columns['price'][slot] = price
+            columns['latitude'][slot] = latitude
+            columns['longitude'][slot] = longitude
+            columns['owner'][slot] = self._owner(owner_id)
+
+    def set_rating(self, place_id, count, average):
+        with self._lock:
+            slot = self._live_slot(place_id)
+            if slot is not None:
+                self._columns['reviews'][slot] = count
+                self._columns['rating'][slot] = average
+
+    def discard(self, place_id):
+        with self._lock:
+            slot = self._live_slot(place_id)
+            if slot is None:
+                return
+            self._alive[slot] = False
+            self._count -= 1
+        if self._own_keys:
+            self._keys.discard(place_id)
+
+    def _remap(self, remap):
+        """Move the live slots to their keys after compaction (lock held)."""
+        size = self._size
+        remap = np.asarray(remap[:size], np.int64)
+        kept = np.flatnonzero(self._alive[:size] & (remap >= 0))
+        slots = remap[kept]
+        for column in self._columns.values():
+            column[slots] = column[kept]
+        self._alive[:] = False
+        self._alive[slots] = True
+        self._count = len(slots)
+        self._size = int(slots[-1]) + 1 if len(slots) else 0
+
+    def filter(self, min_price=None, max_price=None, box=None,
+               min_rating=None, owner_id=None, limit=None):
+        """
+        (count, ids) of the places matching every given predicate:
+        min_price <= price <= max_price, inside `box` (min_lat, min_lon,
+        max_lat, max_lon, min_lon > max_lon crossing the antimeridian),
+        average rating >= min_rating, owned by owner_id. `ids` holds
+        the first `limit` matches in slot order.
+        """
+        with self._lock:
+            size = self._size
+            columns = {name: column[:size]
+                       for name, column in self._columns.items()}
+            mask = self._alive[:size].copy()
+            if min_price is not None:
+                mask &= columns['price'] >= min_price
+            if max_price is not None:
+                mask &= columns['price'] <= max_price
+            if box is not None:
+                mask &= box_mask(columns['latitude'], columns['longitude'],
+                                 box)
+            if min_rating is not None:
+                mask &= columns['rating'] >= min_rating
+            if owner_id is not None:
+                owner = self._owners.get(owner_id)
+                if owner is None:
+                    return 0, []
+                mask &= columns['owner'] == owner
+            slots = np.flatnonzero(mask)
+            return len(slots), self._keys.ids(slots[:limit].tolist())
@@ -0,0 +1,399 @@
+import json
+import threading
+from types import SimpleNamespace
+
+from app.persistence.association import AssociationStore
+from app.persistence.binary_snapshot import (
+    BinarySnapshot, is_binary_snapshot, schema_for, write_snapshot)
+from app.persistence.journal import Journal
+from app.persistence.repository import (
+    DuplicateEntryError, InMemoryRepository, check_version, order_key)
+from app.persistence.schema import FIELDS, dump, load, to_record, from_record
+
+
+class _Snapshotter:
+    """Background thread taking a snapshot every `interval` seconds."""
+
+    def __init__(self, store, interval):
+        self._store = store
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name=f'snapshot-{store.journal.name}')
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            if self._store.mutations_since_snapshot:
+                self._store.snapshot()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+class DurableRepository(InMemoryRepository):
+    """
+    InMemoryRepository whose mutations are appended to a Journal.
+
+    Reads never touch the disk and writes only queue a log entry, so the
+    in-memory speed is kept. On construction the repository replays the
+    last snapshot plus the log written after it. With a
+    `snapshot_interval`, a background thread snapshots the state (which
+    also compacts the log), so restart time follows the data size rather
+    than the length of the history.
+    """
+
+    def __init__(self, model, directory, name=None, indexes=(), unique=(),
+                 sync=False, snapshot_interval=None):
+        super().__init__(indexes=indexes, unique=unique)
+        self.model = model
+        self.journal = Journal(directory, name or model.__name__.lower(),
+                               sync=sync)
+        self.mutations_since_snapshot = 0
+        self._replay()
+        self._snapshotter = None
+        if snapshot_interval:
+            self._snapshotter = _Snapshotter(self, snapshot_interval)
+
+    def _replay(self):
+        snapshot_entries, log_entries = self.journal.load()
+        for record in snapshot_entries:
+            super().add(load(self.model, record))
+        for entry in log_entries:
+            if entry['op'] == 'put':
+                super().add(load(self.model, entry['record']))
+            elif entry['op'] == 'del':
+                super().delete(entry['id'])
+
+    # Writes apply and queue their journal entry under the lock, then
+    # wait for the fsync outside of it, so that concurrent writers share
+    # one group commit
+
+    def _log(self, entry):
+        """Queue `entry`; returns the seq to pass to _commit()."""
+        self.mutations_since_snapshot += 1
+        return self.journal.append(entry, wait=False)
+
+    def _commit(self, seq):
+        """With `sync`, wait until the entry `seq` is on disk."""
+        if seq is not None and self.journal.sync:
+            self.journal.wait(seq)
+
+    def _add(self, obj):
+        super().add(obj)
+        return self._log({'op': 'put', 'record': dump(obj)})
+
+    def _delete(self, obj_id):
+        if obj_id not in self._storage:
+            return None
+        super().delete(obj_id)
+        return self._log({'op': 'del', 'id': obj_id})
+
+    def add(self, obj):
+        with self._lock:
+            seq = self._add(obj)
+        self._commit(seq)
+
+    def update(self, obj_id, data, expected_version=None):
+        seq = None
+        try:
+            with self._lock:
+                obj = self.get(obj_id)
+                if obj:
+                    check_version(obj, expected_version)
+                changed = False
+                try:
+                    updated = super().update(obj_id, data)
+                    changed = updated is not None
+                    return updated
+                except DuplicateEntryError:
+                    # Refused before any attribute changed
+                    raise
+                except Exception:
+                    # A failed validation may still have changed some
+                    # attributes
+                    changed = obj is not None
+                    raise
+                finally:
+                    if changed:
+                        seq = self._log({'op': 'put', 'record': dump(obj)})
+        finally:
+            self._commit(seq)
+
+    def delete(self, obj_id):
+        with self._lock:
+            seq = self._delete(obj_id)
+        self._commit(seq)
+
+    def snapshot(self):
+        """Write a snapshot of the current state and compact the log."""
+        with self._lock:
+            segment = self.journal.rotate()
+            records = [dump(obj) for obj in self._storage.values()]
+            self.mutations_since_snapshot = 0
+        self.journal.write_snapshot(segment, records)
+
+    def close(self):
+        if self._snapshotter:
+            self._snapshotter.stop()
+        self.journal.close()
+
+
+class DurableAssociationStore(AssociationStore):
+    """AssociationStore whose links are journaled like DurableRepository."""
+
+    def __init__(self, directory, name, sync=False, snapshot_interval=None):
+        super().__init__()
+        self.journal = Journal(directory, name, sync=sync)
+        self.mutations_since_snapshot = 0
+        snapshot_entries, log_entries = self.journal.load()
+        for left_id, right_id in snapshot_entries:
+            super().link(left_id, right_id)
+        for entry in log_entries:
+            if entry['op'] == 'link':
+                super().link(entry['left'], entry['right'])
+            elif entry['op'] == 'unlink':
+                super().unlink(entry['left'], entry['right'])
+        self._snapshotter = None
+        if snapshot_interval:
+            self._snapshotter = _Snapshotter(self, snapshot_interval)
+
+    def _change(self, op, change, left_id, right_id):
+        # Like DurableRepository, wait for the fsync outside of the lock
+        with self._lock:
+            changed = change(left_id, right_id)
+            seq = None
+            if changed:
+                seq = self.journal.append(
+                    {'op': op, 'left': left_id, 'right': right_id},
+                    wait=False)
+                self.mutations_since_snapshot += 1
+        if seq is not None and self.journal.sync:
+            self.journal.wait(seq)
+        return changed
+
+    def link(self, left_id, right_id):
+        return self._change('link', super().link, left_id, right_id)
+
+    def unlink(self, left_id, right_id):
+        return self._change('unlink', super().unlink, left_id, right_id)
+
+    def snapshot(self):
+        with self._lock:
+            segment = self.journal.rotate()
+            pairs = [[left_id, right_id]
+                     for left_id, rights in self._left.items()
+                     for right_id in rights]
+            self.mutations_since_snapshot = 0
+        self.journal.write_snapshot(segment, pairs)
+
+    def close(self):
+        if self._snapshotter:
+            self._snapshotter.stop()
+        self.journal.close()
+
+
+class MappedDurableRepository(DurableRepository):
+    """
+    DurableRepository writing binary snapshots and serving them via mmap.
+
+    On boot the snapshot is only mapped: an entity is deserialized into a
+    model instance the first time get() reaches it, and entities written
+    or deleted after the snapshot shadow their mapped record. Index and
+    unique-constraint entries of cold entities are built from the mapped
+    fields, without hydrating any model, by the first scan_fields() or
+    the first operation that needs them. Building them still decodes
+    every record once: the work saved is the model construction, not
+    the pass over the entities.
+    """
+
+    def __init__(self, model, directory, name=None, indexes=(), unique=(),
+                 sync=False, snapshot_interval=None):
+        self._cold = None
+        self._deleted = set()
+        self._indexes_ready = False
+        super().__init__(model, directory, name=name, indexes=indexes,
+                         unique=unique, sync=sync,
+                         snapshot_interval=snapshot_interval)
+
+    @staticmethod
+    def _read_snapshot(path):
+        if is_binary_snapshot(path):
+            snapshot = BinarySnapshot(path)
+            return snapshot.segment, snapshot
+        # Snapshot left by a previous run using the JSON format
+        with open(path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+        return snapshot['segment'], snapshot['entries']
+
+    def _replay(self):
+        snapshot, log_entries = self.journal.load(
+            read_snapshot=self._read_snapshot)
+        if isinstance(snapshot, BinarySnapshot):
+            self._cold = snapshot
+        else:
+            for record in snapshot:
+                obj = load(self.model, record)
+                self._storage[obj.id] = obj
+        for entry in log_entries:
+            if entry['op'] == 'put':
+                obj = load(self.model, entry['record'])
+                self._storage[obj.id] = obj
+                self._deleted.discard(obj.id)
+            elif entry['op'] == 'del':
+                self._storage.pop(entry['id'], None)
+                if self._cold is not None:
+                    self._deleted.add(entry['id'])
+
+    def _index_attrs(self):
+        attrs = {'created_at'}.union(self._indexes)
+        for constraint in self._constraints.values():
+            attrs.update(constraint.attrs)
+        return attrs
+
+    def _cold_fields(self, attrs):
+        """(id, {attr: value}) of the cold entities still current."""
+        for number, obj_id in self._cold.ids():
+            if obj_id not in self._storage and obj_id not in self._deleted:
+                yield obj_id, self._cold.fields(number, attrs)
+
+    def _index_cold(self, obj_id, fields):
+        self._index_entry(obj_id, fields.get)
+        self._order.insert((fields['created_at'], obj_id))
+
+    def _index_hot(self):
+        for obj in self._storage.values():
+            self._reindex(obj)
+            self._order.insert(order_key(obj))
+        self._indexes_ready = True
+
+    def _ensure_indexes(self):
+        """Build index entries and order keys for every entity on first use."""
+        if self._indexes_ready:
+            return
+        with self._lock:
+            if self._indexes_ready:
+                return
+            if self._cold is not None:
+                for obj_id, fields in self._cold_fields(self._index_attrs()):
+                    self._index_cold(obj_id, fields)
+            self._index_hot()
+
+    def _hydrate_all(self):
+        if self._cold is None:
+            return
+        with self._lock:
+            for number, obj_id in self._cold.ids():
+                if obj_id not in self._storage and obj_id not in self._deleted:
+                    self._storage[obj_id] = from_record(
+                        self.model, self._cold.record(number))
+
+    def _is_indexed(self, attr_name):
+        if attr_name in self._indexes:
+            return True
+        return any(c.attrs == (attr_name,) and c.normalize is None
+                   for c in self._constraints.values())
+
+    def get(self, obj_id):
+        obj = self._storage.get(obj_id)
+        if obj is not None or self._cold is None or obj_id in self._deleted:
+            return obj
+        with self._lock:
+            obj = self._storage.get(obj_id)
+            if obj is None and obj_id not in self._deleted:
+                record = self._cold.get(obj_id)
+                if record is not None:
+                    obj = from_record(self.model, record)
+                    self._storage[obj_id] = obj
+            return obj
+
+    def get_all(self):
+        self._hydrate_all()
+        return super().get_all()
+
+    def scan_fields(self, attrs):
+        """
+        Hot models as they are, cold records as their mapped `attrs`.
+        The first scan also builds the index entries from the records it
+        decodes, so that the first write does not walk them again.
+        """
+        with self._lock:
+            found = list(self._storage.values())
+            build = not self._indexes_ready
+            if self._cold is not None:
+                if build:
+                    attrs = self._index_attrs().union(attrs)
+                for obj_id, fields in self._cold_fields(attrs):
+                    if build:
+                        self._index_cold(obj_id, fields)
+                    found.append(SimpleNamespace(id=obj_id, **fields))
+            if build:
+                self._index_hot()
+        return found
+
+    def _add(self, obj):
+        seq = super()._add(obj)
+        self._deleted.discard(obj.id)
+        return seq
+
+    def _delete(self, obj_id):
+        # get() hydrates a cold entity, so that it can be deleted
+        if self.get(obj_id) is None:
+            return None
+        seq = super()._delete(obj_id)
+        if self._cold is not None:
+            self._deleted.add(obj_id)
+        return seq
+
+    def add(self, obj):
+        self._ensure_indexes()
+        super().add(obj)
+
+    def update(self, obj_id, data, expected_version=None):
+        self._ensure_indexes()
+        return super().update(obj_id, data, expected_version)
+
+    def delete(self, obj_id):
+        self._ensure_indexes()
+        super().delete(obj_id)
+
+    def page(self, limit, after=None):
+        self._ensure_indexes()
+        return super().page(limit, after)
+
+    def find_unique(self, constraint_name, *values):
+        self._ensure_indexes()
+        return super().find_unique(constraint_name, *values)
+
+    def get_by_attribute(self, attr_name, attr_value):
+        self._ensure_indexes()
+        if not self._is_indexed(attr_name):
+            self._hydrate_all()
+        return super().get_by_attribute(attr_name, attr_value)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        self._ensure_indexes()
+        if not self._is_indexed(attr_name):
+            self._hydrate_all()
+        return super().get_all_by_attribute(attr_name, attr_value)
+
+    def snapshot(self):
+        """Write a binary snapshot without hydrating cold entities."""
+        with self._lock:
+            segment = self.journal.rotate()
+            records = [to_record(obj) for obj in self._storage.values()]
+            if self._cold is not None:
+                for number, obj_id in self._cold.ids():
+                    if obj_id not in self._storage and \
+                            obj_id not in self._deleted:
+                        records.append(self._cold.record(number))
+            self.mutations_since_snapshot = 0
+        schema = schema_for(FIELDS[self.model])
+        self.journal.commit_snapshot(
+            segment, lambda f: write_snapshot(f, schema, segment, records))
+
+    def close(self):
+        super().close()
+        if self._cold is not None:
+            self._cold.close()
@@ -0,0 +1,140 @@
+import heapq
+import math
+import threading
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points, in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = (math.sin(dphi / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoIndex:
+    """
+    Uniform latitude/longitude grid of points.
+
+    Each point is stored in the cell (floor(lat / cell), floor(lon / cell)).
+    A box query visits only the cells overlapping the box, or only the
+    non-empty cells when there are fewer of them, so its cost follows
+    the area searched and the local density rather than the total
+    number of points. Longitude ranges crossing the antimeridian are
+    split in two.
+    """
+
+    def __init__(self, cell_degrees=0.1):
+        self.cell_degrees = cell_degrees
+        # (row, col) -> {obj_id: (lat, lon)}
+        self._cells = {}
+        # obj_id -> (lat, lon)
+        self._points = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._points)
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.cell_degrees),
+                math.floor(lon / self.cell_degrees))
+
+    def add(self, obj_id, lat, lon):
+        """Index a point, moving it if it was already indexed."""
+        with self._lock:
+            self._discard(obj_id)
+            self._cells.setdefault(self._cell(lat, lon), {})[obj_id] = (lat, lon)
+            self._points[obj_id] = (lat, lon)
+
+    def discard(self, obj_id):
+        with self._lock:
+            self._discard(obj_id)
+
+    def get(self, obj_id):
+        """(lat, lon) of an indexed point, or None."""
+        return self._points.get(obj_id)
+
+    def _discard(self, obj_id):
+        point = self._points.pop(obj_id, None)
+        if point is not None:
+            cell = self._cell(*point)
+            members = self._cells[cell]
+            del members[obj_id]
+            if not members:
+                del self._cells[cell]
+
+    def _scan(self, min_lat, min_lon, max_lat, max_lon):
+        """Points in a box whose longitude range does not wrap."""
+        row0, col0 = self._cell(min_lat, min_lon)
+        row1, col1 = self._cell(max_lat, max_lon)
+        if (row1 - row0 + 1) * (col1 - col0 + 1) <= len(self._cells):
+            cells = [self._cells.get((row, col))
+                     for row in range(row0, row1 + 1)
+                     for col in range(col0, col1 + 1)]
+        else:
+            cells = [members for (row, col), members in self._cells.items()
+                     if row0 <= row <= row1 and col0 <= col <= col1]
+        found = []
+        for members in cells:
+            if members:
+                for obj_id, (lat, lon) in members.items():
+                    if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon:
+                        found.append((obj_id, lat, lon))
+        return found
+
+    def _box(self, min_lat, min_lon, max_lat, max_lon):
+        if min_lon <= max_lon:
+            ranges = [(min_lon, max_lon)]
+        else:
+            ranges = [(min_lon, 180.0), (-180.0, max_lon)]
+        with self._lock:
+            return [point for low, high in ranges
+                    for point in self._scan(min_lat, low, max_lat, high)]
+
+    @staticmethod
+    def _nearest(lat, lon, points, limit, max_distance=None):
+        ranked = ((haversine_km(lat, lon, p_lat, p_lon), obj_id)
+                  for obj_id, p_lat, p_lon in points)
+        if max_distance is not None:
+            ranked = (item for item in ranked if item[0] <= max_distance)
+        if limit is None:
+            return sorted(ranked)
+        return heapq.nsmallest(limit, ranked)
+
+    def within_box(self, min_lat, min_lon, max_lat, max_lon, limit=None):
+        """
+        (distance_km, id) of the points inside a box, nearest to its
+        centre first. `min_lon` > `max_lon` means the box crosses the
+        antimeridian.
+        """
+        center_lat = (min_lat + max_lat) / 2
+        center_lon = (min_lon + max_lon) / 2
+        if min_lon > max_lon:
+            center_lon = (center_lon + 360) % 360 - 180
+        return self._nearest(center_lat, center_lon,
+                             self._box(min_lat, min_lon, max_lat, max_lon),
+                             limit)
+
+    def within_radius(self, lat, lon, radius_km, limit=None):
+        """(distance_km, id) of the points within `radius_km`, nearest first."""
+        dlat = radius_km / KM_PER_DEGREE
+        min_lat, max_lat = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+        # Degrees of longitude shrink towards the poles: size the box for
+        # the latitude of the circle farthest from the equator
+        cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+        if cos_lat <= 0 or dlat / cos_lat >= 180:
+            min_lon, max_lon = -180.0, 180.0
+        else:
+            dlon = dlat / cos_lat
+            min_lon, max_lon = lon - dlon, lon + dlon
+            if min_lon < -180:
+                min_lon += 360
+            if max_lon > 180:
+                max_lon -= 360
+        return self._nearest(lat, lon,
+                             self._box(min_lat, min_lon, max_lat, max_lon),
+                             limit, max_distance=radius_km)
@@ -0,0 +1,215 @@
+import atexit
+import json
+import os
+import re
+import threading
+
+
+class Journal:
+    """
+    Append-only mutation log with snapshots, stored in `directory` as
+
+        <name>.snapshot         last snapshot (JSON: start segment + entries)
+        <name>.log.<segment>    log segments, one JSON entry per line
+
+    Writers only append to an in-memory buffer; a background thread
+    writes and fsyncs whatever accumulated since its last pass, so
+    concurrent writers share one fsync (group commit). `sync=True` makes
+    append() wait until its entry is on disk.
+
+    A snapshot rotates the log to a new segment, and the caller captures
+    its state at that point. Once the snapshot is written, every older
+    segment is deleted. On boot, load() returns the snapshot entries and
+    the entries of every segment written after it.
+    """
+
+    def __init__(self, directory, name, sync=False):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.name = name
+        self.sync = sync
+        self._segment_re = re.compile(re.escape(name) + r'\.log\.(\d+)$')
+        self._snapshot_path = os.path.join(directory, name + '.snapshot')
+
+        self._cond = threading.Condition()
+        self._file_lock = threading.Lock()
+        self._buffer = []
+        self._appended = 0
+        self._flushed = 0
+        self._closed = False
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_segment = 0
+
+        # Always start a fresh segment: a torn line left at the end of the
+        # previous one by a crash must stay the last line of its file
+        segments = self._segments()
+        self._segment = segments[-1] + 1 if segments else 1
+        self._file = open(self._segment_path(self._segment), 'a',
+                          encoding='utf-8')
+        self._sync_directory()
+
+        self._flusher = threading.Thread(target=self._flush_loop,
+                                         name=f'journal-{name}', daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f'{self.name}.log.{segment}')
+
+    def _sync_directory(self):
+        """
+        fsync the directory, so that files created or renamed in it are
+        still there after a crash, not only their fsynced contents.
+        """
+        if os.name != 'posix':
+            return
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _segments(self):
+        segments = []
+        for filename in os.listdir(self.directory):
+            match = self._segment_re.match(filename)
+            if match:
+                segments.append(int(match.group(1)))
+        return sorted(segments)
+
+    def append(self, entry, wait=True):
+        """
+        Queue an entry for the next group commit and return its sequence
+        number. With `sync`, wait until it is on disk, unless `wait` is
+        False: callers holding a lock of their own release it first and
+        then call wait(seq), so that concurrent writers share an fsync.
+        """
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"Journal '{self.name}' is closed.")
+            self._buffer.append(line)
+            self._appended += 1
+            seq = self._appended
+            self._cond.notify_all()
+        if self.sync and wait:
+            self.wait(seq)
+        return seq
+
+    def wait(self, seq=None):
+        """Block until the entry `seq` (default: every entry) is on disk."""
+        with self._cond:
+            seq = self._appended if seq is None else seq
+            self._cond.notify_all()
+            while self._flushed < seq and not self._closed:
+                self._cond.wait()
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while not self._buffer and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._buffer:
+                    return
+            self._flush()
+
+    def _flush(self):
+        with self._file_lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        # The batch is taken and written under the file lock so that a
+        # rotation can never slip in between and reorder entries
+        with self._cond:
+            batch, self._buffer = self._buffer, []
+            target = self._appended
+        if batch:
+            self._file.write(''.join(batch))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        with self._cond:
+            self._flushed = max(self._flushed, target)
+            self._cond.notify_all()
+
+    def rotate(self):
+        """Flush and switch to a new segment; returns its number."""
+        with self._file_lock:
+            self._flush_locked()
+            self._file.close()
+            self._segment += 1
+            self._file = open(self._segment_path(self._segment), 'a',
+                              encoding='utf-8')
+            self._sync_directory()
+            return self._segment
+
+    def write_snapshot(self, segment, entries):
+        """Persist a snapshot taken right after rotate() returned `segment`."""
+        def write(f):
+            f.write(json.dumps({'segment': segment, 'entries': entries},
+                               separators=(',', ':')).encode('utf-8'))
+        self.commit_snapshot(segment, write)
+
+    def commit_snapshot(self, segment, write):
+        """
+        Atomically replace the snapshot with what `write(f)` produces in a
+        binary file, then delete the segments the snapshot covers.
+        """
+        with self._snapshot_lock:
+            # An older snapshot finishing late must not replace a newer one
+            # whose compaction already removed the segments it relies on
+            if segment <= self._snapshot_segment:
+                return
+            tmp_path = self._snapshot_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._snapshot_path)
+            # The rename must be durable before the segments it replaces
+            # are removed
+            self._sync_directory()
+            self._snapshot_segment = segment
+            for old in self._segments():
+                if old < segment:
+                    os.remove(self._segment_path(old))
+
+    def load(self, read_snapshot=None):
+        """
+        Return (snapshot entries, log entries written after it).
+
+        `read_snapshot(path)` returns (segment, entries) for snapshots
+        not written by write_snapshot().
+        """
+        snapshot_entries, start = [], 0
+        if os.path.exists(self._snapshot_path):
+            if read_snapshot is not None:
+                start, snapshot_entries = read_snapshot(self._snapshot_path)
+            else:
+                with open(self._snapshot_path, encoding='utf-8') as f:
+                    snapshot = json.load(f)
+                snapshot_entries, start = snapshot['entries'], snapshot['segment']
+            self._snapshot_segment = start
+        log_entries = []
+        for segment in self._segments():
+            if segment < start:
+                continue
+            with open(self._segment_path(segment), encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        log_entries.append(json.loads(line))
+                    except ValueError:
+                        # Torn write at the tail of a segment after a crash
+                        break
+        return snapshot_entries, log_entries
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        self._flush()
+        with self._file_lock:
+            self._file.close()
+        atexit.unregister(self.close)
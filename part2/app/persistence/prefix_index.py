@@ -0,0 +1,73 @@
+import threading
+
+from app.persistence.sorted_index import SortedIndex
+from app.persistence.text_index import fold
+
+# Sorts after any character a folded term can contain
+_MAX_CHAR = '\U0010ffff'
+
+
+def normalize_prefix(text):
+    """Folded text with runs of whitespace collapsed to one space."""
+    return ' '.join(fold(text).split())
+
+
+class PrefixIndex:
+    """
+    Type-ahead index: (term, id) keys in a SortedIndex, where every id
+    can have a few normalized terms (a full name, a last name, an email).
+
+    The keys starting with a prefix are contiguous, so completing a
+    prefix is two binary searches and a slice of at most
+    `limit * terms per id` keys, whatever the number of entries.
+    """
+
+    def __init__(self):
+        self._keys = SortedIndex()
+        # obj_id -> tuple of its terms
+        self._terms = {}
+        self._max_terms = 1
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._terms)
+
+    def add(self, obj_id, *terms):
+        """Index an id under some terms, replacing its previous ones."""
+        terms = tuple({normalize_prefix(t) for t in terms if t} - {''})
+        with self._lock:
+            self._discard(obj_id)
+            for term in terms:
+                self._keys.insert((term, obj_id))
+            self._terms[obj_id] = terms
+            self._max_terms = max(self._max_terms, len(terms))
+
+    def discard(self, obj_id):
+        with self._lock:
+            self._discard(obj_id)
+
+    def _discard(self, obj_id):
+        for term in self._terms.pop(obj_id, ()):
+            self._keys.remove((term, obj_id))
+
+    def complete(self, prefix, limit=10):
+        """
+        Up to `limit` ids with a term starting with `prefix`, ordered by
+        their first matching term.
+        """
+        prefix = normalize_prefix(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            keys = self._keys.range((prefix,), (prefix + _MAX_CHAR,),
+                                    inclusive=(False, False),
+                                    limit=limit * self._max_terms)
+        found = []
+        seen = set()
+        for _, obj_id in keys:
+            if obj_id not in seen:
+                seen.add(obj_id)
+                found.append(obj_id)
+                if len(found) == limit:
+                    break
+        return found
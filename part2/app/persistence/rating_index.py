@@ -0,0 +1,105 @@
+import threading
+
+from app.persistence.sorted_index import OrderedIndex
+
+RATINGS = range(1, 6)
+
+
+class RatingIndex:
+    """
+    Review aggregates of every place: count, sum and a histogram of the
+    1-5 ratings, updated in O(1) when a review is added, changed or
+    removed, plus an OrderedIndex of the averages for sorting.
+
+    Places without reviews are ordered with an average of 0, below any
+    real rating.
+    """
+
+    def __init__(self):
+        # place_id -> [count, sum, ratings of 1, ..., ratings of 5]
+        self._stats = {}
+        self._averages = OrderedIndex()
+        # review count -> number of places with that many reviews
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._stats)
+
+    def add_place(self, place_id):
+        """Track a place, keeping its aggregates if already tracked."""
+        with self._lock:
+            if place_id not in self._stats:
+                self._stats[place_id] = [0] * 7
+                self._averages.add(place_id, 0.0)
+                self._count(0, 1)
+
+    def discard_place(self, place_id):
+        with self._lock:
+            stats = self._stats.pop(place_id, None)
+            if stats is not None:
+                self._count(stats[0], -1)
+            self._averages.discard(place_id)
+
+    def add(self, place_id, rating):
+        """Count a new review of a place."""
+        with self._lock:
+            self._apply(place_id, rating, 1)
+
+    def remove(self, place_id, rating):
+        """Uncount a deleted review of a place."""
+        with self._lock:
+            self._apply(place_id, rating, -1)
+
+    def change(self, place_id, old_rating, new_rating):
+        """Move a review of a place from one rating to another."""
+        if old_rating != new_rating:
+            with self._lock:
+                self._apply(place_id, old_rating, -1)
+                self._apply(place_id, new_rating, 1)
+
+    def _apply(self, place_id, rating, sign):
+        stats = self._stats.get(place_id)
+        if stats is None:
+            stats = self._stats[place_id] = [0] * 7
+            self._count(0, 1)
+        self._count(stats[0], -1)
+        stats[0] += sign
+        self._count(stats[0], 1)
+        stats[1] += sign * rating
+        stats[1 + rating] += sign
+        self._averages.add(place_id, stats[1] / stats[0] if stats[0] else 0.0)
+
+    def _count(self, count, sign):
+        places = self._counts.get(count, 0) + sign
+        if places:
+            self._counts[count] = places
+        else:
+            del self._counts[count]
+
+    def max_count(self):
+        """Highest number of reviews of a place (0 when none)."""
+        with self._lock:
+            # Few distinct counts exist, whatever the number of places
+            return max(self._counts, default=0)
+
+    def get(self, place_id):
+        """Count, average (None when unrated) and histogram of a place."""
+        with self._lock:
+            stats = self._stats.get(place_id) or [0] * 7
+            stats = list(stats)
+        count, total = stats[0], stats[1]
+        return {'count': count,
+                'average': total / count if count else None,
+                'histogram': {str(r): stats[1 + r] for r in RATINGS}}
+
+    def summary(self, place_id):
+        """(count, average) of a place, without building a histogram."""
+        with self._lock:
+            stats = self._stats.get(place_id)
+            count, total = (stats[0], stats[1]) if stats else (0, 0)
+        return count, total / count if count else 0.0
+
+    def range(self, after=None, reverse=False, limit=None):
+        """(average, place_id) keys ordered by average; see OrderedIndex."""
+        return self._averages.range(after=after, reverse=reverse, limit=limit)
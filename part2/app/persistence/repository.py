@@ -1,5 +1,70 @@
+import threading
 from abc import ABC, abstractmethod
 
+from app.persistence.sorted_index import SortedIndex
+
+
+class DuplicateEntryError(ValueError):
+    """Raised when a write would violate a unique constraint."""
+
+    def __init__(self, constraint, existing_id):
+        super().__init__(f"Duplicate value for unique constraint "
+                         f"'{constraint.name}'")
+        self.constraint = constraint
+        self.existing_id = existing_id
+
+
+class VersionConflict(ValueError):
+    """Raised when an update expects a version that is no longer current."""
+
+    def __init__(self, current_version):
+        super().__init__("The resource has been modified since it was read.")
+        self.current_version = current_version
+
+
+def check_version(obj, expected_version):
+    """Raise VersionConflict unless `obj` is at `expected_version` (if any)."""
+    if expected_version is not None and obj.version != expected_version:
+        raise VersionConflict(obj.version)
+
+
+def order_key(obj):
+    """Position of an object in paginated listings."""
+    return (obj.created_at, obj.id)
+
+
+def casefold(value):
+    """Normalizer for case- and padding-insensitive string uniqueness."""
+    if isinstance(value, str):
+        return value.strip().casefold()
+    return value
+
+
+class UniqueConstraint:
+    """
+    Uniqueness rule over one or more attributes.
+
+    `normalize` is applied to every value before comparison, e.g.
+    `casefold` to make "WiFi" and "wifi " collide.
+    """
+
+    def __init__(self, *attrs, normalize=None, name=None):
+        if not attrs:
+            raise ValueError("A unique constraint needs at least one attribute.")
+        self.attrs = attrs
+        self.normalize = normalize
+        self.name = name or '_'.join(attrs)
+
+    def key(self, get_value):
+        """Build the hash key from a callable returning each attribute."""
+        values = []
+        for attr in self.attrs:
+            value = get_value(attr)
+            if self.normalize is not None:
+                value = self.normalize(value)
+            values.append(value)
+        return values[0] if len(values) == 1 else tuple(values)
+
 
 class Repository(ABC):
     @abstractmethod
@@ -15,7 +80,12 @@ class Repository(ABC):
         pass
 
     @abstractmethod
-    def update(self, obj_id, data):
+    def update(self, obj_id, data, expected_version=None):
+        """
+        Apply `data` to an object. With `expected_version`, the update is
+        refused with VersionConflict unless the stored object is still at
+        that version; the check and the write are atomic.
+        """
         pass
 
     @abstractmethod
@@ -26,13 +96,70 @@ class Repository(ABC):
     def get_by_attribute(self, attr_name, attr_value):
         pass
 
+    @abstractmethod
+    def get_all_by_attribute(self, attr_name, attr_value):
+        pass
+
+    def page(self, limit, after=None):
+        """
+        Up to `limit` objects in (created_at, id) order, starting after
+        the `after` key. Backends override this with an ordered index so
+        that a page costs O(limit); this fallback sorts everything.
+        """
+        objects = sorted(self.get_all(), key=order_key)
+        if after is not None:
+            objects = [obj for obj in objects if order_key(obj) > after]
+        return objects[:limit]
+
+    def scan_fields(self, attrs):
+        """
+        Every stored object as something with `id` and the attributes
+        `attrs`, for rebuilding derived indexes. Backends that load
+        models lazily override this to read only those fields; this
+        fallback yields the models themselves.
+        """
+        return self.get_all()
+
 
 class InMemoryRepository(Repository):
-    def __init__(self):
+    """
+    Dictionary-backed repository.
+
+    `indexes` lists the attribute names that get a hash index
+    (value -> ids). Lookups on an indexed attribute cost O(1); any other
+    attribute falls back to a linear scan.
+
+    `unique` lists UniqueConstraint objects. They are checked and applied
+    under the repository lock, so two concurrent writers cannot both pass
+    the duplicate check.
+
+    Every object is also kept in a SortedIndex on (created_at, id) for
+    page(); created_at is treated as immutable.
+    """
+
+    def __init__(self, indexes=(), unique=()):
         self._storage = {}
+        self._lock = threading.RLock()
+        # attr -> {value: {obj_id: None}} (dict used as an ordered set)
+        self._indexes = {attr: {} for attr in indexes}
+        self._constraints = {c.name: c for c in unique}
+        # constraint name -> {key: obj_id}
+        self._unique = {name: {} for name in self._constraints}
+        # obj_id -> ({attr: value}, {constraint name: key}) as last indexed,
+        # so stale entries can be removed even when the object was mutated
+        # in place
+        self._indexed_values = {}
+        self._order = SortedIndex()
 
     def add(self, obj):
-        self._storage[obj.id] = obj
+        with self._lock:
+            self._check_unique(obj.id, lambda attr: getattr(obj, attr, None))
+            previous = self._storage.get(obj.id)
+            if previous is not None:
+                self._order.remove(order_key(previous))
+            self._storage[obj.id] = obj
+            self._order.insert(order_key(obj))
+            self._reindex(obj)
 
     def get(self, obj_id):
         return self._storage.get(obj_id)
@@ -40,14 +167,100 @@ class InMemoryRepository(Repository):
     def get_all(self):
         return list(self._storage.values())
 
-    def update(self, obj_id, data):
-        obj = self.get(obj_id)
-        if obj:
-            obj.update(data)
+    def update(self, obj_id, data, expected_version=None):
+        with self._lock:
+            obj = self.get(obj_id)
+            if obj:
+                check_version(obj, expected_version)
+                self._check_unique(obj_id, lambda attr: data[attr]
+                                   if attr in data
+                                   else getattr(obj, attr, None))
+                try:
+                    obj.update(data)
+                finally:
+                    self._reindex(obj)
+            return obj
 
     def delete(self, obj_id):
-        if obj_id in self._storage:
-            del self._storage[obj_id]
+        with self._lock:
+            if obj_id in self._storage:
+                self._unindex(obj_id)
+                self._order.remove(order_key(self._storage.pop(obj_id)))
+
+    def page(self, limit, after=None):
+        # Writers move chunks of _order around while inserting
+        with self._lock:
+            keys = self._order.range(minimum=after, inclusive=(False, True),
+                                     limit=limit)
+            objects = [self.get(obj_id) for _, obj_id in keys]
+        return [obj for obj in objects if obj is not None]
+
+    def find_unique(self, constraint_name, *values):
+        """O(1) probe of a unique constraint; returns the owner or None."""
+        constraint = self._constraints[constraint_name]
+        key = constraint.key(dict(zip(constraint.attrs, values)).get)
+        obj_id = self._unique[constraint_name].get(key)
+        return self.get(obj_id) if obj_id is not None else None
 
     def get_by_attribute(self, attr_name, attr_value):
+        for constraint in self._constraints.values():
+            if constraint.attrs == (attr_name,) and constraint.normalize is None:
+                return self.find_unique(constraint.name, attr_value)
+        if attr_name in self._indexes:
+            ids = self._indexes[attr_name].get(attr_value)
+            if not ids:
+                return None
+            return self.get(next(iter(ids)))
         return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """Every object whose attribute equals the value, in insertion order."""
+        if attr_name in self._indexes:
+            ids = self._indexes[attr_name].get(attr_value, ())
+            return [self.get(obj_id) for obj_id in ids]
+        return [obj for obj in self._storage.values()
+                if getattr(obj, attr_name) == attr_value]
+
+    def _check_unique(self, obj_id, get_value):
+        """Raise DuplicateEntryError if another object owns one of the keys."""
+        for name, constraint in self._constraints.items():
+            owner = self._unique[name].get(constraint.key(get_value))
+            if owner is not None and owner != obj_id:
+                raise DuplicateEntryError(constraint, owner)
+
+    def _reindex(self, obj):
+        """Refresh the index entries of an object after an add or update."""
+        self._index_entry(obj.id, lambda attr: getattr(obj, attr, None))
+
+    def _index_entry(self, obj_id, get_value):
+        """Index an id from a callable returning each attribute value."""
+        if not self._indexes and not self._constraints:
+            return
+        self._unindex(obj_id)
+        values = {}
+        for attr, index in self._indexes.items():
+            value = get_value(attr)
+            index.setdefault(value, {})[obj_id] = None
+            values[attr] = value
+        keys = {}
+        for name, constraint in self._constraints.items():
+            key = constraint.key(get_value)
+            self._unique[name][key] = obj_id
+            keys[name] = key
+        self._indexed_values[obj_id] = (values, keys)
+
+    def _unindex(self, obj_id):
+        """Drop every index entry recorded for an object."""
+        entry = self._indexed_values.pop(obj_id, None)
+        if not entry:
+            return
+        values, keys = entry
+        for attr, value in values.items():
+            ids = self._indexes[attr].get(value)
+            if ids is not None:
+                ids.pop(obj_id, None)
+                if not ids:
+                    del self._indexes[attr][value]
+        for name, key in keys.items():
+            if self._unique[name].get(key) == obj_id:
+                del self._unique[name][key]
@@ -0,0 +1,78 @@
+"""
+Persistent layout of the models.
+
+Storage backends other than InMemoryRepository need to turn a model into
+plain values and back. `FIELDS` lists, per model, the attributes to store
+and their Python type; `id`, `created_at`, `updated_at` and `version` are
+common to every model and handled separately.
+"""
+
+from datetime import datetime
+
+from app.models.basemodel import intern_string
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+
+FIELDS = {
+    User: (('first_name', str), ('last_name', str), ('email', str),
+           ('is_admin', bool)),
+    Place: (('title', str), ('description', str), ('price', float),
+            ('latitude', float), ('longitude', float), ('owner_id', str)),
+    Review: (('text', str), ('rating', int), ('place_id', str),
+             ('user_id', str)),
+    Amenity: (('name', str),),
+}
+
+MODELS = {model.__name__: model for model in FIELDS}
+
+
+def to_record(obj):
+    """Plain dict of the stored attributes of a model instance."""
+    record = {'id': obj.id,
+              'created_at': obj.created_at,
+              'updated_at': obj.updated_at,
+              'version': obj.version}
+    for name, _ in FIELDS[type(obj)]:
+        record[name] = getattr(obj, name)
+    return record
+
+
+def from_record(model, record):
+    """Rebuild a model instance, keeping its stored id, timestamps and version."""
+    kwargs = {}
+    for name, kind in FIELDS[model]:
+        value = record.get(name)
+        kwargs[name] = kind(value) if value is not None else None
+    # Identity first: BaseModel.__init__ then keeps it instead of
+    # generating an id that would be thrown away, and the model's own
+    # constructor still validates the fields
+    obj = model.__new__(model)
+    obj.id = (intern_string(record['id']) if model.REFERENCED
+              else record['id'])
+    obj.created_at = record['created_at']
+    # Share one datetime while the entity was never updated
+    obj.updated_at = (obj.created_at
+                      if record['updated_at'] == obj.created_at
+                      else record['updated_at'])
+    # Records written before versions existed start at 1
+    obj.version = record.get('version') or 1
+    obj.__init__(**kwargs)
+    return obj
+
+
+def dump(obj):
+    """JSON-serializable record of a model instance."""
+    record = to_record(obj)
+    record['created_at'] = record['created_at'].isoformat()
+    record['updated_at'] = record['updated_at'].isoformat()
+    return record
+
+
+def load(model, record):
+    """Inverse of dump()."""
+    record = dict(record)
+    record['created_at'] = datetime.fromisoformat(record['created_at'])
+    record['updated_at'] = datetime.fromisoformat(record['updated_at'])
+    return from_record(model, record)
@@ -0,0 +1,346 @@
+import heapq
+import threading
+from contextlib import contextmanager
+from itertools import islice
+
+from app.persistence.repository import (
+    Repository, DuplicateEntryError, check_version, order_key)
+from app.persistence.sorted_index import SortedIndex
+
+
+class ReadWriteLock:
+    """
+    Many concurrent readers or a single writer.
+
+    Waiting writers block new readers so that a steady read load cannot
+    starve them. The lock is not reentrant.
+    """
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._cond = threading.Condition(self._mutex)
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._mutex:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._mutex:
+            self._readers -= 1
+            if not self._readers and self._waiting_writers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class _Shard:
+    __slots__ = ('lock', 'storage', 'order')
+
+    def __init__(self):
+        self.lock = ReadWriteLock()
+        self.storage = {}
+        # (created_at, id) of every object of the shard, for page()
+        self.order = SortedIndex()
+
+
+class _StripedIndex:
+    """Hash index (key -> ids) split into stripes, each with its own mutex."""
+
+    def __init__(self, stripes):
+        self.locks = [threading.Lock() for _ in range(stripes)]
+        self.maps = [{} for _ in range(stripes)]
+
+    def stripe(self, key):
+        return hash(key) % len(self.maps)
+
+
+class ShardedRepository(Repository):
+    """
+    Thread-safe in-memory repository partitioned by id hash.
+
+    Each shard has its own reader/writer lock, so reads never wait for
+    one another and writes only serialize with operations on the same
+    shard. Secondary indexes and unique constraints are striped by key
+    with one mutex per stripe. A write takes its shard lock first and
+    then the stripes it touches in a fixed order, so concurrent writers
+    cannot deadlock. Unique checks and inserts are atomic.
+
+    get_all() and consistent() give a point-in-time view across every
+    shard; scan() walks the shards one at a time without stopping the
+    world.
+    """
+
+    def __init__(self, shards=16, index_stripes=64, indexes=(), unique=()):
+        self._shards = [_Shard() for _ in range(shards)]
+        self._indexes = {attr: _StripedIndex(index_stripes)
+                         for attr in indexes}
+        self._constraints = {c.name: c for c in unique}
+        self._unique = {name: _StripedIndex(index_stripes)
+                        for name in self._constraints}
+        # obj_id -> ({attr: value}, {constraint name: key}) as last indexed;
+        # only touched while holding the object's shard write lock
+        self._indexed_values = [{} for _ in range(shards)]
+
+    def _shard_number(self, obj_id):
+        return hash(obj_id) % len(self._shards)
+
+    def _shard(self, obj_id):
+        return self._shards[self._shard_number(obj_id)]
+
+    # Index maintenance (caller holds the object's shard write lock)
+
+    def _entries(self, get_value):
+        values = {attr: get_value(attr) for attr in self._indexes}
+        keys = {name: c.key(get_value)
+                for name, c in self._constraints.items()}
+        return values, keys
+
+    def _stripe_ids(self, *entries):
+        """Stripes touched by the given (values, keys) entries."""
+        stripes = set()
+        for entry in entries:
+            if entry is None:
+                continue
+            values, keys = entry
+            for attr, value in values.items():
+                stripes.add((0, attr, self._indexes[attr].stripe(value)))
+            for name, key in keys.items():
+                stripes.add((1, name, self._unique[name].stripe(key)))
+        return stripes
+
+    @contextmanager
+    def _stripes(self, stripes):
+        """Lock the given stripes, always in the same global order."""
+        ordered = []
+        for kind, name, stripe in sorted(stripes):
+            index = self._indexes[name] if kind == 0 else self._unique[name]
+            ordered.append(index.locks[stripe])
+        for lock in ordered:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(ordered):
+                lock.release()
+
+    def _check_unique(self, obj_id, keys):
+        for name, key in keys.items():
+            index = self._unique[name]
+            owner = index.maps[index.stripe(key)].get(key)
+            if owner is not None and owner != obj_id:
+                raise DuplicateEntryError(self._constraints[name], owner)
+
+    def _unindex(self, obj_id, entry):
+        values, keys = entry
+        for attr, value in values.items():
+            index = self._indexes[attr]
+            stripe = index.maps[index.stripe(value)]
+            ids = stripe.get(value)
+            if ids is not None:
+                ids.pop(obj_id, None)
+                if not ids:
+                    del stripe[value]
+        for name, key in keys.items():
+            index = self._unique[name]
+            stripe = index.maps[index.stripe(key)]
+            if stripe.get(key) == obj_id:
+                del stripe[key]
+
+    def _index(self, obj_id, entry):
+        values, keys = entry
+        for attr, value in values.items():
+            index = self._indexes[attr]
+            index.maps[index.stripe(value)].setdefault(value, {})[obj_id] = None
+        for name, key in keys.items():
+            index = self._unique[name]
+            index.maps[index.stripe(key)][key] = obj_id
+
+    def _write_indexes(self, shard_number, obj_id, new_entry):
+        indexed = self._indexed_values[shard_number]
+        old_entry = indexed.get(obj_id)
+        if old_entry:
+            self._unindex(obj_id, old_entry)
+        if new_entry is None:
+            indexed.pop(obj_id, None)
+        else:
+            self._index(obj_id, new_entry)
+            indexed[obj_id] = new_entry
+
+    # Repository interface
+
+    def add(self, obj):
+        number = self._shard_number(obj.id)
+        shard = self._shards[number]
+        with shard.lock.write():
+            entry = self._entries(lambda attr: getattr(obj, attr, None))
+            old_entry = self._indexed_values[number].get(obj.id)
+            with self._stripes(self._stripe_ids(entry, old_entry)):
+                self._check_unique(obj.id, entry[1])
+                previous = shard.storage.get(obj.id)
+                if previous is not None:
+                    shard.order.remove(order_key(previous))
+                shard.storage[obj.id] = obj
+                shard.order.insert(order_key(obj))
+                self._write_indexes(number, obj.id, entry)
+
+    def get(self, obj_id):
+        shard = self._shards[hash(obj_id) % len(self._shards)]
+        # Hot path: no contextmanager overhead
+        lock = shard.lock
+        lock.acquire_read()
+        try:
+            return shard.storage.get(obj_id)
+        finally:
+            lock.release_read()
+
+    def get_all(self):
+        with self.consistent() as objects:
+            return list(objects)
+
+    def update(self, obj_id, data, expected_version=None):
+        number = self._shard_number(obj_id)
+        shard = self._shards[number]
+        with shard.lock.write():
+            obj = shard.storage.get(obj_id)
+            if not obj:
+                return None
+            check_version(obj, expected_version)
+            candidate = self._entries(lambda attr: data[attr] if attr in data
+                                      else getattr(obj, attr, None))
+            old_entry = self._indexed_values[number].get(obj_id)
+            # Setters only validate indexed values, so whatever part of
+            # `data` the object ends up holding lies within these stripes.
+            # They stay locked from the unique check to the index write,
+            # so no concurrent add can claim a key in between.
+            with self._stripes(self._stripe_ids(candidate, old_entry)):
+                self._check_unique(obj_id, candidate[1])
+                try:
+                    obj.update(data)
+                finally:
+                    # Index what the object really holds: a failed
+                    # validation may have applied only part of `data`
+                    self._write_indexes(number, obj_id, self._entries(
+                        lambda attr: getattr(obj, attr, None)))
+            return obj
+
+    def delete(self, obj_id):
+        number = self._shard_number(obj_id)
+        shard = self._shards[number]
+        with shard.lock.write():
+            if obj_id not in shard.storage:
+                return
+            old_entry = self._indexed_values[number].get(obj_id)
+            with self._stripes(self._stripe_ids(old_entry)):
+                shard.order.remove(order_key(shard.storage.pop(obj_id)))
+                self._write_indexes(number, obj_id, None)
+
+    def find_unique(self, constraint_name, *values):
+        """O(1) probe of a unique constraint; returns the owner or None."""
+        constraint = self._constraints[constraint_name]
+        key = constraint.key(dict(zip(constraint.attrs, values)).get)
+        index = self._unique[constraint_name]
+        stripe = index.stripe(key)
+        with index.locks[stripe]:
+            obj_id = index.maps[stripe].get(key)
+        return self.get(obj_id) if obj_id is not None else None
+
+    def _indexed_ids(self, attr_name, attr_value):
+        index = self._indexes[attr_name]
+        stripe = index.stripe(attr_value)
+        with index.locks[stripe]:
+            return list(index.maps[stripe].get(attr_value, ()))
+
+    def get_by_attribute(self, attr_name, attr_value):
+        for constraint in self._constraints.values():
+            if constraint.attrs == (attr_name,) and constraint.normalize is None:
+                return self.find_unique(constraint.name, attr_value)
+        if attr_name in self._indexes:
+            for obj_id in self._indexed_ids(attr_name, attr_value):
+                obj = self.get(obj_id)
+                if obj is not None:
+                    return obj
+            return None
+        return next((obj for obj in self.scan()
+                     if getattr(obj, attr_name) == attr_value), None)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        if attr_name in self._indexes:
+            objects = (self.get(obj_id)
+                       for obj_id in self._indexed_ids(attr_name, attr_value))
+            return [obj for obj in objects if obj is not None]
+        return [obj for obj in self.scan()
+                if getattr(obj, attr_name) == attr_value]
+
+    # Multi-shard iteration
+
+    def page(self, limit, after=None):
+        """
+        Take up to `limit` objects after `after` from every shard and merge
+        them: O(shards * limit), without a global lock.
+        """
+        candidates = []
+        for shard in self._shards:
+            with shard.lock.read():
+                keys = shard.order.range(minimum=after, inclusive=(False, True),
+                                         limit=limit)
+                candidates.append([shard.storage[obj_id] for _, obj_id in keys])
+        return list(islice(heapq.merge(*candidates, key=order_key), limit))
+
+    @contextmanager
+    def consistent(self):
+        """
+        Hold every shard's read lock and yield an iterator over all
+        objects: a point-in-time view, at the cost of pausing writers.
+        Do not call other repository methods inside the block.
+        """
+        for shard in self._shards:
+            shard.lock.acquire_read()
+        try:
+            yield (obj for shard in self._shards
+                   for obj in shard.storage.values())
+        finally:
+            for shard in reversed(self._shards):
+                shard.lock.release_read()
+
+    def scan(self):
+        """Iterate shard by shard, each copied under its own read lock."""
+        for shard in self._shards:
+            with shard.lock.read():
+                objects = list(shard.storage.values())
+            yield from objects
+
+    def __len__(self):
+        with self.consistent():
+            return sum(len(shard.storage) for shard in self._shards)
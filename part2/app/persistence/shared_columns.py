@@ -0,0 +1,289 @@
+"""
+Place columns shared between processes through shared memory.
+
+A loader process publishes snapshots of the place columns (price,
+coordinates, rating, review count, owner) with SharedColumnPublisher;
+the workers of a multi-process server attach to them zero-copy with
+SharedPlaceColumns, so the columns exist once per host instead of once
+per worker.
+
+Each snapshot is an immutable segment named `<name>_<version>`. A small
+control segment `<name>` holds the current version: publishing writes a
+whole new segment, then bumps the version, and readers switch to the new
+segment on their next query. Readers still using an older segment keep
+their mapping after the publisher unlinks it.
+
+Needs NumPy, like column_store.
+"""
+
+import struct
+import sys
+import threading
+from collections import deque
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from operator import itemgetter
+
+from app.persistence.column_store import box_mask, np
+
+MAGIC = b'HBNBCOL1'
+# magic, places, id width, owners, owner id width
+HEADER = struct.Struct('<8sqqqq')
+# current version, 0 before the first publish
+CONTROL = struct.Struct('<q')
+# Snapshots kept after being superseded, for readers about to attach
+KEEP = 2
+
+
+def segment_name(name, version):
+    return f"{name}_{version}"
+
+
+def _layout(places, id_width, owners, owner_width):
+    """(field, dtype, length, offset) of each array, and the total size."""
+    fields = (('price', 'f8', places), ('latitude', 'f8', places),
+              ('longitude', 'f8', places), ('rating', 'f8', places),
+              ('reviews', 'i4', places), ('owner', 'i4', places),
+              ('ids', f'S{id_width}', places),
+              ('owners', f'S{owner_width}', owners))
+    layout = []
+    offset = HEADER.size
+    for field, dtype, length in fields:
+        dtype = np.dtype(dtype)
+        layout.append((field, dtype, length, offset))
+        # Keep every array 8-byte aligned
+        offset += -(-length * dtype.itemsize // 8) * 8
+    return layout, offset
+
+
+def _attach(name):
+    """Map an existing segment without handing it to the resource tracker."""
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, track=False)
+    # Before 3.13 attaching registers the segment with this process's
+    # resource tracker, which would unlink it when the process exits.
+    register = resource_tracker.register
+    resource_tracker.register = _skip_register
+    try:
+        return SharedMemory(name)
+    finally:
+        resource_tracker.register = register
+
+
+def _skip_register(name, rtype):
+    pass
+
+
+class ColumnSnapshot:
+    """
+    Read-only views over one published segment. Places are sorted by
+    price, so a price range is a binary search and the other predicates
+    only scan the places inside it.
+    """
+
+    def __init__(self, buffer):
+        magic, places, id_width, owners, owner_width = \
+            HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a place column segment.")
+        layout, _ = _layout(places, id_width, owners, owner_width)
+        for field, dtype, length, offset in layout:
+            array = np.frombuffer(buffer, dtype, length, offset)
+            array.flags.writeable = False
+            setattr(self, field, array)
+
+    def __len__(self):
+        return len(self.price)
+
+    def _owner(self, owner_id):
+        key = owner_id.encode()
+        i = int(np.searchsorted(self.owners, key))
+        if i < len(self.owners) and self.owners[i] == key:
+            return i
+        return None
+
+    def filter(self, min_price=None, max_price=None, box=None,
+               min_rating=None, owner_id=None, limit=None):
+        """Same as PlaceColumns.filter, matches in price order."""
+        price = self.price
+        low = 0 if min_price is None else \
+            int(np.searchsorted(price, min_price, 'left'))
+        high = len(price) if max_price is None else \
+            int(np.searchsorted(price, max_price, 'right'))
+        if low >= high:
+            return 0, []
+        window = slice(low, high)
+        mask = None
+        if box is not None:
+            mask = box_mask(self.latitude[window], self.longitude[window],
+                            box)
+        if min_rating is not None:
+            rated = self.rating[window] >= min_rating
+            mask = rated if mask is None else mask & rated
+        if owner_id is not None:
+            owner = self._owner(owner_id)
+            if owner is None:
+                return 0, []
+            owned = self.owner[window] == owner
+            mask = owned if mask is None else mask & owned
+        if mask is None:
+            count = high - low
+            ids = self.ids[low:high if limit is None
+                           else min(high, low + limit)]
+        else:
+            slots = np.flatnonzero(mask)
+            count = len(slots)
+            ids = self.ids[slots[:limit] + low]
+        return count, [place_id.decode() for place_id in ids.tolist()]
+
+
+class SharedColumnPublisher:
+    """
+    Writes snapshots of the places for SharedPlaceColumns readers. A
+    restarted publisher continues the version sequence of the control
+    segment it finds, so attached readers pick up its first snapshot.
+    """
+
+    def __init__(self, name):
+        if np is None:
+            raise RuntimeError("SharedColumnPublisher needs NumPy.")
+        self.name = name
+        try:
+            self._control = SharedMemory(name, create=True, size=CONTROL.size)
+            CONTROL.pack_into(self._control.buf, 0, 0)
+        except FileExistsError:
+            self._control = SharedMemory(name)
+        self.version = CONTROL.unpack_from(self._control.buf, 0)[0]
+        self._segments = deque()
+
+    def _create(self, name, size):
+        try:
+            return SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            # Left over by a publisher that did not close
+            SharedMemory(name).unlink()
+            return SharedMemory(name, create=True, size=size)
+
+    def publish(self, rows):
+        """
+        Publish a new snapshot of `rows`, an iterable of (place_id, price,
+        latitude, longitude, owner_id, review count, average rating), and
+        return its version.
+        """
+        rows = sorted(rows, key=itemgetter(1))
+        ids = [row[0].encode() for row in rows]
+        owners = sorted({row[4].encode() for row in rows})
+        ordinals = {owner: i for i, owner in enumerate(owners)}
+        id_width = max(map(len, ids), default=1)
+        owner_width = max(map(len, owners), default=1)
+        layout, size = _layout(len(rows), id_width, len(owners), owner_width)
+        version = self.version + 1
+        segment = self._create(segment_name(self.name, version), size)
+        HEADER.pack_into(segment.buf, 0, MAGIC, len(rows), id_width,
+                         len(owners), owner_width)
+        values = {
+            'price': [row[1] for row in rows],
+            'latitude': [row[2] for row in rows],
+            'longitude': [row[3] for row in rows],
+            'rating': [row[6] for row in rows],
+            'reviews': [row[5] for row in rows],
+            'owner': [ordinals[row[4].encode()] for row in rows],
+            'ids': ids,
+            'owners': owners,
+        }
+        for field, dtype, length, offset in layout:
+            array = np.ndarray(length, dtype, segment.buf, offset)
+            array[:] = values[field]
+            del array
+        # Readers only look at a segment once the version points to it
+        CONTROL.pack_into(self._control.buf, 0, version)
+        self.version = version
+        self._segments.append(segment)
+        while len(self._segments) > KEEP + 1:
+            old = self._segments.popleft()
+            old.close()
+            old.unlink()
+        return version
+
+    def close(self):
+        """Unlink every snapshot and the control segment."""
+        while self._segments:
+            segment = self._segments.popleft()
+            segment.close()
+            segment.unlink()
+        self._control.close()
+        self._control.unlink()
+
+
+class SharedPlaceColumns:
+    """
+    Reader of the snapshots a SharedColumnPublisher publishes under
+    `name`. Every query checks the version in the control segment and
+    switches to the newest snapshot when it changed; until a first
+    snapshot exists `filter` returns None.
+    """
+
+    def __init__(self, name):
+        if np is None:
+            raise RuntimeError("SharedPlaceColumns needs NumPy.")
+        self.name = name
+        self.version = 0
+        self._control = None
+        self._segment = None
+        self._snapshot = None
+        # Superseded segments, closed once no query uses them
+        self._retired = []
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """The newest ColumnSnapshot, or None if none was published."""
+        with self._lock:
+            if self._control is None:
+                try:
+                    self._control = _attach(self.name)
+                except FileNotFoundError:
+                    return None
+            version = CONTROL.unpack_from(self._control.buf, 0)[0]
+            if version != self.version:
+                try:
+                    segment = _attach(segment_name(self.name, version))
+                except FileNotFoundError:
+                    # Already superseded; catch up on the next query
+                    return self._snapshot
+                if self._segment is not None:
+                    self._retired.append(self._segment)
+                self._segment = segment
+                self._snapshot = ColumnSnapshot(segment.buf)
+                self.version = version
+                self._close_retired()
+            return self._snapshot
+
+    def _close_retired(self):
+        retired = []
+        for segment in self._retired:
+            try:
+                segment.close()
+            except BufferError:
+                # A query still reads it
+                retired.append(segment)
+        self._retired = retired
+
+    def filter(self, min_price=None, max_price=None, box=None,
+               min_rating=None, owner_id=None, limit=None):
+        """PlaceColumns.filter on the newest snapshot, None without one."""
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return None
+        return snapshot.filter(min_price, max_price, box, min_rating,
+                               owner_id, limit)
+
+    def close(self):
+        with self._lock:
+            self._snapshot = None
+            if self._segment is not None:
+                self._retired.append(self._segment)
+                self._segment = None
+            self._close_retired()
+            if self._control is not None:
+                self._control.close()
+                self._control = None
@@ -0,0 +1,213 @@
+import threading
+from bisect import bisect_left, bisect_right
+
+
+class SortedIndex:
+    """
+    Ordered set of keys kept in a list of sorted chunks.
+
+    Positioning is a binary search over the chunk maxima and then within
+    one chunk, so a range of k keys costs O(log n + k). Inserting or
+    removing only shifts the keys of one chunk of at most 2 * LOAD keys,
+    so random insertion stays cheap at millions of keys; keys that grow
+    over time (creation timestamps) are appended to the last chunk.
+
+    Keys are usually tuples ending with the object id, which makes them
+    unique and gives a total order. Callers serialize writes; reads copy
+    the selected slices, so they never see a half-applied insert.
+    """
+
+    LOAD = 512
+
+    def __init__(self, keys=()):
+        keys = sorted(set(keys))
+        load = self.LOAD
+        self._chunks = [keys[i:i + load] for i in range(0, len(keys), load)]
+        # Last (largest) key of every chunk
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+        self._len = len(keys)
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, key):
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return False
+        chunk = self._chunks[i]
+        return chunk[bisect_left(chunk, key)] == key
+
+    def insert(self, key):
+        """Add a key; returns False if it was already present."""
+        chunks, maxes = self._chunks, self._maxes
+        if not maxes:
+            chunks.append([key])
+            maxes.append(key)
+            self._len = 1
+            return True
+        if maxes[-1] < key:
+            i = len(maxes) - 1
+            chunk = chunks[i]
+            chunk.append(key)
+            maxes[i] = key
+        else:
+            i = bisect_left(maxes, key)
+            chunk = chunks[i]
+            j = bisect_left(chunk, key)
+            if chunk[j] == key:
+                return False
+            chunk.insert(j, key)
+        self._len += 1
+        if len(chunk) > 2 * self.LOAD:
+            chunks.insert(i + 1, chunk[self.LOAD:])
+            del chunk[self.LOAD:]
+            maxes[i] = chunk[-1]
+            maxes.insert(i + 1, chunks[i + 1][-1])
+        return True
+
+    def remove(self, key):
+        """Remove a key; returns False if it was not present."""
+        chunks, maxes = self._chunks, self._maxes
+        i = bisect_left(maxes, key)
+        if i == len(maxes):
+            return False
+        chunk = chunks[i]
+        j = bisect_left(chunk, key)
+        if chunk[j] != key:
+            return False
+        del chunk[j]
+        self._len -= 1
+        if not chunk:
+            del chunks[i]
+            del maxes[i]
+        elif j == len(chunk):
+            maxes[i] = chunk[-1]
+        return True
+
+    def _position(self, key, right):
+        """(chunk, offset) of the first key > `key` if `right`, else >= it."""
+        search = bisect_right if right else bisect_left
+        i = search(self._maxes, key)
+        if i == len(self._chunks):
+            return i, 0
+        return i, search(self._chunks[i], key)
+
+    def range(self, minimum=None, maximum=None, inclusive=(True, True),
+              reverse=False, limit=None):
+        """
+        List of the keys between `minimum` and `maximum` (None meaning
+        unbounded), in ascending order or descending with `reverse`, at
+        most `limit` of them.
+        """
+        chunks = self._chunks
+        if not chunks:
+            return []
+        i, j = (0, 0) if minimum is None else \
+            self._position(minimum, not inclusive[0])
+        k, m = (len(chunks), 0) if maximum is None else \
+            self._position(maximum, inclusive[1])
+        if k == len(chunks):
+            k, m = k - 1, len(chunks[-1])
+        if (i, j) >= (k, m):
+            return []
+        remaining = self._len if limit is None else limit
+        found = []
+        if reverse:
+            while remaining > 0:
+                low = j if k == i else 0
+                low = max(low, m - remaining)
+                found += chunks[k][low:m][::-1]
+                remaining -= m - low
+                if k == i:
+                    break
+                k -= 1
+                m = len(chunks[k])
+        else:
+            while remaining > 0:
+                high = m if i == k else len(chunks[i])
+                high = min(high, j + remaining)
+                found += chunks[i][j:high]
+                remaining -= high - j
+                if i == k:
+                    break
+                i, j = i + 1, 0
+        return found
+
+
+class _Above:
+    """Compares greater than any value: (v, ABOVE) sorts after every (v, id)."""
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+    def __eq__(self, other):
+        return other is self
+
+    __hash__ = object.__hash__
+
+
+ABOVE = _Above()
+
+
+class OrderedIndex:
+    """
+    Thread-safe secondary index ordering ids by an attribute value.
+
+    Keys are (value, id) pairs in a SortedIndex, so a range of k ids
+    costs O(log n + k) and ties are broken by id, which makes the order
+    total and usable for keyset pagination.
+    """
+
+    def __init__(self):
+        # obj_id -> value, to find the key to remove on update or delete
+        self._values = {}
+        self._keys = SortedIndex()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, obj_id, value):
+        """Index an id under a value, replacing its previous value."""
+        with self._lock:
+            if obj_id in self._values:
+                old = self._values[obj_id]
+                if old == value:
+                    return
+                self._keys.remove((old, obj_id))
+            self._keys.insert((value, obj_id))
+            self._values[obj_id] = value
+
+    def discard(self, obj_id):
+        with self._lock:
+            if obj_id in self._values:
+                self._keys.remove((self._values.pop(obj_id), obj_id))
+
+    def get(self, obj_id, default=None):
+        """Value an id is indexed under."""
+        return self._values.get(obj_id, default)
+
+    def range(self, low=None, high=None, after=None, reverse=False,
+              limit=None):
+        """
+        (value, id) keys with `low` <= value <= `high` (None meaning
+        unbounded), ascending or descending with `reverse`, resuming
+        after the key `after` of a previous page.
+        """
+        # One-element tuples sort before every (value, id) key of that
+        # value, and (value, ABOVE) after them, so no bound is ever equal
+        # to a key and both can be exclusive
+        minimum = (low,) if low is not None else None
+        maximum = (high, ABOVE) if high is not None else None
+        if after is not None:
+            if reverse:
+                maximum = after if maximum is None else min(maximum, after)
+            else:
+                minimum = after if minimum is None else max(minimum, after)
+        with self._lock:
+            return self._keys.range(minimum, maximum,
+                                    inclusive=(False, False),
+                                    reverse=reverse, limit=limit)
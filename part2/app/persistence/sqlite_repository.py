@@ -0,0 +1,292 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+from app.persistence.repository import (
+    Repository, DuplicateEntryError, check_version)
+from app.persistence.schema import FIELDS, to_record, from_record
+
+SQL_TYPES = {str: 'TEXT', float: 'REAL', int: 'INTEGER', bool: 'INTEGER'}
+
+
+class SQLiteConnectionPool:
+    """
+    One SQLite connection per thread, shared by every repository using
+    the same database file.
+
+    Connections run in WAL journal mode so readers never block the
+    writer, and keep a large statement cache: the repositories build
+    their SQL strings once, so each statement is prepared once per
+    connection and then reused.
+    """
+
+    def __init__(self, path, statement_cache_size=256):
+        self.path = path
+        self.statement_cache_size = statement_cache_size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path,
+                                   isolation_level=None,
+                                   check_same_thread=False,
+                                   cached_statements=self.statement_cache_size)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=5000')
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def transaction(self):
+        """Context manager running a write transaction on this thread."""
+        return _Transaction(self.connection())
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+
+class _Transaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        # Take the write lock up front so read-check-write sequences
+        # cannot interleave with another writer
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+
+class SQLiteRepository(Repository):
+    """
+    Repository storing one model type in a SQLite table.
+
+    Each attribute listed in `schema.FIELDS` gets its own column.
+    `indexes` become plain SQL indexes and `unique` constraints become
+    unique indexes; normalized constraints are backed by a hidden column
+    holding the normalized key.
+    """
+
+    def __init__(self, model, pool, table=None, indexes=(), unique=()):
+        self.model = model
+        self._pool = pool
+        self._table = table or model.__name__.lower() + 's'
+        self._fields = FIELDS[model]
+        self._columns = [name for name, _ in self._fields]
+        self._constraints = {c.name: c for c in unique}
+        self._key_columns = {name: f'_key_{name}'
+                             for name, c in self._constraints.items()
+                             if c.normalize is not None or len(c.attrs) > 1}
+
+        stored_columns = (['id', 'created_at', 'updated_at', 'version']
+                          + self._columns)
+        all_columns = stored_columns + list(self._key_columns.values())
+        placeholders = ', '.join('?' for _ in all_columns)
+        assignments = ', '.join(f'{col} = excluded.{col}'
+                                for col in all_columns[1:])
+        self._select = f"SELECT {', '.join(stored_columns)} FROM {self._table}"
+        self._sql_get = f'{self._select} WHERE id = ?'
+        self._sql_all = f'{self._select} ORDER BY rowid'
+        self._sql_upsert = (f"INSERT INTO {self._table} ({', '.join(all_columns)}) "
+                            f"VALUES ({placeholders}) "
+                            f"ON CONFLICT(id) DO UPDATE SET {assignments}")
+        self._sql_delete = f'DELETE FROM {self._table} WHERE id = ?'
+        # ISO timestamps sort chronologically as text
+        self._sql_first_page = (f'{self._select} '
+                                f'ORDER BY created_at, id LIMIT ?')
+        self._sql_next_page = (f'{self._select} WHERE (created_at, id) > (?, ?) '
+                               f'ORDER BY created_at, id LIMIT ?')
+
+        self._create_table(indexes)
+
+    def _create_table(self, indexes):
+        columns = ['id TEXT PRIMARY KEY', 'created_at TEXT NOT NULL',
+                   'updated_at TEXT NOT NULL',
+                   'version INTEGER NOT NULL DEFAULT 1']
+        columns += [f'{name} {SQL_TYPES[kind]}' for name, kind in self._fields]
+        columns += [f'{col} TEXT' for col in self._key_columns.values()]
+        conn = self._pool.connection()
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {self._table} "
+                     f"({', '.join(columns)})")
+        existing = {row[1] for row in
+                    conn.execute(f'PRAGMA table_info({self._table})')}
+        if 'version' not in existing:
+            # Table created before entities were versioned
+            conn.execute(f'ALTER TABLE {self._table} '
+                         f'ADD COLUMN version INTEGER NOT NULL DEFAULT 1')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS ix_{self._table}_created_at '
+                     f'ON {self._table} (created_at, id)')
+        for attr in indexes:
+            self._check_column(attr)
+            conn.execute(f'CREATE INDEX IF NOT EXISTS '
+                         f'ix_{self._table}_{attr} ON {self._table} ({attr})')
+        for name, constraint in self._constraints.items():
+            target = self._key_columns.get(name) or constraint.attrs[0]
+            conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS '
+                         f'ux_{self._table}_{name} ON {self._table} ({target})')
+
+    def _check_column(self, attr):
+        # Column names end up in SQL text, so only known ones are accepted
+        if attr != 'id' and attr not in self._columns:
+            raise ValueError(f"Unknown attribute for {self.model.__name__}: "
+                             f"{attr}")
+
+    def _key(self, constraint, get_value):
+        key = constraint.key(get_value)
+        return json.dumps(key) if isinstance(key, tuple) else key
+
+    def _row(self, obj):
+        record = to_record(obj)
+        row = [record['id'], record['created_at'].isoformat(),
+               record['updated_at'].isoformat(), record['version']]
+        row += [record[name] for name in self._columns]
+        row += [self._key(self._constraints[name],
+                          lambda attr: getattr(obj, attr, None))
+                for name in self._key_columns]
+        return row
+
+    def _load(self, row):
+        if row is None:
+            return None
+        record = {'id': row[0],
+                  'created_at': datetime.fromisoformat(row[1]),
+                  'updated_at': datetime.fromisoformat(row[2]),
+                  'version': row[3]}
+        record.update(zip(self._columns, row[4:]))
+        return from_record(self.model, record)
+
+    def _write(self, conn, obj):
+        try:
+            conn.execute(self._sql_upsert, self._row(obj))
+        except sqlite3.IntegrityError:
+            self._raise_duplicate(conn, obj)
+            raise
+
+    def _raise_duplicate(self, conn, obj):
+        """Translate a unique index violation into DuplicateEntryError."""
+        for name, constraint in self._constraints.items():
+            existing = self._find_unique(conn, name, [getattr(obj, attr, None)
+                                                      for attr in constraint.attrs])
+            if existing is not None and existing.id != obj.id:
+                raise DuplicateEntryError(constraint, existing.id)
+
+    def add(self, obj):
+        with self._pool.transaction() as conn:
+            self._write(conn, obj)
+
+    def get(self, obj_id):
+        conn = self._pool.connection()
+        return self._load(conn.execute(self._sql_get, (obj_id,)).fetchone())
+
+    def get_all(self):
+        conn = self._pool.connection()
+        return [self._load(row) for row in conn.execute(self._sql_all)]
+
+    def update(self, obj_id, data, expected_version=None):
+        with self._pool.transaction() as conn:
+            obj = self._load(conn.execute(self._sql_get, (obj_id,)).fetchone())
+            if obj:
+                check_version(obj, expected_version)
+                obj.update(data)
+                self._write(conn, obj)
+            return obj
+
+    def delete(self, obj_id):
+        with self._pool.transaction() as conn:
+            conn.execute(self._sql_delete, (obj_id,))
+
+    def get_by_attribute(self, attr_name, attr_value):
+        self._check_column(attr_name)
+        conn = self._pool.connection()
+        row = conn.execute(f'{self._select} WHERE {attr_name} = ? '
+                           f'ORDER BY rowid LIMIT 1', (attr_value,)).fetchone()
+        return self._load(row)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        self._check_column(attr_name)
+        conn = self._pool.connection()
+        rows = conn.execute(f'{self._select} WHERE {attr_name} = ? '
+                            f'ORDER BY rowid', (attr_value,))
+        return [self._load(row) for row in rows]
+
+    def page(self, limit, after=None):
+        conn = self._pool.connection()
+        if after is None:
+            rows = conn.execute(self._sql_first_page, (limit,))
+        else:
+            created_at, obj_id = after
+            rows = conn.execute(self._sql_next_page,
+                                (created_at.isoformat(), obj_id, limit))
+        return [self._load(row) for row in rows]
+
+    def find_unique(self, constraint_name, *values):
+        """Probe a unique constraint through its index."""
+        return self._find_unique(self._pool.connection(), constraint_name,
+                                 values)
+
+    def _find_unique(self, conn, constraint_name, values):
+        constraint = self._constraints[constraint_name]
+        if constraint_name in self._key_columns:
+            column = self._key_columns[constraint_name]
+            key = self._key(constraint,
+                            dict(zip(constraint.attrs, values)).get)
+        else:
+            column, key = constraint.attrs[0], values[0]
+        row = conn.execute(f'{self._select} WHERE {column} = ?',
+                           (key,)).fetchone()
+        return self._load(row)
+
+
+class SQLiteAssociationStore:
+    """AssociationStore counterpart persisted in a two-column table."""
+
+    def __init__(self, pool, table, left='left_id', right='right_id'):
+        self._pool = pool
+        self._sql_link = (f'INSERT OR IGNORE INTO {table} ({left}, {right}) '
+                          f'VALUES (?, ?)')
+        self._sql_unlink = f'DELETE FROM {table} WHERE {left} = ? AND {right} = ?'
+        self._sql_rights = f'SELECT {right} FROM {table} WHERE {left} = ? ORDER BY rowid'
+        self._sql_lefts = f'SELECT {left} FROM {table} WHERE {right} = ? ORDER BY rowid'
+        self._sql_linked = f'SELECT 1 FROM {table} WHERE {left} = ? AND {right} = ?'
+        conn = pool.connection()
+        conn.execute(f'CREATE TABLE IF NOT EXISTS {table} '
+                     f'({left} TEXT NOT NULL, {right} TEXT NOT NULL, '
+                     f'PRIMARY KEY ({left}, {right}))')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS ix_{table}_{right} '
+                     f'ON {table} ({right})')
+
+    def link(self, left_id, right_id):
+        with self._pool.transaction() as conn:
+            return conn.execute(self._sql_link,
+                                (left_id, right_id)).rowcount > 0
+
+    def unlink(self, left_id, right_id):
+        with self._pool.transaction() as conn:
+            return conn.execute(self._sql_unlink,
+                                (left_id, right_id)).rowcount > 0
+
+    def rights(self, left_id):
+        conn = self._pool.connection()
+        return [row[0] for row in conn.execute(self._sql_rights, (left_id,))]
+
+    def lefts(self, right_id):
+        conn = self._pool.connection()
+        return [row[0] for row in conn.execute(self._sql_lefts, (right_id,))]
+
+    def is_linked(self, left_id, right_id):
+        conn = self._pool.connection()
+        return conn.execute(self._sql_linked,
+                            (left_id, right_id)).fetchone() is not None
@@ -0,0 +1,128 @@
+import threading
+
+# Compact once discarded keys outnumber live ones, and are at least this many
+COMPACT_MIN_DISCARDED = 1024
+
+
+class SurrogateKeys:
+    """
+    Dense integer keys for string ids, the id <-> int map shared by the
+    indexes that store entities as bit positions or array slots
+    (BitsetIndex, PlaceColumns). Ids stay strings everywhere else, the
+    API included; only these indexes work on the integers.
+
+    Keys count up from 0 in the order ids are first seen, so key order
+    is insertion order. A removed entity is discard()ed once every index
+    has dropped it: it keeps its key, still a valid cursor, until
+    discarded keys outnumber the live ones. The keys are then compacted:
+    live keys are renumbered in the same order and every attached index
+    remaps its bits or slots, so the keys and the indexes stay
+    proportional to the live entities under create/delete churn.
+    """
+
+    def __init__(self, compact_min=COMPACT_MIN_DISCARDED):
+        # id -> key, and key -> id
+        self._keys = {}
+        self._ids = []
+        self._discarded = set()
+        # Ids dropped by the last compaction -> key of the next live id
+        self._moved = {}
+        self._compact_min = compact_min
+        # Indexes remapped on compaction, each with a _lock and _remap()
+        self._indexes = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def attach(self, index):
+        """Have `index` remapped, under its own lock, on compaction."""
+        self._indexes.append(index)
+
+    def key(self, obj_id):
+        """The key of an id, assigning the next one to a new id."""
+        key = self._keys.get(obj_id)
+        if key is None or key in self._discarded:
+            with self._lock:
+                key = self._keys.get(obj_id)
+                if key is None:
+                    key = self._keys[obj_id] = len(self._ids)
+                    self._ids.append(obj_id)
+                    self._moved.pop(obj_id, None)
+                else:
+                    # Added back before the next compaction
+                    self._discarded.discard(key)
+        return key
+
+    def get(self, obj_id):
+        """The key of an id, None if it has none."""
+        return self._keys.get(obj_id)
+
+    def position(self, obj_id):
+        """
+        Where to resume after `obj_id` in key order: its key, or for an
+        id dropped by the last compaction the key just before the next
+        live one. None for an unknown id.
+        """
+        key = self._keys.get(obj_id)
+        if key is None:
+            following = self._moved.get(obj_id)
+            return None if following is None else following - 1
+        return key
+
+    def id(self, key):
+        return self._ids[key]
+
+    def ids(self, keys):
+        """The ids of an iterable of keys."""
+        ids = self._ids
+        return [ids[key] for key in keys]
+
+    def discard(self, obj_id):
+        """
+        Mark an id removed from every attached index, compacting the
+        keys when they are mostly discarded. Call it without holding
+        the lock of any attached index.
+        """
+        with self._lock:
+            key = self._keys.get(obj_id)
+            if key is None or key in self._discarded:
+                return
+            self._discarded.add(key)
+            discarded = len(self._discarded)
+            due = discarded >= self._compact_min and \
+                2 * discarded > len(self._ids)
+        if due:
+            self.compact()
+
+    def compact(self):
+        """Renumber the live keys in order and remap the attached indexes."""
+        # Index locks before the map lock, the order index methods use
+        for index in self._indexes:
+            index._lock.acquire()
+        try:
+            with self._lock:
+                if not self._discarded:
+                    return
+                remap = [-1] * len(self._ids)
+                ids, moved, dropped = [], {}, []
+                for key, obj_id in enumerate(self._ids):
+                    if key in self._discarded:
+                        dropped.append(obj_id)
+                        continue
+                    for dropped_id in dropped:
+                        moved[dropped_id] = len(ids)
+                    dropped.clear()
+                    remap[key] = len(ids)
+                    ids.append(obj_id)
+                for dropped_id in dropped:
+                    moved[dropped_id] = len(ids)
+                self._ids = ids
+                self._keys = {obj_id: key for key, obj_id in enumerate(ids)}
+                self._discarded = set()
+                self._moved = moved
+            for index in self._indexes:
+                index._remap(remap)
+        finally:
+            for index in reversed(self._indexes):
+                index._lock.release()
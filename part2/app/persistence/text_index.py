@@ -0,0 +1,109 @@
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+_WORD = re.compile(r'\w+')
+
+
+def fold(text):
+    """
+    Case-folded text without accents: decomposing to NFKD splits
+    accented letters into a base letter and combining marks, which are
+    then dropped.
+    """
+    text = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """Folded words of a text."""
+    if not text:
+        return []
+    return _WORD.findall(fold(text))
+
+
+class TextIndex:
+    """
+    Inverted index of documents ranked with Okapi BM25.
+
+    Each term maps to its postings, {doc_id: term frequency}. A query
+    only reads the postings of its own terms, so its cost follows the
+    number of documents containing them rather than the corpus size.
+    Documents are replaced or removed incrementally: the terms of each
+    document are kept to find the postings to update.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        # term -> {doc_id: frequency}
+        self._postings = {}
+        # doc_id -> Counter of its terms
+        self._documents = {}
+        # doc_id -> number of terms
+        self._lengths = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._documents)
+
+    def add(self, doc_id, text):
+        """Index a document, replacing its previous text."""
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self._discard(doc_id)
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = frequency
+            self._documents[doc_id] = terms
+            self._lengths[doc_id] = length = sum(terms.values())
+            self._total_length += length
+
+    def discard(self, doc_id):
+        with self._lock:
+            self._discard(doc_id)
+
+    def _discard(self, doc_id):
+        terms = self._documents.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+
+    def search(self, query, limit=None, after=None):
+        """
+        (score, doc_id) of the documents matching any term of `query`,
+        best first, resuming after the (score, doc_id) key `after` of a
+        previous page.
+        """
+        scores = {}
+        with self._lock:
+            count = len(self._documents)
+            if not count:
+                return []
+            average_length = self._total_length / count or 1
+            k1, b, lengths = self.k1, self.b, self._lengths
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5)
+                               / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * (
+                        frequency * (k1 + 1)
+                        / (frequency + k1 * (1 - b + b * lengths[doc_id]
+                                             / average_length)))
+        ranked = ((score, doc_id) for doc_id, score in scores.items())
+        if after is not None:
+            ranked = (item for item in ranked if item < after)
+        if limit is None:
+            return sorted(ranked, reverse=True)
+        return heapq.nlargest(limit, ranked)
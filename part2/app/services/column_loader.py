@@ -0,0 +1,69 @@
+"""
+Loader process of the shared place columns.
+
+Reads every place and review from the configured repositories and
+publishes their columns under HBNB_SHARED_COLUMNS, then again every
+`--interval` seconds, for the workers of a multi-process server started
+with the same settings. Workers and loader must share their storage, so
+this is meant for the sqlite backend. Only the filter columns are
+shared: every other derived index of the facade stays per process and
+misses the writes of the other workers (see the README). Run from part2/:
+
+    HBNB_REPOSITORY=sqlite HBNB_SHARED_COLUMNS=hbnb \\
+        python -m app.services.column_loader --interval 10
+"""
+
+import argparse
+import signal
+import sys
+import time
+
+from app.persistence.shared_columns import SharedColumnPublisher
+from app.services.facade import HBnBFacade
+from config import config
+
+
+def place_rows(place_repo, review_repo):
+    """Publisher rows of every place, with its review count and average."""
+    stats = {}
+    for review in review_repo.get_all():
+        count, total = stats.get(review.place_id, (0, 0))
+        stats[review.place_id] = (count + 1, total + review.rating)
+    for place in place_repo.get_all():
+        count, total = stats.get(place.id, (0, 0))
+        yield (place.id, float(place.price), place.latitude, place.longitude,
+               place.owner_id, count, total / count if count else 0.0)
+
+
+def _stop(signum, frame):
+    sys.exit(0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--interval', type=float, default=10.0,
+                        help="seconds between snapshots")
+    args = parser.parse_args(argv)
+    name = config['default'].SHARED_COLUMNS
+    if not name:
+        parser.error("HBNB_SHARED_COLUMNS is not set.")
+
+    facade = HBnBFacade()
+    publisher = SharedColumnPublisher(name)
+    signal.signal(signal.SIGTERM, _stop)
+    try:
+        while True:
+            start = time.perf_counter()
+            version = publisher.publish(
+                place_rows(facade.place_repo, facade.review_repo))
+            print(f"published version {version} in "
+                  f"{time.perf_counter() - start:.2f} s", flush=True)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        publisher.close()
+
+
+if __name__ == '__main__':
+    main()
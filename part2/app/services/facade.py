@@ -1,17 +1,216 @@
-from app.persistence.repository import InMemoryRepository
+import threading
+from functools import partial
+
+from app.persistence.repository import (
+    InMemoryRepository, UniqueConstraint, DuplicateEntryError, casefold,
+    order_key)
+from app.persistence.association import AssociationStore
+from app.persistence.bitset_index import BitsetIndex
+from app.persistence.cluster_index import ClusterIndex
+from app.persistence.column_store import COLUMNS_AVAILABLE, PlaceColumns
+from app.persistence.geo_index import GeoIndex, haversine_km
+from app.persistence.prefix_index import PrefixIndex
+from app.persistence.rating_index import RatingIndex
+from app.persistence.shared_columns import SharedPlaceColumns
+from app.persistence.surrogate_keys import SurrogateKeys
+from app.persistence.sorted_index import OrderedIndex
+from app.persistence.text_index import TextIndex
+from app.persistence.durable_repository import (
+    DurableRepository, DurableAssociationStore, MappedDurableRepository)
+from app.persistence.sharded_repository import ShardedRepository
+from app.persistence.sqlite_repository import (
+    SQLiteRepository, SQLiteConnectionPool, SQLiteAssociationStore)
+from app.services.ranking import (
+    CompositeScore, distance_component, price_component, rating_component,
+    reviews_component, scan, top_k)
+from app.models.ids import id_generator, set_id_generator
 from app.models.place import Place
 from app.models.user import User
 from app.models.amenity import Amenity
 from app.models.review import Review
 from werkzeug.exceptions import NotFound
+from config import config
+
+REVIEW_LOCK_STRIPES = 64
 
 
 class HBnBFacade:
-    def __init__(self):
-        self.user_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
-        self.amenity_repo = InMemoryRepository()
+    def __init__(self, config_class=None):
+        self.config = config_class or config['default']
+        set_id_generator(id_generator(self.config.ID_GENERATOR,
+                                      self.config.ID_BATCH))
+        self._pool = None
+        if self.config.REPOSITORY == 'sqlite':
+            self._pool = SQLiteConnectionPool(self.config.DATABASE_PATH)
+        elif self.config.REPOSITORY not in ('memory', 'sharded',
+                                            'durable'):
+            raise ValueError(
+                f"Unknown repository backend: {self.config.REPOSITORY}")
+
+        self.user_repo = self._create_repository(
+            User, unique=(UniqueConstraint('email'),))
+        self.place_repo = self._create_repository(
+            Place, indexes=('owner_id',))
+        self.review_repo = self._create_repository(
+            Review, indexes=('place_id', 'user_id'),
+            unique=(UniqueConstraint('user_id', 'place_id'),))
+        self.amenity_repo = self._create_repository(
+            Amenity, unique=(UniqueConstraint('name', normalize=casefold),))
+        # place_id <-> amenity_id
+        self.place_amenities = self._create_association_store(
+            'place_amenities', 'place_id', 'amenity_id')
+
+        # Derived in-memory indexes, rebuilt from the repositories on start.
+        # Each process has its own: they miss the writes of other
+        # processes sharing a sqlite database
+        self.place_geo = GeoIndex()
+        self.place_clusters = ClusterIndex()
+        self.place_prices = OrderedIndex()
+        self.place_ratings = RatingIndex()
+        # Dense integer keys of the places, for the integer-keyed indexes
+        self.place_keys = SurrogateKeys()
+        self.place_amenity_bits = BitsetIndex(self.place_keys)
+        self.place_columns = (PlaceColumns(keys=self.place_keys)
+                              if self.config.PLACE_COLUMNS
+                              and COLUMNS_AVAILABLE else None)
+        self.shared_columns = None
+        if self.config.SHARED_COLUMNS and COLUMNS_AVAILABLE:
+            # Published by a loader process, read by every worker
+            self.shared_columns = SharedPlaceColumns(
+                self.config.SHARED_COLUMNS)
+            self.place_columns = None
+        self.place_text = TextIndex()
+        self.review_text = TextIndex()
+        # created_at of every review, and of the reviews of each place
+        self.review_times = OrderedIndex()
+        self.place_review_times = {}
+        self.user_names = PrefixIndex()
+        self.amenity_names = PrefixIndex()
+        # Striped by review id: a review is read, written and counted in
+        # the rating index as one step, so concurrent writes of the same
+        # review apply their rating delta exactly once
+        self._review_locks = [threading.Lock()
+                              for _ in range(REVIEW_LOCK_STRIPES)]
+        self._load_indexes()
+
+    def _create_repository(self, model, indexes=(), unique=()):
+        """Build the repository for a model on the configured backend."""
+        if self.config.REPOSITORY == 'sqlite':
+            return SQLiteRepository(model, self._pool,
+                                    indexes=indexes, unique=unique)
+        if self.config.REPOSITORY == 'durable':
+            repository_class = DurableRepository
+            if self.config.SNAPSHOT_FORMAT == 'binary':
+                repository_class = MappedDurableRepository
+            return repository_class(
+                model, self.config.DATA_DIR, indexes=indexes, unique=unique,
+                sync=self.config.JOURNAL_SYNC,
+                snapshot_interval=self.config.SNAPSHOT_INTERVAL)
+        if self.config.REPOSITORY == 'sharded':
+            return ShardedRepository(shards=self.config.REPOSITORY_SHARDS,
+                                     indexes=indexes, unique=unique)
+        return InMemoryRepository(indexes=indexes, unique=unique)
+
+    def _load_indexes(self):
+        """Fill the derived indexes from what the backend already stores."""
+        # Only the indexed fields are read: a lazily loaded backend does
+        # not have to build every model to start. In creation order, so
+        # that place keys follow it too
+        places = self.place_repo.scan_fields(
+            ('created_at', 'title', 'description', 'price', 'latitude',
+             'longitude', 'owner_id'))
+        for place in sorted(places, key=order_key):
+            self._index_place(place)
+            for amenity_id in self.place_amenities.rights(place.id):
+                self.place_amenity_bits.link(place.id, amenity_id)
+        for review in self.review_repo.scan_fields(
+                ('created_at', 'text', 'place_id', 'rating')):
+            self._index_review(review)
+            self.place_ratings.add(review.place_id, review.rating)
+            self._sync_rating(review.place_id)
+        for user in self.user_repo.scan_fields(
+                ('first_name', 'last_name', 'email')):
+            self._index_user(user)
+        for amenity in self.amenity_repo.scan_fields(('name',)):
+            self._index_amenity(amenity)
+
+    def _index_user(self, user):
+        self.user_names.add(user.id, f"{user.first_name} {user.last_name}",
+                            user.last_name, user.email)
+
+    def _index_amenity(self, amenity):
+        # Each word of the name starts a term: "po" finds "Swimming pool"
+        words = amenity.name.split()
+        self.amenity_names.add(amenity.id, *(' '.join(words[i:])
+                                             for i in range(len(words))))
+
+    def _index_place(self, place):
+        self.place_geo.add(place.id, place.latitude, place.longitude)
+        self.place_clusters.add(place.id, place.latitude, place.longitude,
+                                place.price)
+        self.place_prices.add(place.id, float(place.price))
+        self.place_ratings.add_place(place.id)
+        self.place_amenity_bits.add_place(place.id)
+        if self.place_columns is not None:
+            self.place_columns.add(place.id, place.price, place.latitude,
+                                   place.longitude, place.owner_id)
+            self._sync_rating(place.id)
+        self.place_text.add(place.id,
+                            f"{place.title} {place.description or ''}")
+
+    def _unindex_place(self, place_id):
+        self.place_geo.discard(place_id)
+        self.place_clusters.discard(place_id)
+        self.place_prices.discard(place_id)
+        self.place_ratings.discard_place(place_id)
+        self.place_amenity_bits.discard_place(place_id)
+        if self.place_columns is not None:
+            self.place_columns.discard(place_id)
+        # Gone from every index keyed by place_keys
+        self.place_keys.discard(place_id)
+        self.place_text.discard(place_id)
+        self.place_review_times.pop(place_id, None)
+
+    def _sync_rating(self, place_id):
+        """Copy the rating aggregates of a place to its columns."""
+        if self.place_columns is not None:
+            self.place_columns.set_rating(
+                place_id, *self.place_ratings.summary(place_id))
+
+    def _review_lock(self, review_id):
+        return self._review_locks[hash(review_id) % len(self._review_locks)]
+
+    def _index_review(self, review):
+        self.review_text.add(review.id, review.text)
+        self.review_times.add(review.id, review.created_at)
+        self.place_review_times.setdefault(
+            review.place_id, OrderedIndex()).add(review.id, review.created_at)
+
+    def _unindex_review(self, review):
+        self.review_text.discard(review.id)
+        self.review_times.discard(review.id)
+        times = self.place_review_times.get(review.place_id)
+        if times is not None:
+            times.discard(review.id)
+
+    def _create_association_store(self, name, left, right):
+        """Build a many-to-many link store on the configured backend."""
+        if self.config.REPOSITORY == 'sqlite':
+            return SQLiteAssociationStore(self._pool, name, left, right)
+        if self.config.REPOSITORY == 'durable':
+            return DurableAssociationStore(
+                self.config.DATA_DIR, name, sync=self.config.JOURNAL_SYNC,
+                snapshot_interval=self.config.SNAPSHOT_INTERVAL)
+        return AssociationStore()
+
+    def close(self):
+        """Flush and release the storage backend."""
+        for store in (self.user_repo, self.place_repo, self.review_repo,
+                      self.amenity_repo, self.place_amenities):
+            if hasattr(store, 'close'):
+                store.close()
+        if self._pool:
+            self._pool.close()
 
     def create_user(self, user_data):
         required_fields = ["first_name", "last_name", "email"]
@@ -23,7 +222,11 @@ class HBnBFacade:
             raise ValueError("Email already registered")
 
         user = User(**user_data)
-        self.user_repo.add(user)
+        try:
+            self.user_repo.add(user)
+        except DuplicateEntryError:
+            raise ValueError("Email already registered")
+        self._index_user(user)
         return user
 
     def get_user(self, user_id):
@@ -35,7 +238,7 @@ class HBnBFacade:
     def get_user_by_email(self, email):
         return self.user_repo.get_by_attribute('email', email)
 
-    def update_user(self, user_id, user_data):
+    def update_user(self, user_id, user_data, expected_version=None):
         user = self.get_user(user_id)
 
         if 'email' in user_data:
@@ -43,17 +246,31 @@ class HBnBFacade:
             if existing_user and existing_user.id != user_id:
                 raise ValueError("Email already in use")
 
-        if 'email' in user_data:
-            existing_user = self.get_user_by_email(user_data['email'])
-            if existing_user and existing_user.id != user_id:
-                raise ValueError("Email already registered by another user")
+        try:
+            return self.user_repo.update(user.id, user_data,
+                                         expected_version)
+        except DuplicateEntryError:
+            raise ValueError("Email already in use")
+        finally:
+            # Reindex what was stored, even if validation failed half-way
+            self._index_user(self.user_repo.get(user.id))
 
-        user.update(user_data)
-        return user
+    def autocomplete_users(self, prefix, limit=10):
+        """Users whose name, last name or email starts with `prefix`."""
+        return self._completions(self.user_names, self.user_repo,
+                                 prefix, limit)
+
+    def _completions(self, index, repo, prefix, limit):
+        found = (repo.get(obj_id) for obj_id in index.complete(prefix, limit))
+        return [obj for obj in found if obj is not None]
 
     def get_all_users(self):
         return [user for user in self.user_repo.get_all() if user]
 
+    def get_users_page(self, limit, after=None):
+        """Users in creation order, after the (created_at, id) key `after`."""
+        return self.user_repo.page(limit, after)
+
     def create_place(self, place_data):
         price = place_data.get('price')
         if not isinstance(price, (float, int)) or price < 0:
@@ -71,6 +288,7 @@ class HBnBFacade:
         owner_id = place_data.get('owner_id')
         place = Place(**place_data)
         self.place_repo.add(place)
+        self._index_place(place)
         return place
 
     def get_place(self, place_id):
@@ -80,22 +298,335 @@ class HBnBFacade:
         if not place:
             raise ValueError(f"No place found with ID: {place_id}")
 
-        amenities = self.amenity_repo.get_all()
-        place.amenities = [
-            amenity for amenity in amenities if amenity.place_id == place_id]
-
+        place.amenities = self.get_place_amenities(place_id)
         return place
 
     def get_all_places(self):
         return self.place_repo.get_all()
 
-    def update_place(self, place_id, place_data):
+    def get_places_page(self, limit, after=None):
+        """Places in creation order, after the (created_at, id) key `after`."""
+        return self.place_repo.page(limit, after)
+
+    def get_places_by_price(self, limit=None, after=None, min_price=None,
+                            max_price=None, descending=False):
+        """
+        Places with min_price <= price <= max_price, ordered by
+        (price, id), resuming after the (price, id) key `after`.
+        """
+        places = (self.place_repo.get(place_id)
+                  for _, place_id in self.place_prices.range(
+                      min_price, max_price, after=after, reverse=descending,
+                      limit=limit))
+        # Skip places deleted since the index was read
+        return [place for place in places if place is not None]
+
+    def search_places_text(self, query, limit=None, after=None):
+        """
+        (place, score) of the places whose title or description match
+        `query`, best first, after the (score, id) key `after`.
+        """
+        return self._text_results(self.place_text, self.place_repo,
+                                  query, limit, after)
+
+    def _text_results(self, index, repo, query, limit, after):
+        results = []
+        for score, obj_id in index.search(query, limit, after):
+            obj = repo.get(obj_id)
+            # Skip entities deleted since the index was read
+            if obj is not None:
+                results.append((obj, score))
+        return results
+
+    def get_place_rating(self, place_id):
+        """Review count, average and 1-5 histogram of a place."""
+        return self.place_ratings.get(place_id)
+
+    def get_places_by_rating(self, limit=None, after=None, descending=False):
+        """
+        Places ordered by (average rating, id), unrated ones counting as
+        0, resuming after the (average, id) key `after`.
+        """
+        places = (self.place_repo.get(place_id)
+                  for _, place_id in self.place_ratings.range(
+                      after=after, reverse=descending, limit=limit))
+        # Skip places deleted since the index was read
+        return [place for place in places if place is not None]
+
+    def get_top_places(self, k=20, weights=None, latitude=None,
+                       longitude=None, radius_km=None, min_price=None,
+                       max_price=None, amenity_ids=None):
+        """
+        (place, score, distance_km) of the k best places by a composite
+        of rating, review count, price and distance from a point (see
+        app.services.ranking), among those within `radius_km` of the
+        point, between the prices and offering every amenity, if given.
+        distance_km is None without a point.
+
+        Candidates come from the most selective index available: the
+        places around the point, or those offering the amenities, or
+        else the price or rating order, whichever component weighs
+        more, so that the scan stops early.
+        """
+        has_origin = latitude is not None and longitude is not None
+        score = CompositeScore(weights, has_origin)
+        allowed = None
+        if amenity_ids:
+            self._check_amenities(amenity_ids)
+            allowed = set(self.place_amenity_bits.match(amenity_ids))
+        distances = {}
+
+        def distance(place_id):
+            if place_id not in distances:
+                point = self.place_geo.get(place_id)
+                distances[place_id] = (haversine_km(latitude, longitude,
+                                                    *point)
+                                       if point else None)
+            return distances[place_id]
+
+        def place_score(place_id):
+            if allowed is not None and place_id not in allowed:
+                return None
+            price = self.place_prices.get(place_id)
+            if price is None or \
+                    (min_price is not None and price < min_price) or \
+                    (max_price is not None and price > max_price):
+                return None
+            count, average = self.place_ratings.summary(place_id)
+            if not has_origin:
+                return score(average, count, price)
+            place_distance = distance(place_id)
+            if place_distance is None:
+                return None
+            return score(average, count, price, place_distance)
+
+        driver = None
+        if radius_km is not None:
+            nearby = self.place_geo.within_radius(latitude, longitude,
+                                                  radius_km)
+            distances.update((place_id, d) for d, place_id in nearby)
+            candidates = ((distance_component(d), place_id)
+                          for d, place_id in nearby)
+            driver = 'distance'
+        elif allowed is not None:
+            candidates = ((None, place_id) for place_id in allowed)
+        elif score.weights['price'] >= score.weights['rating']:
+            candidates = ((price_component(price), place_id)
+                          for price, place_id in scan(
+                              lambda after, limit: self.place_prices.range(
+                                  min_price, max_price, after=after,
+                                  limit=limit)))
+            driver = 'price'
+        else:
+            candidates = ((rating_component(average), place_id)
+                          for average, place_id in scan(
+                              lambda after, limit: self.place_ratings.range(
+                                  after=after, reverse=True, limit=limit)))
+            driver = 'rating'
+
+        caps = {'reviews': reviews_component(self.place_ratings.max_count())}
+        cheapest = self.place_prices.range(min_price, max_price, limit=1)
+        if driver != 'price' and cheapest:
+            caps['price'] = price_component(cheapest[0][0])
+        bound = partial(score.bound, driver, caps=caps) if driver else None
+        results = []
+        for place_score_value, place_id in top_k(candidates, k, place_score,
+                                                 bound):
+            place = self.place_repo.get(place_id)
+            # Skip places deleted since the indexes were read
+            if place is not None:
+                results.append((place, place_score_value,
+                                distance(place_id) if has_origin else None))
+        return results
+
+    def filter_places(self, min_price=None, max_price=None, box=None,
+                      min_rating=None, owner_id=None, limit=None):
+        """
+        (count, places) of the places matching every given predicate:
+        price between min_price and max_price, inside `box` (min_lat,
+        min_lon, max_lat, max_lon), average rating of at least
+        min_rating (unrated places count as 0), owned by owner_id.
+        `places` holds the first `limit` matches, in no particular order.
+
+        Evaluated as vectorized masks over the place columns when NumPy
+        is available, else by checking the places in the price range
+        against the other indexes. Shared columns reflect the last
+        snapshot their loader published, not this process's own writes.
+        """
+        columns = self.shared_columns or self.place_columns
+        result = None
+        if columns is not None:
+            result = columns.filter(min_price, max_price, box, min_rating,
+                                    owner_id, limit)
+        if result is not None:
+            count, place_ids = result
+        else:
+            place_ids = [place_id for _, place_id in self.place_prices.range(
+                min_price, max_price)
+                if self._place_matches(place_id, box, min_rating, owner_id)]
+            count = len(place_ids)
+            place_ids = place_ids[:limit]
+        places = (self.place_repo.get(place_id) for place_id in place_ids)
+        # Skip places deleted since the index was read
+        return count, [place for place in places if place is not None]
+
+    def _place_matches(self, place_id, box, min_rating, owner_id):
+        if box is not None:
+            point = self.place_geo.get(place_id)
+            if point is None:
+                return False
+            min_lat, min_lon, max_lat, max_lon = box
+            lat, lon = point
+            if not min_lat <= lat <= max_lat:
+                return False
+            if min_lon <= max_lon:
+                if not min_lon <= lon <= max_lon:
+                    return False
+            elif max_lon < lon < min_lon:
+                return False
+        if min_rating is not None and \
+                self.place_ratings.summary(place_id)[1] < min_rating:
+            return False
+        if owner_id is not None:
+            place = self.place_repo.get(place_id)
+            if place is None or place.owner_id != owner_id:
+                return False
+        return True
+
+    def get_places_by_owner(self, owner_id):
+        """Retrieve all places owned by a specific user."""
+        self.get_user(owner_id)
+        return self.place_repo.get_all_by_attribute('owner_id', owner_id)
+
+    def update_place(self, place_id, place_data, expected_version=None):
         place = self.place_repo.get(place_id)
         if not place:
             raise ValueError(f"No place found with ID: {place_id}")
-        place.update(place_data)
-        self.place_repo.add(place)
-        return place
+        try:
+            return self.place_repo.update(place_id, place_data,
+                                          expected_version)
+        finally:
+            # Reindex what was stored, even if validation failed half-way
+            place = self.place_repo.get(place_id)
+            if place:
+                self._index_place(place)
+
+    def delete_place(self, place_id):
+        """Delete a place with its reviews and amenity links."""
+        place = self.place_repo.get(place_id)
+        if not place:
+            raise ValueError(f"No place found with ID: {place_id}")
+        for review in self.review_repo.get_all_by_attribute('place_id',
+                                                            place_id):
+            self.delete_review(review.id)
+        for amenity_id in self.place_amenities.rights(place_id):
+            self.place_amenities.unlink(place_id, amenity_id)
+        # Unindexed first, so that searches do not find it half deleted
+        self._unindex_place(place_id)
+        self.place_repo.delete(place_id)
+
+    def search_places_in_box(self, min_lat, min_lon, max_lat, max_lon,
+                             limit=None):
+        """(place, distance_km) inside a box, nearest to its centre first."""
+        return self._geo_results(self.place_geo.within_box(
+            min_lat, min_lon, max_lat, max_lon, limit))
+
+    def _geo_results(self, found):
+        results = []
+        for distance, place_id in found:
+            place = self.place_repo.get(place_id)
+            # Skip places deleted since the index was read
+            if place is not None:
+                results.append((place, distance))
+        return results
+
+    def get_place_clusters(self, min_lat, min_lon, max_lat, max_lon, zoom):
+        """
+        Clustered markers for a map viewport. Clusters are the quadtree
+        tiles three levels below the map zoom, i.e. up to 8x8 per
+        256-pixel map tile.
+        """
+        return self.place_clusters.clusters(min_lat, min_lon, max_lat,
+                                            max_lon, zoom + 3)
+
+    def search_places_near(self, latitude, longitude, radius_km, limit=None):
+        """(place, distance_km) within a radius of a point, nearest first."""
+        return self._geo_results(self.place_geo.within_radius(
+            latitude, longitude, radius_km, limit))
+
+    def get_place_amenities(self, place_id):
+        """Retrieve the amenities attached to a place."""
+        return [self.amenity_repo.get(amenity_id)
+                for amenity_id in self.place_amenities.rights(place_id)]
+
+    def add_amenities_to_place(self, place_id, amenity_ids):
+        """Attach several amenities to a place; already attached ones are kept."""
+        self._check_place_amenities(place_id, amenity_ids)
+        for amenity_id in amenity_ids:
+            self.place_amenities.link(place_id, amenity_id)
+            self.place_amenity_bits.link(place_id, amenity_id)
+        return self.get_place_amenities(place_id)
+
+    def remove_amenities_from_place(self, place_id, amenity_ids):
+        """Detach several amenities from a place."""
+        self._check_place_amenities(place_id, amenity_ids)
+        for amenity_id in amenity_ids:
+            self.place_amenities.unlink(place_id, amenity_id)
+            self.place_amenity_bits.unlink(place_id, amenity_id)
+        return self.get_place_amenities(place_id)
+
+    def get_places_by_amenity(self, amenity_id):
+        """Retrieve the places offering a specific amenity."""
+        self.get_amenity(amenity_id)
+        return [self.place_repo.get(place_id)
+                for place_id in self.place_amenities.lefts(amenity_id)]
+
+    def get_places_with_amenities(self, amenity_ids, limit=None, after=None):
+        """
+        Places offering every amenity of a list, in creation order,
+        after the (created_at, id) key `after`.
+        """
+        self._check_amenities(amenity_ids)
+        try:
+            place_ids = self.place_amenity_bits.match(
+                amenity_ids, limit, after and after[1])
+        except KeyError:
+            raise ValueError("Invalid cursor.")
+        places = (self.place_repo.get(place_id) for place_id in place_ids)
+        # Skip places deleted since the index was read
+        return [place for place in places if place is not None]
+
+    def get_amenity_facets(self, amenity_ids=()):
+        """
+        (count, [(amenity, count)]) for the places offering every
+        amenity of a list: how many they are, and how many of them offer
+        each amenity, most offered first.
+        """
+        self._check_amenities(amenity_ids)
+        count, counts = self.place_amenity_bits.facets(amenity_ids)
+        facets = []
+        for amenity_id, amenity_count in counts.items():
+            amenity = self.amenity_repo.get(amenity_id)
+            if amenity is not None:
+                facets.append((amenity, amenity_count))
+        facets.sort(key=lambda facet: (-facet[1], facet[0].name))
+        return count, facets
+
+    def _check_amenities(self, amenity_ids):
+        for amenity_id in amenity_ids:
+            if not self.amenity_repo.get(amenity_id):
+                raise NotFound(f"Amenity not found: {amenity_id}")
+
+    def _check_place_amenities(self, place_id, amenity_ids):
+        """Validate a bulk request before any link is touched."""
+        if not self.place_repo.get(place_id):
+            raise NotFound("Place not found")
+        if not isinstance(amenity_ids, list) or not amenity_ids:
+            raise ValueError("amenity_ids must be a non-empty list.")
+        for amenity_id in amenity_ids:
+            if not isinstance(amenity_id, str) or \
+                    not self.amenity_repo.get(amenity_id):
+                raise NotFound(f"Amenity not found: {amenity_id}")
 
     def create_amenity(self, amenity_data):
         """Créer un équipement avec une vérification de doublon et validation des données"""
@@ -104,13 +635,12 @@ class HBnBFacade:
         if not new_name:
             raise ValueError("Amenity name cannot be empty.")
 
-        existing_amenities = self.get_all_amenities()
-        for amenity in existing_amenities:
-            if amenity.name.lower() == new_name.lower():
-                raise ValueError("Amenity already exist.")
-
         amenity = Amenity(name=new_name)
-        self.amenity_repo.add(amenity)
+        try:
+            self.amenity_repo.add(amenity)
+        except DuplicateEntryError:
+            raise ValueError("Amenity already exist.")
+        self._index_amenity(amenity)
         return amenity
 
     def get_amenity(self, amenity_id):
@@ -122,7 +652,11 @@ class HBnBFacade:
     def get_all_amenities(self):
         return self.amenity_repo.get_all()
 
-    def update_amenity(self, amenity_id, amenity_data):
+    def get_amenities_page(self, limit, after=None):
+        """Amenities in creation order, after the (created_at, id) key `after`."""
+        return self.amenity_repo.page(limit, after)
+
+    def update_amenity(self, amenity_id, amenity_data, expected_version=None):
         amenity = self.get_amenity(amenity_id)
         if not amenity:
             raise NotFound("Amenity not found")
@@ -131,16 +665,20 @@ class HBnBFacade:
         if not new_name:
             raise ValueError("Amenity name cannot be empty.")
 
-        existing_amenities = self.get_all_amenities()
-        for a in existing_amenities:
-            if a.id != amenity_id and a.name.lower() == new_name.lower():
-                raise ValueError(
-                    "Another amenity with this name already exists.")
-
-        amenity.name = new_name
-        self.amenity_repo.add(amenity)
+        try:
+            amenity = self.amenity_repo.update(amenity_id, {'name': new_name},
+                                               expected_version)
+        except DuplicateEntryError:
+            raise ValueError(
+                "Another amenity with this name already exists.")
+        self._index_amenity(amenity)
         return amenity
 
+    def autocomplete_amenities(self, prefix, limit=10):
+        """Amenities with a word of their name starting with `prefix`."""
+        return self._completions(self.amenity_names, self.amenity_repo,
+                                 prefix, limit)
+
     def create_review(self, review_data):
         text = review_data.get('text')
         if not isinstance(text, str):
@@ -164,7 +702,14 @@ class HBnBFacade:
 
         review = Review(text=text, rating=rating,
                         user_id=user.id, place_id=place.id)
-        self.review_repo.add(review)
+        with self._review_lock(review.id):
+            try:
+                self.review_repo.add(review)
+            except DuplicateEntryError:
+                raise ValueError("User has already reviewed this place.")
+            self._index_review(review)
+            self.place_ratings.add(review.place_id, review.rating)
+            self._sync_rating(review.place_id)
         return review
 
     def get_review(self, review_id):
@@ -176,37 +721,85 @@ class HBnBFacade:
     def get_all_reviews(self):
         return self.review_repo.get_all()
 
+    def get_reviews_page(self, limit, after=None):
+        """Reviews in creation order, after the (created_at, id) key `after`."""
+        return self.review_repo.page(limit, after)
+
+    def search_reviews_text(self, query, limit=None, after=None):
+        """
+        (review, score) of the reviews whose text matches `query`, best
+        first, after the (score, id) key `after`.
+        """
+        return self._text_results(self.review_text, self.review_repo,
+                                  query, limit, after)
+
     def get_reviews_by_place(self, place_id):
         """Retrieve all reviews for a specific place."""
         place = self.place_repo.get(place_id)
         if not place:
             raise ValueError(f"No place found with ID: {place_id}")
 
-        reviews = self.review_repo.get_all()
-        place_reviews = [
-            review for review in reviews if review.place_id == place_id]
-        return place_reviews
-
-    def update_review(self, review_id, review_data):
-        review = self.review_repo.get(review_id)
-        if not review:
+        return self.review_repo.get_all_by_attribute('place_id', place_id)
+
+    def get_reviews_by_time(self, limit=None, after=None, since=None,
+                            until=None, newest_first=False, place_id=None):
+        """
+        Reviews with since <= created_at <= until (None meaning
+        unbounded), oldest or newest first, after the (created_at, id)
+        key `after`; only those of a place when `place_id` is given.
+        """
+        if place_id is None:
+            times = self.review_times
+        else:
+            if not self.place_repo.get(place_id):
+                raise ValueError(f"No place found with ID: {place_id}")
+            times = self.place_review_times.get(place_id)
+            if times is None:
+                return []
+        reviews = (self.review_repo.get(review_id)
+                   for _, review_id in times.range(
+                       since, until, after=after, reverse=newest_first,
+                       limit=limit))
+        # Skip reviews deleted since the index was read
+        return [review for review in reviews if review is not None]
+
+    def get_reviews_by_user(self, user_id):
+        """Retrieve all reviews written by a specific user."""
+        self.get_user(user_id)
+        return self.review_repo.get_all_by_attribute('user_id', user_id)
+
+    def update_review(self, review_id, review_data, expected_version=None):
+        if not self.review_repo.get(review_id):
             raise ValueError(f"No review found with ID: {review_id}")
         text = review_data.get('text', "").strip()
         rating = review_data.get('rating')
-        if text:
-            review.text = text
-        else:
+        if not text:
             raise ValueError("Review text cannot be empty.")
+        changes = {'text': text}
         if isinstance(rating, int) and 1 <= rating <= 5:
-            review.rating = rating
+            changes['rating'] = rating
         elif rating is not None:
             raise ValueError("Rating must be an integer between 1 and 5.")
-        self.review_repo.add(review)
+        with self._review_lock(review_id):
+            review = self.review_repo.get(review_id)
+            if not review:
+                raise ValueError(f"No review found with ID: {review_id}")
+            old_rating = review.rating
+            review = self.review_repo.update(review_id, changes,
+                                             expected_version)
+            self._index_review(review)
+            self.place_ratings.change(review.place_id, old_rating,
+                                      review.rating)
+            self._sync_rating(review.place_id)
         return review
 
     def delete_review(self, review_id):
-        review = self.review_repo.get(review_id)
-        if not review:
-            raise ValueError(f"No review found with ID: {review_id}")
-        self.review_repo.delete(review_id)
+        with self._review_lock(review_id):
+            review = self.review_repo.get(review_id)
+            if not review:
+                raise ValueError(f"No review found with ID: {review_id}")
+            self.review_repo.delete(review_id)
+            self._unindex_review(review)
+            self.place_ratings.remove(review.place_id, review.rating)
+            self._sync_rating(review.place_id)
         return f"Review with ID {review_id} has been deleted."
@@ -0,0 +1,132 @@
+"""
+Top-K ranking of places by a weighted composite score.
+
+Every component is normalised to [0, 1], higher being better:
+
+    rating    average rating / 5 (unrated places score 0)
+    reviews   count / (count + REVIEWS_SCALE), 0.5 at REVIEWS_SCALE reviews
+    price     PRICE_SCALE / (PRICE_SCALE + price), 0.5 at PRICE_SCALE
+    distance  DISTANCE_SCALE_KM / (DISTANCE_SCALE_KM + km), from a point
+
+and the score is their weighted sum. Candidates are read from one of the
+facade's sorted indexes (the "driver"), best driver value first, into a
+heap of the K best places. Since the other components are at most 1, the
+score of every remaining candidate is bounded by the driver weight times
+the current driver value plus the sum of the other weights (times the
+best value of a component when the indexes know it, like the price
+component of the cheapest place); the scan stops as soon as the heap is
+full and its worst score beats that bound.
+"""
+
+import heapq
+
+COMPONENTS = ('rating', 'reviews', 'price', 'distance')
+
+DEFAULT_WEIGHTS = {'rating': 0.5, 'reviews': 0.2, 'price': 0.2,
+                   'distance': 0.1}
+
+REVIEWS_SCALE = 10
+PRICE_SCALE = 100.0
+DISTANCE_SCALE_KM = 5.0
+
+
+def rating_component(average):
+    return average / 5
+
+
+def reviews_component(count):
+    return count / (count + REVIEWS_SCALE)
+
+
+def price_component(price):
+    return PRICE_SCALE / (PRICE_SCALE + max(price, 0.0))
+
+
+def distance_component(distance_km):
+    return DISTANCE_SCALE_KM / (DISTANCE_SCALE_KM + distance_km)
+
+
+class CompositeScore:
+    """
+    Weighted sum of the components. Weights missing from `weights` take
+    their DEFAULT_WEIGHTS value, except distance, which is 0 when no
+    origin point is given.
+    """
+
+    def __init__(self, weights=None, has_origin=False):
+        weights = dict(weights or {})
+        unknown = set(weights) - set(COMPONENTS)
+        if unknown:
+            raise ValueError(f"Unknown score components: {sorted(unknown)}")
+        if not has_origin:
+            if weights.get('distance'):
+                raise ValueError(
+                    "A distance weight needs a latitude and longitude.")
+            weights['distance'] = 0.0
+        self.weights = {name: float(weights.get(name, DEFAULT_WEIGHTS[name]))
+                        for name in COMPONENTS}
+        if any(w < 0 for w in self.weights.values()) \
+                or not any(self.weights.values()):
+            raise ValueError(
+                "Weights must be non-negative and not all zero.")
+
+    def __call__(self, average, count, price, distance_km=None):
+        weights = self.weights
+        score = (weights['rating'] * rating_component(average)
+                 + weights['reviews'] * reviews_component(count)
+                 + weights['price'] * price_component(price))
+        if weights['distance']:
+            score += weights['distance'] * distance_component(distance_km)
+        return score
+
+    def bound(self, component, value, caps=None):
+        """
+        Highest score of a place whose `component` is `value`: every
+        other component counts as its value in `caps`, or else as 1.
+        """
+        caps = caps or {}
+        score = sum(weight * caps.get(name, 1.0)
+                    for name, weight in self.weights.items()
+                    if name != component)
+        # Slack for the rounding of a sum computed in another order
+        return score + self.weights[component] * value + 1e-9
+
+
+def top_k(candidates, k, score, bound=None):
+    """
+    The `k` best (score, id) of `candidates`, (key, id) pairs, best
+    first; ties go to the greater id.
+
+    `score(id)` returns None for a candidate to skip. When `bound(key)`
+    is given, it must be an upper bound of the score of that candidate
+    and of every later one, i.e. candidates come in non-increasing order
+    of their bound; the scan then stops once no remaining candidate can
+    enter the heap.
+    """
+    heap = []
+    for key, obj_id in candidates:
+        if bound is not None and len(heap) == k and heap[0][0] > bound(key):
+            break
+        value = score(obj_id)
+        if value is None:
+            continue
+        if len(heap) < k:
+            heapq.heappush(heap, (value, obj_id))
+        elif (value, obj_id) > heap[0]:
+            heapq.heapreplace(heap, (value, obj_id))
+    return sorted(heap, reverse=True)
+
+
+def scan(fetch, batch=256):
+    """
+    Keys of a sorted index read in batches: `fetch(after, limit)` returns
+    the keys after `after`, so a scan that stops early never reads the
+    rest of the index.
+    """
+    after = None
+    while True:
+        keys = fetch(after, batch)
+        yield from keys
+        if len(keys) < batch:
+            return
+        after = keys[-1]
@@ -0,0 +1,62 @@
+"""
+Latency of PrefixIndex completions over a large number of users.
+
+Each user is indexed like the facade does (full name, last name and
+email). Prefixes of 1 to 4 characters of existing names are completed
+and the latency percentiles printed. Run from part2/:
+
+    python benchmarks/autocomplete.py --entries 1000000
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.persistence.prefix_index import PrefixIndex  # noqa: E402
+
+
+def random_name(rng):
+    return (rng.choice(string.ascii_uppercase)
+            + ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=20000)
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    index = PrefixIndex()
+    names = []
+    start = time.perf_counter()
+    for i in range(args.entries):
+        first, last = random_name(rng), random_name(rng)
+        index.add(f"user-{i}", f"{first} {last}", last,
+                  f"{first}.{last}{i}@example.com")
+        if i % 100 == 0:
+            names.append(first)
+    print(f"indexed {args.entries:,} users in "
+          f"{time.perf_counter() - start:.1f} s")
+
+    latencies = []
+    for _ in range(args.queries):
+        name = rng.choice(names)
+        prefix = name[:rng.randint(1, 4)]
+        start = time.perf_counter()
+        index.complete(prefix, args.limit)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    for label, q in (('p50', 0.50), ('p99', 0.99), ('max', 1.0)):
+        value = latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+        print(f"{label}: {value * 1e6:8.1f} us")
+
+
+if __name__ == '__main__':
+    main()
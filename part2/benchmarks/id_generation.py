@@ -0,0 +1,64 @@
+"""
+Cost of the id generators, and of inserting their ids into SQLite.
+
+Times each generator of app.models.ids per id, with one os.urandom call
+per id (batch 1) and per --batch ids. Then inserts --rows rows keyed by
+random (uuid4) and by time-ordered (uuid7) ids into a table whose
+primary key is the id, like the sqlite backend's tables: ordered ids
+are appended to the B-tree instead of splitting pages all over it. Run
+from part2/:
+
+    python benchmarks/id_generation.py --ids 200000 --rows 1000000
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.ids import id_generator  # noqa: E402
+
+
+def insert_seconds(path, generator, rows, chunk=10000):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (id TEXT PRIMARY KEY, value INTEGER)")
+    start = time.perf_counter()
+    for offset in range(0, rows, chunk):
+        with conn:
+            conn.executemany("INSERT INTO items VALUES (?, ?)",
+                             ((generator(), i) for i in range(chunk)))
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--ids', type=int, default=200000)
+    parser.add_argument('--batch', type=int, default=256)
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    for name in ('uuid4', 'uuid7'):
+        for batch in (1, args.batch):
+            generator = id_generator(name, batch)
+            start = time.perf_counter()
+            for _ in range(args.ids):
+                generator()
+            per_id = (time.perf_counter() - start) / args.ids * 1e9
+            print(f"{name} batch {batch:4}: {per_id:7.0f} ns per id")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ('uuid4', 'uuid7'):
+            seconds = insert_seconds(os.path.join(directory, f"{name}.db"),
+                                     id_generator(name, args.batch),
+                                     args.rows)
+            print(f"insert {args.rows:,} {name} keys: {seconds:6.2f} s")
+
+
+if __name__ == '__main__':
+    main()
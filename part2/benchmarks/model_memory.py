@@ -0,0 +1,67 @@
+"""
+Memory used per model instance, measured with tracemalloc.
+
+Users, places, reviews and amenities are built like the facade builds
+them from request payloads: foreign keys such as a review's place_id
+arrive as new strings parsed from JSON, not as the referenced object's
+own id. The bytes allocated per instance, its strings and timestamps
+included, are printed for each model. Run from part2/:
+
+    python benchmarks/model_memory.py --entities 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.amenity import Amenity  # noqa: E402
+from app.models.place import Place  # noqa: E402
+from app.models.review import Review  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+def from_json(value):
+    """A copy of a string, as decoded from a request body."""
+    return json.loads(json.dumps(value))
+
+
+def measure(label, count, build):
+    """Build `count` instances and print the bytes allocated per instance."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [build(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{label:>8}: {(after - before) / count:8.1f} bytes per instance")
+    return instances
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entities', type=int, default=100000)
+    args = parser.parse_args()
+    count = args.entities
+    rng = random.Random(0)
+
+    users = measure('User', count, lambda i: User(
+        first_name=f"First{i % 500}", last_name=f"Last{i % 700}",
+        email=f"user{i}@example.com"))
+    owners = [user.id for user in users[:1000]]
+    places = measure('Place', count, lambda i: Place(
+        title=f"Place {i}", price=float(rng.randint(20, 500)),
+        latitude=rng.uniform(-90, 90), longitude=rng.uniform(-180, 180),
+        owner_id=from_json(rng.choice(owners))))
+    measure('Review', count, lambda i: Review(
+        text="Great stay", rating=rng.randint(1, 5),
+        place_id=from_json(places[i % len(places)].id),
+        user_id=from_json(users[(i * 7) % len(users)].id)))
+    measure('Amenity', count, lambda i: Amenity(name=f"Amenity {i}"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Latency of a combined place filter on PlaceColumns against a Python loop.
+
+Random places are stored in PlaceColumns and, for comparison, in a list
+of (price, latitude, longitude, rating, owner) tuples, a lower bound
+for a loop over Place objects. The same price range AND bounding box
+AND minimum rating filter is then timed on both. Needs NumPy. Run from
+part2/:
+
+    python benchmarks/place_filter.py --places 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.persistence.column_store import PlaceColumns  # noqa: E402
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--places', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    columns = PlaceColumns()
+    rows = []
+    start = time.perf_counter()
+    for i in range(args.places):
+        row = (float(rng.randint(20, 500)), rng.uniform(-60, 60),
+               rng.uniform(-180, 180), rng.uniform(0, 5),
+               f"owner{rng.randrange(10000)}")
+        rows.append(row)
+        columns.add(f"place-{i}", row[0], row[1], row[2], row[4])
+        columns.set_rating(f"place-{i}", 1, row[3])
+    print(f"stored {args.places:,} places in "
+          f"{time.perf_counter() - start:.1f} s")
+
+    min_price, max_price, min_rating = 80.0, 150.0, 4.0
+    box = (35.0, -10.0, 60.0, 30.0)
+
+    def loop():
+        min_lat, min_lon, max_lat, max_lon = box
+        return sum(1 for price, lat, lon, rating, _ in rows
+                   if min_price <= price <= max_price
+                   and min_lat <= lat <= max_lat
+                   and min_lon <= lon <= max_lon and rating >= min_rating)
+
+    vectorized, (count, _) = timed(lambda: columns.filter(
+        min_price, max_price, box, min_rating, limit=100), args.repeat)
+    looped, expected = timed(loop, max(1, args.repeat // 5))
+    assert count == expected
+    print(f"{count:,} matches")
+    print(f"  columns: {vectorized:8.2f} ms")
+    print(f"     loop: {looped:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
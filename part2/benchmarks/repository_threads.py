@@ -0,0 +1,103 @@
+"""
+Throughput of the in-memory repositories under 1..N threads.
+
+Each thread runs a mixed workload (reads by id, lookups by a unique
+attribute and updates) against InMemoryRepository, which serializes
+every write behind one lock, and ShardedRepository. Run from part2/:
+
+    python benchmarks/repository_threads.py --threads 8 --seconds 2
+
+On a free-threaded CPython build (3.13t and later, PYTHON_GIL=0) the
+sharded repository is expected to scale with the thread count; with the
+GIL both mostly measure lock overhead.
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.user import User  # noqa: E402
+from app.persistence.repository import (  # noqa: E402
+    InMemoryRepository, UniqueConstraint)
+from app.persistence.sharded_repository import ShardedRepository  # noqa: E402
+
+
+def populate(repo, count):
+    users = [User(first_name="User", last_name=str(i),
+                  email=f"user{i}@example.com") for i in range(count)]
+    for user in users:
+        repo.add(user)
+    return [user.id for user in users]
+
+
+def worker(repo, ids, write_ratio, deadline, counts, slot):
+    rng = random.Random(slot)
+    operations = 0
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            roll = rng.random()
+            obj_id = rng.choice(ids)
+            if roll < write_ratio:
+                repo.update(obj_id, {"first_name": f"User{operations}"})
+            elif roll < 0.5 + write_ratio / 2:
+                repo.get(obj_id)
+            else:
+                n = rng.randrange(len(ids))
+                repo.get_by_attribute('email', f"user{n}@example.com")
+            operations += 1
+    counts[slot] = operations
+
+
+def run(repo, ids, threads, seconds, write_ratio):
+    counts = [0] * threads
+    deadline = time.perf_counter() + seconds
+    pool = [threading.Thread(target=worker,
+                             args=(repo, ids, write_ratio, deadline,
+                                   counts, slot))
+            for slot in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return sum(counts) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--entities', type=int, default=10000)
+    parser.add_argument('--writes', type=float, default=0.1,
+                        help="fraction of operations that are updates")
+    parser.add_argument('--shards', type=int, default=16)
+    args = parser.parse_args()
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'on' if gil else 'off'}, "
+          f"{args.entities} users, {args.writes:.0%} writes")
+    factories = {
+        'InMemoryRepository': lambda: InMemoryRepository(
+            unique=(UniqueConstraint('email'),)),
+        'ShardedRepository': lambda: ShardedRepository(
+            shards=args.shards, unique=(UniqueConstraint('email'),)),
+    }
+    print(f"{'threads':>7}" + ''.join(f"{name:>22}" for name in factories))
+    threads = 1
+    while threads <= args.threads:
+        row = f"{threads:>7}"
+        for factory in factories.values():
+            repo = factory()
+            ids = populate(repo, args.entities)
+            ops = run(repo, ids, threads, args.seconds, args.writes)
+            row += f"{ops:>18,.0f} op/s"
+        print(row)
+        threads *= 2
+
+
+if __name__ == '__main__':
+    main()
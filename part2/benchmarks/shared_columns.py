@@ -0,0 +1,95 @@
+"""
+Throughput and memory of worker processes reading shared place columns.
+
+A publisher writes random places to shared memory, then 1, 2, ... up to
+--workers processes attach to them and run the same combined filter as
+benchmarks/place_filter.py in a loop for --seconds. The queries per
+second of all workers together and the private memory each worker holds
+after attaching (Linux only, from /proc/self/smaps_rollup) are printed:
+the columns themselves are shared, not copied. Needs NumPy. Run from
+part2/:
+
+    python benchmarks/shared_columns.py --places 1000000 --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.persistence.shared_columns import (  # noqa: E402
+    SharedColumnPublisher, SharedPlaceColumns)
+
+QUERY = {'min_price': 80.0, 'max_price': 150.0,
+         'box': (35.0, -10.0, 60.0, 30.0), 'min_rating': 4.0, 'limit': 100}
+
+
+def private_kb():
+    """Private memory of this process in kB, None outside Linux."""
+    try:
+        with open('/proc/self/smaps_rollup') as smaps:
+            return sum(int(line.split()[1]) for line in smaps
+                       if line.startswith(('Private_Clean', 'Private_Dirty')))
+    except OSError:
+        return None
+
+
+def worker(name, seconds, start):
+    columns = SharedPlaceColumns(name)
+    before = private_kb()
+    columns.filter(**QUERY)
+    grown = None if before is None else private_kb() - before
+    start.wait()
+    queries = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        columns.filter(**QUERY)
+        queries += 1
+    columns.close()
+    return queries, grown
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--places', type=int, default=1000000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    rows = [(f"place-{i}", float(rng.randint(20, 500)), rng.uniform(-60, 60),
+             rng.uniform(-180, 180), f"owner{rng.randrange(10000)}", 1,
+             rng.uniform(0, 5)) for i in range(args.places)]
+    name = f"hbnb_bench_{os.getpid()}"
+    publisher = SharedColumnPublisher(name)
+    try:
+        start = time.perf_counter()
+        publisher.publish(rows)
+        print(f"published {args.places:,} places in "
+              f"{time.perf_counter() - start:.1f} s")
+        del rows
+        context = multiprocessing.get_context('spawn')
+        workers = 1
+        while workers <= args.workers:
+            with context.Manager() as manager, context.Pool(workers) as pool:
+                barrier = manager.Barrier(workers)
+                results = pool.starmap(
+                    worker, [(name, args.seconds, barrier)] * workers)
+            total = sum(queries for queries, _ in results)
+            grown = max((kb for _, kb in results if kb is not None),
+                        default=None)
+            memory = '' if grown is None else \
+                f", +{grown / 1024:.1f} MB private per worker"
+            print(f"{workers:3} workers: {total / args.seconds:9.0f} "
+                  f"queries/s{memory}")
+            workers *= 2
+    finally:
+        publisher.close()
+
+
+if __name__ == '__main__':
+    main()
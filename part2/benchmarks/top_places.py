@@ -0,0 +1,75 @@
+"""
+Latency of facade.get_top_places() against scoring every place.
+
+Places are created through an in-memory facade; their ratings are fed
+straight into its rating index rather than created as reviews, which
+would need one user per review. The top K is then queried with the
+rating, price and radius candidate sources, and the time compared with
+a full scan and sort of the same scores. Run from part2/:
+
+    python benchmarks/top_places.py --places 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.facade import HBnBFacade  # noqa: E402
+from app.services.ranking import CompositeScore  # noqa: E402
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--places', type=int, default=200000)
+    parser.add_argument('--k', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    facade = HBnBFacade()
+    owner = facade.create_user({"first_name": "Bench", "last_name": "Owner",
+                                "email": "bench@example.com"})
+    start = time.perf_counter()
+    for i in range(args.places):
+        place = facade.create_place({
+            "title": f"Place {i}", "price": float(rng.randint(20, 500)),
+            "latitude": 48.5 + rng.random(), "longitude": 2.0 + rng.random(),
+            "owner_id": owner.id})
+        for _ in range(rng.randint(0, 6)):
+            facade.place_ratings.add(place.id, rng.randint(1, 5))
+    print(f"created {args.places:,} places in "
+          f"{time.perf_counter() - start:.1f} s")
+
+    def full_scan(weights):
+        score = CompositeScore(weights)
+        ranked = []
+        for place in facade.get_all_places():
+            count, average = facade.place_ratings.summary(place.id)
+            ranked.append((score(average, count, place.price), place.id))
+        return sorted(ranked, reverse=True)[:args.k]
+
+    for label, kwargs in (
+            ('rating first', {'weights': {'rating': 1.0, 'price': 0.2}}),
+            ('price first', {'weights': {'price': 1.0, 'rating': 0.2}}),
+            ('within 2 km', {'latitude': 49.0, 'longitude': 2.5,
+                             'radius_km': 2.0})):
+        top = timed(lambda: facade.get_top_places(args.k, **kwargs),
+                    args.repeat)
+        print(f"{label:>13}: {top:8.2f} ms")
+    scan = timed(lambda: full_scan({'rating': 1.0, 'price': 0.2}), 3)
+    print(f"{'full scan':>13}: {scan:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,31 @@ import os
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     DEBUG = False
+    # Storage backend used by the facade: 'memory', 'sharded', 'durable'
+    # or 'sqlite'
+    REPOSITORY = os.getenv('HBNB_REPOSITORY', 'memory')
+    # 'sharded' backend: number of lock-striped partitions per repository
+    REPOSITORY_SHARDS = int(os.getenv('HBNB_REPOSITORY_SHARDS', '16'))
+    DATABASE_PATH = os.getenv('HBNB_DATABASE_PATH', 'hbnb.sqlite3')
+    # 'durable' backend: journal directory, seconds between snapshots and
+    # whether each write waits for its fsync
+    DATA_DIR = os.getenv('HBNB_DATA_DIR', 'instance')
+    SNAPSHOT_INTERVAL = float(os.getenv('HBNB_SNAPSHOT_INTERVAL', '60'))
+    JOURNAL_SYNC = os.getenv('HBNB_JOURNAL_SYNC', '0') == '1'
+    # 'json' or 'binary' (memory-mapped, hydrated lazily on boot)
+    SNAPSHOT_FORMAT = os.getenv('HBNB_SNAPSHOT_FORMAT', 'json')
+    # Columnar (NumPy) mirror of the places for /places/filter; ignored
+    # when NumPy is not installed
+    PLACE_COLUMNS = os.getenv('HBNB_PLACE_COLUMNS', '1') == '1'
+    # Name of the shared memory segments a column loader publishes
+    # (python -m app.services.column_loader); when set, the facade reads
+    # the place columns from them instead of keeping its own
+    SHARED_COLUMNS = os.getenv('HBNB_SHARED_COLUMNS', '')
+    # Model ids: 'uuid4' (random) or 'uuid7' (time-ordered, usable as
+    # pagination cursors), and how many ids share one read of random
+    # bytes from the OS
+    ID_GENERATOR = os.getenv('HBNB_ID_GENERATOR', 'uuid4')
+    ID_BATCH = int(os.getenv('HBNB_ID_BATCH', '1'))
 
 
 class DevelopmentConfig(Config):
@@ -45,6 +45,17 @@ class TestUserPlaceReviewEndpoints(unittest.TestCase):
         - test_14_update_amenity(self): testing updating amenity
         - test_15_update_nonexistent_amenity(self): testing updating non existing amenity
 
+    === Testing Place amenities ===
+        - test_16_attach_amenities_to_place(self): attach amenities in bulk
+        - test_17_detach_amenities_from_place(self): detach amenities in bulk
+        - test_18_attach_unknown_amenity(self): unknown amenity ID
+
+    === Testing optimistic concurrency ===
+        - test_19_etag_on_get(self): ETag carries the entity version
+        - test_20_if_match_update(self): matching If-Match is applied
+        - test_21_stale_if_match_rejected(self): stale If-Match returns 412
+        - test_22_client_version_ignored(self): a version in the body is ignored
+
     """
 
     @classmethod
@@ -364,5 +375,84 @@ class TestUserPlaceReviewEndpoints(unittest.TestCase):
         self.assertEqual(response.json["error"], "Amenity not found")
 
 
+    def test_16_attach_amenities_to_place(self):
+        """Test attaching amenities to a place."""
+        self.assertTrue(hasattr(TestUserPlaceReviewEndpoints, 'place_id'))
+        amenity_ids = [a["id"] for a in
+                       self.client.get("/api/v1/amenities/").json]
+        response = self.client.post(
+            f'/api/v1/places/{TestUserPlaceReviewEndpoints.place_id}/amenities',
+            json={"amenity_ids": amenity_ids})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([a["id"] for a in response.json], amenity_ids)
+
+        response = self.client.get(
+            f'/api/v1/places/{TestUserPlaceReviewEndpoints.place_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([a["id"] for a in response.json["amenities"]],
+                         amenity_ids)
+
+    def test_17_detach_amenities_from_place(self):
+        """Test detaching amenities from a place."""
+        self.assertTrue(hasattr(TestUserPlaceReviewEndpoints, 'place_id'))
+        url = f'/api/v1/places/{TestUserPlaceReviewEndpoints.place_id}/amenities'
+        attached = self.client.get(url).json
+        response = self.client.delete(
+            url, json={"amenity_ids": [attached[0]["id"]]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, attached[1:])
+
+    def test_18_attach_unknown_amenity(self):
+        """Test attaching an amenity that does not exist."""
+        self.assertTrue(hasattr(TestUserPlaceReviewEndpoints, 'place_id'))
+        response = self.client.post(
+            f'/api/v1/places/{TestUserPlaceReviewEndpoints.place_id}/amenities',
+            json={"amenity_ids": ["123e4567-e89b-12d3-a456-426614174000"]})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(
+            '/api/v1/places/invalid-id/amenities', json={"amenity_ids": []})
+        self.assertEqual(response.status_code, 404)
+
+    def test_19_etag_on_get(self):
+        """Test that single-entity responses carry an ETag."""
+        self.assertTrue(hasattr(TestUserPlaceReviewEndpoints, 'user_id'))
+        response = self.client.get(
+            f'/api/v1/users/{TestUserPlaceReviewEndpoints.user_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response.headers["ETag"], r'^"\d+"$')
+
+    def test_20_if_match_update(self):
+        """Test that an update with the current ETag is applied."""
+        url = f'/api/v1/places/{TestUserPlaceReviewEndpoints.place_id}'
+        etag = self.client.get(url).headers["ETag"]
+        response = self.client.put(url, json={"title": "Versioned Place"},
+                                   headers={"If-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        TestUserPlaceReviewEndpoints.place_etag = response.headers["ETag"]
+
+    def test_21_stale_if_match_rejected(self):
+        """Test that an update based on an old version returns 412."""
+        url = f'/api/v1/places/{TestUserPlaceReviewEndpoints.place_id}'
+        response = self.client.put(url, json={"title": "Lost Update"},
+                                   headers={"If-Match": '"1"'})
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(response.headers["ETag"],
+                         TestUserPlaceReviewEndpoints.place_etag)
+        self.assertEqual(self.client.get(url).json["title"], "Versioned Place")
+        response = self.client.put(url, json={"title": "Any Version"},
+                                   headers={"If-Match": "*"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_22_client_version_ignored(self):
+        """Test that a version sent in a PUT body does not change the ETag."""
+        url = f'/api/v1/places/{TestUserPlaceReviewEndpoints.place_id}'
+        etag = int(self.client.get(url).headers["ETag"].strip('"'))
+        for version in (1, "abc"):
+            response = self.client.put(url, json={"version": version})
+            self.assertEqual(response.status_code, 200)
+            etag += 1
+            self.assertEqual(response.headers["ETag"], f'"{etag}"')
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,158 @@
+import os
+import shutil
+import tempfile
+import unittest
+from app.models.user import User
+from app.models.place import Place
+from app.persistence.binary_snapshot import (
+    BinarySnapshot, schema_for, write_snapshot)
+from app.persistence.durable_repository import (
+    DurableRepository, MappedDurableRepository)
+from app.persistence.repository import UniqueConstraint, DuplicateEntryError
+from app.persistence.schema import FIELDS, to_record
+
+
+class TestBinarySnapshot(unittest.TestCase):
+    """
+    Unit tests for the binary snapshot format and its lazy repository.
+
+    === Setup ===
+        - setUp(self): writes a few places and users into a temporary directory.
+
+    === Testing the file format ===
+        - test_01_round_trip(self): every field survives, including None
+        - test_02_lookup_by_id(self): binary search over the id index
+
+    === Testing MappedDurableRepository ===
+        - test_03_lazy_hydration(self): nothing is built until get()
+        - test_04_log_tail_shadows_snapshot(self): later writes win
+        - test_05_indexes_from_mapped_fields(self): lookups and constraints
+        - test_06_snapshot_keeps_cold_records(self): re-snapshot without hydrating
+        - test_07_json_snapshot_upgrade(self): JSON snapshot still readable
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.places = [
+            Place(title=f"Place {i}", price=10.5 * i, latitude=i,
+                  longitude=-i, owner_id="owner-1",
+                  description=None if i % 2 else f"Description {i}")
+            for i in range(20)
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, records, segment=7):
+        path = os.path.join(self.tmpdir, 'places.bin')
+        with open(path, 'wb') as f:
+            write_snapshot(f, schema_for(FIELDS[Place]), segment, records)
+        return BinarySnapshot(path)
+
+    def _open_users(self):
+        return MappedDurableRepository(
+            User, self.tmpdir, unique=(UniqueConstraint('email'),))
+
+    def _seed_users(self, count=10):
+        repo = self._open_users()
+        users = [User(first_name="User", last_name=str(i),
+                      email=f"user{i}@example.com") for i in range(count)]
+        for user in users:
+            repo.add(user)
+        repo.snapshot()
+        repo.close()
+        return users
+
+    def test_01_round_trip(self):
+        """Test that every stored value decodes unchanged."""
+        snapshot = self._write([to_record(p) for p in self.places])
+        self.assertEqual(len(snapshot), 20)
+        self.assertEqual(snapshot.segment, 7)
+        for number, place in enumerate(self.places):
+            self.assertEqual(snapshot.record(number), to_record(place))
+        snapshot.close()
+
+    def test_02_lookup_by_id(self):
+        """Test that ids are found through the sorted index."""
+        snapshot = self._write([to_record(p) for p in self.places])
+        for place in self.places:
+            self.assertEqual(snapshot.get(place.id)['title'], place.title)
+        self.assertNotIn("nonexistent", snapshot)
+        self.assertEqual(snapshot.fields(0, ['price', 'owner_id']),
+                         {'price': 0.0, 'owner_id': "owner-1"})
+        snapshot.close()
+
+    def test_03_lazy_hydration(self):
+        """Test that a restarted repository only hydrates what is read."""
+        users = self._seed_users()
+        repo = self._open_users()
+        self.assertEqual(len(repo._storage), 0)
+        user = repo.get(users[3].id)
+        self.assertEqual(user.email, "user3@example.com")
+        self.assertEqual(user.created_at, users[3].created_at)
+        self.assertEqual(len(repo._storage), 1)
+        self.assertIs(repo.get(users[3].id), user)
+        self.assertEqual(len(repo.get_all()), 10)
+        repo.close()
+
+    def test_04_log_tail_shadows_snapshot(self):
+        """Test that updates and deletes after the snapshot are replayed."""
+        users = self._seed_users()
+        repo = self._open_users()
+        repo.update(users[0].id, {"first_name": "Updated"})
+        repo.delete(users[1].id)
+        repo.close()
+
+        repo = self._open_users()
+        self.assertEqual(repo.get(users[0].id).first_name, "Updated")
+        self.assertIsNone(repo.get(users[1].id))
+        self.assertEqual(len(repo.get_all()), 9)
+        repo.close()
+
+    def test_05_indexes_from_mapped_fields(self):
+        """Test lookups and unique constraints over cold records."""
+        users = self._seed_users()
+        repo = self._open_users()
+        found = repo.get_by_attribute('email', "user5@example.com")
+        self.assertEqual(found.id, users[5].id)
+        self.assertEqual(len(repo._storage), 1)
+        with self.assertRaises(DuplicateEntryError):
+            repo.add(User(first_name="Dup", last_name="Dup",
+                          email="user6@example.com"))
+        repo.close()
+
+    def test_06_snapshot_keeps_cold_records(self):
+        """Test that a new snapshot carries cold records over."""
+        users = self._seed_users()
+        repo = self._open_users()
+        repo.update(users[2].id, {"last_name": "Changed"})
+        repo.snapshot()
+        self.assertEqual(len(repo._storage), 1)
+        repo.close()
+
+        repo = self._open_users()
+        self.assertEqual(len(repo.get_all()), 10)
+        self.assertEqual(repo.get(users[2].id).last_name, "Changed")
+        repo.close()
+
+    def test_07_json_snapshot_upgrade(self):
+        """Test that a JSON snapshot from the other format is still loaded."""
+        repo = DurableRepository(User, self.tmpdir)
+        user = User(first_name="John", last_name="Doe",
+                    email="john.doe@example.com")
+        repo.add(user)
+        repo.snapshot()
+        repo.close()
+
+        repo = self._open_users()
+        self.assertEqual(repo.get(user.id).email, "john.doe@example.com")
+        repo.snapshot()
+        repo.close()
+        repo = self._open_users()
+        self.assertIsNotNone(repo._cold)
+        self.assertEqual(repo.get(user.id).email, "john.doe@example.com")
+        repo.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
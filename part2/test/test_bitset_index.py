@@ -0,0 +1,202 @@
+import random
+import unittest
+from app import create_app
+from app.persistence.bitset_index import CHUNK_BITS, BitsetIndex, iter_bits
+
+
+class TestBitsetIndex(unittest.TestCase):
+    """
+    Unit tests for the place <-> amenity bitmaps.
+
+    === Setup ===
+        - setUp(self): 10000 places with random tags, spanning chunks.
+
+    === Testing BitsetIndex ===
+        - test_01_iter_bits(self): set bit positions, lowest first
+        - test_02_match_matches_scan(self): same places as a full scan
+        - test_03_facets_match_scan(self): same counts as a full scan
+        - test_04_churn(self): unlinks and removed places are cleared
+        - test_05_pages(self): `after` resumes, even after a removed place
+    """
+
+    TAGS = [f"tag{i}" for i in range(8)]
+
+    def setUp(self):
+        rng = random.Random(18)
+        self.index = BitsetIndex()
+        self.tags = {}
+        for i in range(10000):
+            place_id = f"p{i:05}"
+            self.index.add_place(place_id)
+            self.tags[place_id] = set(rng.sample(self.TAGS,
+                                                 rng.randint(0, 4)))
+            for tag in self.tags[place_id]:
+                self.index.link(place_id, tag)
+
+    def _expected(self, tags):
+        return [place_id for place_id, place_tags in self.tags.items()
+                if set(tags) <= place_tags]
+
+    def test_01_iter_bits(self):
+        """Test that iter_bits yields every set bit in order."""
+        self.assertEqual(list(iter_bits(0)), [])
+        self.assertEqual(list(iter_bits(0b101001)), [0, 3, 5])
+        self.assertEqual(list(iter_bits(1 << 5000 | 2)), [1, 5000])
+
+    def test_02_match_matches_scan(self):
+        """Test matches against a brute-force scan."""
+        for tags in ([], ["tag1"], ["tag1", "tag2"], ["tag0", "tag3", "tag5"],
+                     ["tag2", "tag2"], ["unknown"], ["tag1", "unknown"]):
+            with self.subTest(tags=tags):
+                expected = self._expected(tags)
+                self.assertEqual(self.index.match(tags), expected)
+                self.assertEqual(self.index.match(tags, limit=7),
+                                 expected[:7])
+
+    def test_03_facets_match_scan(self):
+        """Test facet counts against a brute-force scan."""
+        for tags in ([], ["tag4"], ["tag4", "tag6"]):
+            with self.subTest(tags=tags):
+                matching = self._expected(tags)
+                expected = {}
+                for place_id in matching:
+                    for tag in self.tags[place_id]:
+                        expected[tag] = expected.get(tag, 0) + 1
+                self.assertEqual(self.index.facets(tags),
+                                 (len(matching), expected))
+
+    def test_04_churn(self):
+        """Test that unlinked tags and discarded places stop matching."""
+        rng = random.Random(3)
+        places = sorted(self.tags)
+        for _ in range(3000):
+            place_id = rng.choice(places)
+            tag = rng.choice(self.TAGS)
+            if rng.random() < 0.5:
+                self.index.unlink(place_id, tag)
+                self.tags[place_id].discard(tag)
+            else:
+                self.index.link(place_id, tag)
+                self.tags[place_id].add(tag)
+        for place_id in places[::7]:
+            self.index.discard_place(place_id)
+            del self.tags[place_id]
+        self.index.discard_place("unknown")
+        self.index.unlink("p00001", "unknown")
+        self.assertEqual(len(self.index), len(self.tags))
+        self.assertEqual(self.index.match([]), list(self.tags))
+        self.assertEqual(self.index.match(["tag7", "tag0"]),
+                         self._expected(["tag7", "tag0"]))
+        self.assertEqual(self.index.facets(["tag3"])[0],
+                         len(self._expected(["tag3"])))
+
+    def test_05_pages(self):
+        """Test that pages resumed with `after` cover the matches."""
+        expected = self._expected(["tag1"])
+        found, after = [], None
+        while True:
+            page = self.index.match(["tag1"], limit=CHUNK_BITS // 3,
+                                    after=after)
+            if not page:
+                break
+            found += page
+            after = page[-1]
+        self.assertEqual(found, expected)
+
+        removed = expected[10]
+        self.index.discard_place(removed)
+        self.assertEqual(self.index.match(["tag1"], limit=3, after=removed),
+                         expected[11:14])
+        with self.assertRaises(KeyError):
+            self.index.match(["tag1"], after="unknown")
+
+
+class TestAmenityFilterEndpoints(unittest.TestCase):
+    """
+    Tests for ?amenities= on the places list and /places/facets.
+
+    === Setup ===
+        - setUp(self): test client, an owner, three amenities, three places.
+
+    === Testing the endpoints ===
+        - test_01_filter(self): places offering every amenity, pages
+        - test_02_facets(self): counts follow links, unlinks and deletes
+        - test_03_invalid_parameters(self): 400 and 404 on bad input
+    """
+
+    def setUp(self):
+        self.client = create_app().test_client()
+        name = self.id()
+        owner_id = self.client.post('/api/v1/users/', json={
+            "first_name": "Facet", "last_name": "Owner",
+            "email": f"{name}.owner@example.com"}).json["id"]
+        self.amenity_ids = [self.client.post('/api/v1/amenities/', json={
+            "name": f"Facet {self._testMethodName[:7]} {label}"}).json["id"]
+            for label in ("wifi", "pool", "sauna")]
+        self.place_ids = [self.client.post('/api/v1/places/', json={
+            "title": f"Facet {i}", "price": 10.0, "latitude": 1.0,
+            "longitude": 1.0, "owner_id": owner_id}).json["id"]
+            for i in range(3)]
+        wifi, pool, sauna = self.amenity_ids
+        for place_id, amenity_ids in zip(self.place_ids, (
+                [wifi, pool], [wifi, pool, sauna], [wifi])):
+            self.client.post(f'/api/v1/places/{place_id}/amenities',
+                             json={"amenity_ids": amenity_ids})
+
+    def _ids(self, url):
+        return [p["id"] for p in self.client.get(url).json]
+
+    def test_01_filter(self):
+        """Test that ?amenities= keeps the places offering all of them."""
+        wifi, pool, sauna = self.amenity_ids
+        url = '/api/v1/places/?amenities='
+        self.assertEqual(self._ids(url + wifi), self.place_ids)
+        self.assertEqual(self._ids(f'{url}{wifi},{pool}'), self.place_ids[:2])
+        self.assertEqual(self._ids(f'{url}{pool},{sauna}'),
+                         self.place_ids[1:2])
+
+        first = self.client.get(f'{url}{wifi}&limit=2')
+        self.assertEqual([p["id"] for p in first.json], self.place_ids[:2])
+        cursor = first.headers['X-Next-Cursor']
+        self.assertEqual(self._ids(f'{url}{wifi}&limit=2&cursor={cursor}'),
+                         self.place_ids[2:])
+
+    def test_02_facets(self):
+        """Test that facet counts follow links, unlinks and deletes."""
+        wifi, pool, sauna = self.amenity_ids
+        response = self.client.get(f'/api/v1/places/facets?amenities={pool}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["count"], 2)
+        self.assertEqual([(a["id"], a["count"])
+                          for a in response.json["amenities"]],
+                         [(pool, 2), (wifi, 2), (sauna, 1)])
+
+        self.client.delete(f'/api/v1/places/{self.place_ids[1]}/amenities',
+                           json={"amenity_ids": [pool]})
+        self.client.delete(f'/api/v1/places/{self.place_ids[0]}')
+        counts = {a["id"]: a["count"] for a in self.client.get(
+            f'/api/v1/places/facets?amenities={wifi}').json["amenities"]}
+        self.assertEqual((counts[wifi], counts[sauna]), (2, 1))
+        self.assertNotIn(pool, counts)
+        self.assertGreaterEqual(
+            self.client.get('/api/v1/places/facets').json["count"], 2)
+
+    def test_03_invalid_parameters(self):
+        """Test that bad amenity filters return 400 or 404."""
+        wifi = self.amenity_ids[0]
+        for url, status in (
+                ('/api/v1/places/?amenities=', 400),
+                ('/api/v1/places/?amenities=%20,', 400),
+                (f'/api/v1/places/?amenities={wifi}&q=facet', 400),
+                (f'/api/v1/places/?amenities={wifi}&sort=price', 400),
+                (f'/api/v1/places/?amenities={wifi}&stream=true', 400),
+                (f'/api/v1/places/?amenities={wifi}&cursor=abc', 400),
+                ('/api/v1/places/?amenities=unknown', 404),
+                ('/api/v1/places/facets?amenities=unknown', 404),
+                ('/api/v1/places/facets?amenities=,', 400)):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, status)
+
+
+if __name__ == "__main__":
+    unittest.main()
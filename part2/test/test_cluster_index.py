@@ -0,0 +1,131 @@
+import random
+import unittest
+from app import create_app
+from app.persistence.cluster_index import ClusterIndex, tile_of
+
+
+class TestClusterIndex(unittest.TestCase):
+    """
+    Unit tests for the quadtree of zoom-level aggregates.
+
+    === Setup ===
+        - setUp(self): a small quadtree and a brute-force reference.
+
+    === Testing ClusterIndex ===
+        - test_01_tile_of(self): Web Mercator tile coordinates
+        - test_02_aggregates_after_churn(self): inserts, moves and deletes
+        - test_03_clusters_for_viewport(self): only visible tiles returned
+        - test_04_antimeridian_viewport(self): viewport wrapping at 180°
+    """
+
+    def setUp(self):
+        self.index = ClusterIndex(max_zoom=8)
+        self.places = {}
+
+    def _add(self, obj_id, lat, lon, price):
+        self.index.add(obj_id, lat, lon, price)
+        self.places[obj_id] = (lat, lon, price)
+
+    def _expected(self, zoom):
+        """Aggregates of a level computed from scratch."""
+        tiles = {}
+        for lat, lon, price in self.places.values():
+            tiles.setdefault(tile_of(lat, lon, zoom), []).append(
+                (lat, lon, price))
+        return {tile: (len(members),
+                       round(sum(m[0] for m in members) / len(members), 9),
+                       round(sum(m[1] for m in members) / len(members), 9),
+                       min(m[2] for m in members), max(m[2] for m in members))
+                for tile, members in tiles.items()}
+
+    def _actual(self, zoom):
+        return {(c['x'], c['y']): (c['count'], round(c['latitude'], 9),
+                                   round(c['longitude'], 9),
+                                   c['min_price'], c['max_price'])
+                for c in self.index.clusters(-90, -180, 90, 180, zoom)}
+
+    def test_01_tile_of(self):
+        """Test tile coordinates against known values."""
+        self.assertEqual(tile_of(0, 0, 0), (0, 0))
+        self.assertEqual(tile_of(48.8566, 2.3522, 10), (518, 352))
+        self.assertEqual(tile_of(-89.9, 179.99, 2), (3, 3))
+
+    def test_02_aggregates_after_churn(self):
+        """Test that every level matches a rebuild after random changes."""
+        rng = random.Random(7)
+        for i in range(300):
+            self._add(f"p{i}", rng.uniform(40, 50), rng.uniform(-5, 10),
+                      rng.choice([40.0, 80.0, 120.0, 200.0]))
+        for i in range(0, 300, 3):
+            self.index.discard(f"p{i}")
+            del self.places[f"p{i}"]
+        for i in range(1, 300, 7):
+            self._add(f"p{i}", rng.uniform(40, 50), rng.uniform(-5, 10),
+                      rng.choice([10.0, 500.0]))
+        for zoom in range(self.index.max_zoom + 1):
+            self.assertEqual(self._actual(zoom), self._expected(zoom))
+        self.assertEqual(len(self.index), len(self.places))
+
+    def test_03_clusters_for_viewport(self):
+        """Test that a viewport only returns the tiles it overlaps."""
+        self._add("paris", 48.85, 2.35, 100.0)
+        self._add("paris2", 48.86, 2.34, 50.0)
+        self._add("tokyo", 35.68, 139.69, 90.0)
+        clusters = self.index.clusters(40, -10, 55, 20, 2)
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]['count'], 2)
+        self.assertEqual((clusters[0]['min_price'], clusters[0]['max_price']),
+                         (50.0, 100.0))
+        world = self.index.clusters(-90, -180, 90, 180, 0)
+        self.assertEqual(world[0]['count'], 3)
+
+    def test_04_antimeridian_viewport(self):
+        """Test a viewport crossing longitude 180."""
+        self._add("fiji", -17.7, 178.0, 10.0)
+        self._add("samoa", -13.8, -172.0, 20.0)
+        self._add("sydney", -33.9, 151.2, 30.0)
+        clusters = self.index.clusters(-20, 170, -10, -170, 6)
+        self.assertEqual(sum(c['count'] for c in clusters), 2)
+
+
+class TestClusterEndpoint(unittest.TestCase):
+    """
+    Tests for GET /api/v1/places/clusters.
+
+    === Testing the endpoint ===
+        - test_01_clusters(self): counts follow created and deleted places
+        - test_02_invalid_parameters(self): 400 on a bad viewport or zoom
+    """
+
+    def setUp(self):
+        self.client = create_app().test_client()
+
+    def test_01_clusters(self):
+        """Test that clusters reflect places created through the API."""
+        owner = self.client.post('/api/v1/users/', json={
+            "first_name": "Map", "last_name": "Owner",
+            "email": "map.owner@example.com"}).json
+        url = '/api/v1/places/clusters?bbox=-60,-50,-50,-40&zoom=3'
+        before = sum(c["count"] for c in self.client.get(url).json)
+        ids = [self.client.post('/api/v1/places/', json={
+            "title": f"Remote {i}", "price": 10.0 * (i + 1),
+            "latitude": -45.0 + i * 0.01, "longitude": -55.0,
+            "owner_id": owner["id"]}).json["id"] for i in range(3)]
+        clusters = self.client.get(url).json
+        self.assertEqual(sum(c["count"] for c in clusters), before + 3)
+        self.client.delete(f'/api/v1/places/{ids[0]}')
+        clusters = self.client.get(url).json
+        self.assertEqual(sum(c["count"] for c in clusters), before + 2)
+        self.assertEqual(max(c["max_price"] for c in clusters), 30.0)
+
+    def test_02_invalid_parameters(self):
+        """Test that a bad viewport or zoom returns 400."""
+        for query in ('zoom=3', 'bbox=0,0,1,1', 'bbox=0,0,1,1&zoom=12',
+                      'bbox=0,0,1&zoom=3', 'bbox=0,0,1,1&zoom=x'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/v1/places/clusters?{query}')
+                self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+import random
+import unittest
+from app import create_app
+from app.persistence.column_store import COLUMNS_AVAILABLE, PlaceColumns
+from app.services.facade import HBnBFacade
+
+
+@unittest.skipUnless(COLUMNS_AVAILABLE, "NumPy is not installed")
+class TestPlaceColumns(unittest.TestCase):
+    """
+    Unit tests for the columnar place store.
+
+    === Setup ===
+        - setUp(self): 3000 random places in a store grown from 16 slots.
+
+    === Testing PlaceColumns ===
+        - test_01_filter_matches_scan(self): same places as a full scan
+        - test_02_deleted_slots(self): masked out, kept by their id
+        - test_03_antimeridian(self): a box may cross longitude 180
+    """
+
+    def setUp(self):
+        rng = random.Random(22)
+        self.columns = PlaceColumns(capacity=16)
+        self.places = {}
+        for i in range(3000):
+            place = {'price': float(rng.randint(10, 500)),
+                     'latitude': rng.uniform(-60, 60),
+                     'longitude': rng.uniform(-180, 180),
+                     'owner_id': f"owner{rng.randrange(30)}",
+                     'count': rng.randint(0, 5),
+                     'rating': round(rng.uniform(1, 5), 2)}
+            self._add(f"p{i:04}", place)
+
+    def _add(self, place_id, place):
+        self.places[place_id] = place
+        self.columns.add(place_id, place['price'], place['latitude'],
+                         place['longitude'], place['owner_id'])
+        self.columns.set_rating(place_id, place['count'],
+                                place['rating'] if place['count'] else 0.0)
+
+    def _expected(self, min_price=None, max_price=None, box=None,
+                  min_rating=None, owner_id=None):
+        found = set()
+        for place_id, p in self.places.items():
+            rating = p['rating'] if p['count'] else 0.0
+            if (min_price is not None and p['price'] < min_price) or \
+                    (max_price is not None and p['price'] > max_price) or \
+                    (min_rating is not None and rating < min_rating) or \
+                    (owner_id is not None and p['owner_id'] != owner_id):
+                continue
+            if box is not None:
+                min_lat, min_lon, max_lat, max_lon = box
+                lon = p['longitude']
+                if not min_lat <= p['latitude'] <= max_lat or \
+                        not (min_lon <= lon <= max_lon if min_lon <= max_lon
+                             else lon >= min_lon or lon <= max_lon):
+                    continue
+            found.add(place_id)
+        return found
+
+    def test_01_filter_matches_scan(self):
+        """Test combined predicates against a brute-force scan."""
+        for kwargs in ({}, {'min_price': 100.0, 'max_price': 150.0},
+                       {'box': (-10.0, -20.0, 30.0, 40.0)},
+                       {'min_rating': 4.0, 'max_price': 300.0},
+                       {'owner_id': "owner3", 'min_rating': 2.5},
+                       {'owner_id': "nobody"},
+                       {'min_price': 50.0, 'box': (0.0, 0.0, 60.0, 180.0),
+                        'min_rating': 3.0}):
+            with self.subTest(**kwargs):
+                expected = self._expected(**kwargs)
+                count, ids = self.columns.filter(**kwargs)
+                self.assertEqual((count, set(ids)), (len(expected), expected))
+                count, ids = self.columns.filter(limit=5, **kwargs)
+                self.assertEqual(len(ids), min(5, len(expected)))
+                self.assertLessEqual(set(ids), expected)
+
+    def test_02_deleted_slots(self):
+        """Test that deleted places are masked out and keep their slot."""
+        for place_id in ("p0001", "p0002", "unknown"):
+            self.columns.discard(place_id)
+            self.places.pop(place_id, None)
+        self.assertEqual(len(self.columns), 2998)
+        self.assertEqual(self.columns.filter()[0], 2998)
+        new = {'price': 1.0, 'latitude': 0.0, 'longitude': 0.0,
+               'owner_id': "owner0", 'count': 1, 'rating': 5.0}
+        self._add("new", new)
+        self._add("p0002", new)
+        self.assertEqual(self.columns._keys.get("new"), 3000)
+        self.assertEqual(self.columns._keys.get("p0002"), 2)
+        self.assertEqual(self.columns.filter(max_price=1.0),
+                         (2, ["p0002", "new"]))
+        self.assertEqual(self.columns.filter()[0], 3000)
+
+    def test_03_antimeridian(self):
+        """Test a box crossing the antimeridian."""
+        box = (-60.0, 170.0, 60.0, -170.0)
+        count, ids = self.columns.filter(box=box)
+        self.assertEqual(set(ids), self._expected(box=box))
+        self.assertGreater(count, 0)
+
+
+class TestPlaceFilter(unittest.TestCase):
+    """
+    Tests for the combined place filter through the facade and the API.
+
+    === Setup ===
+        - setUp(self): fresh facade, 200 random places, some reviews.
+
+    === Testing the filter ===
+        - test_01_columns_and_fallback_agree(self): with and without NumPy
+        - test_02_follows_changes(self): updates, reviews and deletes
+        - test_03_endpoint(self): /places/filter and its errors
+    """
+
+    def setUp(self):
+        rng = random.Random(3)
+        self.facade = HBnBFacade()
+        self.owners = [self.facade.create_user({
+            "first_name": "Filter", "last_name": f"Owner{i}",
+            "email": f"filter.owner{i}@example.com"}) for i in range(3)]
+        self.reviewer = self.facade.create_user({
+            "first_name": "Filter", "last_name": "Reviewer",
+            "email": "filter.reviewer@example.com"})
+        self.places = []
+        for i in range(200):
+            place = self.facade.create_place({
+                "title": f"Filter {i}", "price": float(rng.randint(10, 300)),
+                "latitude": rng.uniform(40, 50),
+                "longitude": rng.uniform(-5, 10),
+                "owner_id": rng.choice(self.owners).id})
+            self.places.append(place)
+            if i % 4 == 0:
+                self.facade.create_review({
+                    "text": "Fine", "rating": rng.randint(1, 5),
+                    "user_id": self.reviewer.id, "place_id": place.id})
+
+    def _ids(self, **kwargs):
+        count, places = self.facade.filter_places(**kwargs)
+        self.assertEqual(count, len(places))
+        return {place.id for place in places}
+
+    def test_01_columns_and_fallback_agree(self):
+        """Test that both evaluation paths return the same places."""
+        queries = ({'min_price': 50.0, 'max_price': 120.0},
+                   {'box': (42.0, 0.0, 47.0, 5.0), 'min_rating': 3.0},
+                   {'owner_id': self.owners[1].id, 'max_price': 200.0},
+                   {'min_rating': 0.0})
+        results = [self._ids(**kwargs) for kwargs in queries]
+        self.facade.place_columns = None
+        for kwargs, expected in zip(queries, results):
+            with self.subTest(**kwargs):
+                self.assertEqual(self._ids(**kwargs), expected)
+        self.assertEqual(len(results[-1]), 200)
+
+    def test_02_follows_changes(self):
+        """Test that prices, ratings and deletes reach the filter."""
+        place = self.places[1]
+        self.facade.update_place(place.id, {"price": 5.0})
+        self.assertEqual(self._ids(max_price=5.0), {place.id})
+        review = self.facade.create_review({
+            "text": "Superb", "rating": 5, "user_id": self.reviewer.id,
+            "place_id": place.id})
+        self.assertIn(place.id, self._ids(min_rating=5.0))
+        self.facade.update_review(review.id, {"text": "Meh", "rating": 1})
+        self.assertNotIn(place.id, self._ids(min_rating=2.0))
+        self.facade.delete_place(place.id)
+        self.assertEqual(self._ids(max_price=5.0), set())
+
+    def test_03_endpoint(self):
+        """Test /places/filter and its parameter checks."""
+        client = create_app().test_client()
+        owner_id = client.post('/api/v1/users/', json={
+            "first_name": "Filter", "last_name": "Api",
+            "email": f"{self.id()}@example.com"}).json["id"]
+        ids = [client.post('/api/v1/places/', json={
+            "title": f"Filter api {i}", "price": 42.0 + i, "latitude": -75.0,
+            "longitude": 100.0, "owner_id": owner_id}).json["id"]
+            for i in range(3)]
+        response = client.get('/api/v1/places/filter?bbox=99,-76,101,-74'
+                              f'&owner_id={owner_id}&max_price=43&limit=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['X-Total-Count'], '2')
+        self.assertIn(response.json[0]["id"], ids[:2])
+        for query in ('limit=0', 'min_rating=6', 'min_price=x',
+                      'min_price=5&max_price=1', 'bbox=1,2,3'):
+            with self.subTest(query=query):
+                self.assertEqual(client.get(
+                    f'/api/v1/places/filter?{query}').status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,273 @@
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from app.models.user import User
+from app.persistence.repository import UniqueConstraint, DuplicateEntryError
+from app.persistence.durable_repository import (
+    DurableRepository, DurableAssociationStore)
+from app.services.facade import HBnBFacade
+from config import Config
+
+
+class DurableConfig(Config):
+    REPOSITORY = 'durable'
+    SNAPSHOT_INTERVAL = None
+
+
+class BinaryConfig(DurableConfig):
+    SNAPSHOT_FORMAT = 'binary'
+
+
+class TestDurableRepository(unittest.TestCase):
+    """
+    Unit tests for the journaled in-memory repository.
+
+    === Setup ===
+        - setUp(self): opens a repository in a temporary directory.
+
+    === Testing replay ===
+        - test_01_replay_log(self): add/update/delete survive a restart
+        - test_02_snapshot_compacts_log(self): snapshot replaces old segments
+        - test_03_snapshot_then_log_tail(self): snapshot plus later writes
+        - test_04_torn_tail_ignored(self): half-written last entry skipped
+        - test_05_constraints_after_replay(self): unique keys rebuilt
+        - test_05b_refused_update_not_logged(self): only applied updates
+        - test_06_background_snapshot(self): periodic snapshot thread
+        - test_07_association_store(self): journaled place-amenity links
+        - test_08_facade_backend(self): facade built from config
+        - test_09_group_commit(self): concurrent sync writes share fsyncs
+        - test_10_facade_starts_cold(self): one pass, no models, on boot
+        - test_11_directory_synced(self): new segments and snapshot renames
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.repo = self._open()
+        self.user = User(first_name="John", last_name="Doe",
+                         email="john.doe@example.com")
+        self.repo.add(self.user)
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.tmpdir)
+
+    def _open(self, **kwargs):
+        return DurableRepository(User, self.tmpdir,
+                                 unique=(UniqueConstraint('email'),),
+                                 **kwargs)
+
+    def _reopen(self, **kwargs):
+        self.repo.close()
+        self.repo = self._open(**kwargs)
+        return self.repo
+
+    def _files(self, suffix):
+        return [f for f in os.listdir(self.tmpdir) if suffix in f]
+
+    def test_01_replay_log(self):
+        """Test that every kind of mutation is replayed on boot."""
+        other = User(first_name="Jane", last_name="Doe",
+                     email="jane.doe@example.com")
+        self.repo.add(other)
+        self.repo.update(self.user.id, {"first_name": "Johnny"})
+        self.repo.delete(other.id)
+
+        repo = self._reopen()
+        self.assertEqual(len(repo.get_all()), 1)
+        restored = repo.get(self.user.id)
+        self.assertEqual(restored.first_name, "Johnny")
+        self.assertEqual(restored.created_at, self.user.created_at)
+
+    def test_02_snapshot_compacts_log(self):
+        """Test that a snapshot removes the segments it covers."""
+        for i in range(5):
+            self.repo.update(self.user.id, {"last_name": f"Doe{i}"})
+        self.repo.snapshot()
+        self.assertEqual(len(self._files('.snapshot')), 1)
+        self.assertEqual(len(self._files('.log.')), 1)
+
+        repo = self._reopen()
+        self.assertEqual(repo.get(self.user.id).last_name, "Doe4")
+
+    def test_03_snapshot_then_log_tail(self):
+        """Test that writes after a snapshot are replayed on top of it."""
+        self.repo.snapshot()
+        self.repo.update(self.user.id, {"first_name": "Johnny"})
+        self.repo.add(User(first_name="Jane", last_name="Doe",
+                           email="jane.doe@example.com"))
+
+        repo = self._reopen()
+        self.assertEqual(len(repo.get_all()), 2)
+        self.assertEqual(repo.get(self.user.id).first_name, "Johnny")
+
+    def test_04_torn_tail_ignored(self):
+        """Test that a partially written last entry is skipped."""
+        self.repo.journal.wait()
+        segment = sorted(self._files('.log.'))[-1]
+        with open(os.path.join(self.tmpdir, segment), 'a') as f:
+            f.write('{"op":"put","rec')
+
+        repo = self._reopen()
+        self.assertEqual(len(repo.get_all()), 1)
+        repo.update(self.user.id, {"first_name": "Johnny"})
+        repo = self._reopen()
+        self.assertEqual(repo.get(self.user.id).first_name, "Johnny")
+
+    def test_05_constraints_after_replay(self):
+        """Test that unique constraints are enforced after a restart."""
+        repo = self._reopen()
+        with self.assertRaises(DuplicateEntryError):
+            repo.add(User(first_name="Jane", last_name="Doe",
+                          email="john.doe@example.com"))
+
+    def test_05b_refused_update_not_logged(self):
+        """Test that an update refused by a constraint is not journaled."""
+        other = User(first_name="Jane", last_name="Doe",
+                     email="jane.doe@example.com")
+        self.repo.add(other)
+        appended = self.repo.journal._appended
+        with self.assertRaises(DuplicateEntryError):
+            self.repo.update(other.id, {"email": "john.doe@example.com"})
+        self.assertEqual(self.repo.journal._appended, appended)
+        with self.assertRaises(ValueError):
+            self.repo.update(other.id, {"email": "not-an-email"})
+        # The failed validation bumped the version: that is kept
+        self.assertEqual(self.repo.journal._appended, appended + 1)
+        repo = self._reopen()
+        self.assertEqual(repo.get(other.id).email, "jane.doe@example.com")
+        self.assertEqual(repo.get(other.id).version, 2)
+
+    def test_06_background_snapshot(self):
+        """Test that the snapshot thread persists the state on its own."""
+        repo = self._reopen(snapshot_interval=0.01)
+        repo.update(self.user.id, {"first_name": "Johnny"})
+        deadline = time.time() + 5
+        while repo.mutations_since_snapshot and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(repo.mutations_since_snapshot, 0)
+        self.assertEqual(len(self._files('.snapshot')), 1)
+
+    def test_07_association_store(self):
+        """Test that place-amenity links survive a restart."""
+        store = DurableAssociationStore(self.tmpdir, 'links')
+        store.link("p1", "a1")
+        store.link("p1", "a2")
+        store.snapshot()
+        store.unlink("p1", "a1")
+        store.link("p2", "a2")
+        store.close()
+
+        store = DurableAssociationStore(self.tmpdir, 'links')
+        self.assertEqual(store.rights("p1"), ["a2"])
+        self.assertEqual(store.lefts("a2"), ["p1", "p2"])
+        store.close()
+
+    def test_08_facade_backend(self):
+        """Test that the facade journals its data when configured to."""
+        DurableConfig.DATA_DIR = os.path.join(self.tmpdir, 'facade')
+        facade = HBnBFacade(DurableConfig)
+        user = facade.create_user({"first_name": "Jane", "last_name": "Doe",
+                                   "email": "jane.doe@example.com"})
+        amenity = facade.create_amenity({"name": "WiFi"})
+        place = facade.create_place({
+            "title": "Flat", "price": 80.0, "latitude": 1.0,
+            "longitude": 2.0, "owner_id": user.id})
+        facade.add_amenities_to_place(place.id, [amenity.id])
+        facade.close()
+
+        reopened = HBnBFacade(DurableConfig)
+        self.assertEqual(reopened.get_user(user.id).email,
+                         "jane.doe@example.com")
+        self.assertEqual(
+            [a.id for a in reopened.get_place(place.id).amenities],
+            [amenity.id])
+        reopened.close()
+
+    def test_09_group_commit(self):
+        """Test that sync writes from many threads need fewer fsyncs."""
+        repo = self._reopen(sync=True)
+        barrier = threading.Barrier(20)
+
+        def write(n):
+            barrier.wait()
+            for i in range(10):
+                user = User(first_name="Sync", last_name="User",
+                            email=f"sync{n}.{i}@example.com")
+                repo.add(user)
+
+        with mock.patch('app.persistence.journal.os.fsync',
+                        wraps=os.fsync) as fsync:
+            threads = [threading.Thread(target=write, args=(n,))
+                       for n in range(20)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(repo.get_all()), 201)
+        self.assertLess(fsync.call_count, 150)
+        self.assertEqual(len(self._reopen().get_all()), 201)
+
+    def test_10_facade_starts_cold(self):
+        """Test that the facade indexes a mapped snapshot without models."""
+        BinaryConfig.DATA_DIR = os.path.join(self.tmpdir, 'binary')
+        facade = HBnBFacade(BinaryConfig)
+        owner, guest = (facade.create_user({
+            "first_name": name, "last_name": "Cold",
+            "email": f"{name.lower()}.cold@example.com"})
+            for name in ("Owner", "Guest"))
+        places = [facade.create_place({
+            "title": f"Cold {i}", "description": f"Lodge number{i}",
+            "price": 10.0 * i, "latitude": i, "longitude": i,
+            "owner_id": owner.id}) for i in range(10)]
+        for place in places:
+            facade.create_review({"text": "Warm", "rating": 4,
+                                  "user_id": guest.id, "place_id": place.id})
+        facade.create_amenity({"name": "Fire place"})
+        repos = (facade.user_repo, facade.place_repo, facade.review_repo,
+                 facade.amenity_repo)
+        for repo in repos:
+            repo.snapshot()
+        facade.close()
+
+        facade = HBnBFacade(BinaryConfig)
+        repos = (facade.user_repo, facade.place_repo, facade.review_repo,
+                 facade.amenity_repo)
+        self.assertEqual([len(repo._storage) for repo in repos], [0] * 4)
+        # Built from the same scan: the first write does not walk them
+        self.assertTrue(all(repo._indexes_ready for repo in repos))
+        self.assertEqual(facade.get_place_rating(places[3].id)['count'], 1)
+        self.assertEqual(facade.user_names.complete("gue", 10), [guest.id])
+        found = facade.search_places_text("number7")
+        self.assertEqual([place.id for place, _ in found], [places[7].id])
+        self.assertEqual(len(facade.place_repo._storage), 1)
+        self.assertEqual(facade.filter_places(min_price=50.0)[0], 5)
+        facade.close()
+
+    def test_11_directory_synced(self):
+        """Test that the directory is fsynced on rotation and snapshot."""
+        synced = []
+
+        def fsync(fd):
+            synced.append(stat.S_ISDIR(os.fstat(fd).st_mode))
+            os_fsync(fd)
+
+        os_fsync = os.fsync
+        with mock.patch('app.persistence.journal.os.fsync', fsync):
+            self.repo.journal.rotate()
+            self.assertTrue(synced and synced[-1])
+            del synced[:]
+            self.repo.snapshot()
+        # Rotation, then the snapshot file and its rename
+        self.assertEqual(synced[0], True)
+        self.assertEqual(synced[-2:], [False, True])
+        repo = self._reopen()
+        self.assertEqual(repo.get(self.user.id).email, "john.doe@example.com")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@ from app.services.facade import HBnBFacade
 from app.models.place import Place
 from app.models.user import User
 from app.models.review import Review
+from werkzeug.exceptions import NotFound
 
 
 class TestHBnBFacade(unittest.TestCase):
@@ -266,6 +267,20 @@ class TestHBnBFacade(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.facade.create_review(review_data)
 
+    def test_create_review_duplicate(self):
+        """
+        Test that a user cannot review the same place twice.
+        """
+        review_data = {
+            'text': "Nice place",
+            'rating': 4,
+            'user_id': self.user.id,
+            'place_id': self.place.id
+        }
+        self.facade.create_review(review_data)
+        with self.assertRaises(ValueError):
+            self.facade.create_review(review_data)
+
     # Test get_review
     def test_get_review_success(self):
         """
@@ -300,10 +315,15 @@ class TestHBnBFacade(unittest.TestCase):
             'user_id': self.user.id,
             'place_id': self.place.id
         }
+        other_user = self.facade.create_user({
+            'first_name': "Other",
+            'last_name': "Tester",
+            'email': "other.tester@example.com"
+        })
         review_data2 = {
             'text': "Not bad",
             'rating': 3,
-            'user_id': self.user.id,
+            'user_id': other_user.id,
             'place_id': self.place.id
         }
         self.facade.create_review(review_data1)
@@ -329,6 +349,71 @@ class TestHBnBFacade(unittest.TestCase):
         self.assertEqual(len(reviews), 1)
         self.assertEqual(reviews[0].text, "Loved it!")
 
+    def test_get_reviews_by_user(self):
+        """
+        Test getting reviews by author ID.
+        """
+        review_data = {
+            'text': "Loved it!",
+            'rating': 5,
+            'user_id': self.user.id,
+            'place_id': self.place.id
+        }
+        review = self.facade.create_review(review_data)
+        reviews = self.facade.get_reviews_by_user(self.user.id)
+        self.assertEqual([r.id for r in reviews], [review.id])
+
+    def test_get_places_by_owner(self):
+        """
+        Test getting places by owner ID.
+        """
+        places = self.facade.get_places_by_owner(self.user.id)
+        self.assertEqual([p.id for p in places], [self.place.id])
+        with self.assertRaises(ValueError):
+            self.facade.get_places_by_owner("nonexistent_user")
+
+    # Test place amenities
+    def test_add_amenities_to_place(self):
+        """
+        Test attaching amenities to a place in bulk.
+        """
+        wifi = self.facade.create_amenity({'name': "Wi-Fi"})
+        pool = self.facade.create_amenity({'name': "Pool"})
+        amenities = self.facade.add_amenities_to_place(
+            self.place.id, [wifi.id, pool.id, wifi.id])
+        self.assertEqual([a.id for a in amenities], [wifi.id, pool.id])
+        place = self.facade.get_place(self.place.id)
+        self.assertEqual([a.id for a in place.amenities], [wifi.id, pool.id])
+        self.assertEqual(
+            [p.id for p in self.facade.get_places_by_amenity(pool.id)],
+            [self.place.id])
+
+    def test_remove_amenities_from_place(self):
+        """
+        Test detaching amenities from a place in bulk.
+        """
+        wifi = self.facade.create_amenity({'name': "Wi-Fi"})
+        pool = self.facade.create_amenity({'name': "Pool"})
+        self.facade.add_amenities_to_place(self.place.id, [wifi.id, pool.id])
+        amenities = self.facade.remove_amenities_from_place(
+            self.place.id, [wifi.id])
+        self.assertEqual([a.id for a in amenities], [pool.id])
+        self.assertEqual(self.facade.get_places_by_amenity(wifi.id), [])
+
+    def test_add_amenities_to_place_not_found(self):
+        """
+        Test that an unknown amenity aborts the whole bulk request.
+        """
+        wifi = self.facade.create_amenity({'name': "Wi-Fi"})
+        with self.assertRaises(NotFound):
+            self.facade.add_amenities_to_place(
+                self.place.id, [wifi.id, "nonexistent_amenity"])
+        self.assertEqual(self.facade.get_place_amenities(self.place.id), [])
+        with self.assertRaises(NotFound):
+            self.facade.add_amenities_to_place("invalid_id", [wifi.id])
+        with self.assertRaises(ValueError):
+            self.facade.add_amenities_to_place(self.place.id, [])
+
     # Test update_review
     def test_update_review_success(self):
         """
@@ -0,0 +1,178 @@
+import random
+import unittest
+from app import create_app
+from app.persistence.geo_index import GeoIndex, haversine_km
+from app.services.facade import HBnBFacade
+
+
+class TestGeoIndex(unittest.TestCase):
+    """
+    Unit tests for the grid geospatial index.
+
+    === Setup ===
+        - setUp(self): indexes 2000 random points, denser around Paris.
+
+    === Testing GeoIndex ===
+        - test_01_haversine(self): known distance between two cities
+        - test_02_radius_matches_scan(self): same result as a full scan
+        - test_03_box_matches_scan(self): same result as a full scan
+        - test_04_antimeridian(self): boxes and circles wrapping at 180°
+        - test_05_move_and_discard(self): points follow updates
+    """
+
+    def setUp(self):
+        rng = random.Random(42)
+        self.index = GeoIndex(cell_degrees=0.5)
+        self.points = {}
+        for i in range(2000):
+            if i % 2:
+                lat, lon = rng.gauss(48.85, 0.5), rng.gauss(2.35, 0.5)
+            else:
+                lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+            self.points[f"p{i}"] = (lat, lon)
+            self.index.add(f"p{i}", lat, lon)
+
+    def test_01_haversine(self):
+        """Test the distance between Paris and London."""
+        self.assertAlmostEqual(haversine_km(48.8566, 2.3522, 51.5074, -0.1278),
+                               343.5, delta=1)
+
+    def test_02_radius_matches_scan(self):
+        """Test radius searches against a brute-force scan."""
+        for lat, lon, radius in ((48.85, 2.35, 20), (0, 0, 3000),
+                                 (89, 10, 500), (-60, -170, 800)):
+            expected = sorted(
+                (haversine_km(lat, lon, p_lat, p_lon), obj_id)
+                for obj_id, (p_lat, p_lon) in self.points.items()
+                if haversine_km(lat, lon, p_lat, p_lon) <= radius)
+            self.assertEqual(self.index.within_radius(lat, lon, radius),
+                             expected)
+        self.assertEqual(self.index.within_radius(48.85, 2.35, 20, limit=5),
+                         self.index.within_radius(48.85, 2.35, 20)[:5])
+
+    def test_03_box_matches_scan(self):
+        """Test box searches against a brute-force scan."""
+        box = (48.5, 2.0, 49.0, 2.8)
+        expected = {obj_id for obj_id, (lat, lon) in self.points.items()
+                    if 48.5 <= lat <= 49.0 and 2.0 <= lon <= 2.8}
+        found = self.index.within_box(*box)
+        self.assertEqual({obj_id for _, obj_id in found}, expected)
+        distances = [distance for distance, _ in found]
+        self.assertEqual(distances, sorted(distances))
+
+    def test_04_antimeridian(self):
+        """Test searches that wrap around longitude 180."""
+        index = GeoIndex()
+        index.add("fiji", -17.7, 178.0)
+        index.add("samoa", -13.8, -172.0)
+        index.add("sydney", -33.9, 151.2)
+        self.assertEqual({i for _, i in index.within_box(-20, 170, -10, -170)},
+                         {"fiji", "samoa"})
+        self.assertEqual([i for _, i in index.within_radius(-17.7, 179.9,
+                                                            1300)],
+                         ["fiji", "samoa"])
+
+    def test_05_move_and_discard(self):
+        """Test that re-adding moves a point and discard removes it."""
+        self.index.add("p1", 10.0, 10.0)
+        self.assertEqual([i for _, i in self.index.within_radius(10, 10, 1)],
+                         ["p1"])
+        self.index.discard("p1")
+        self.index.discard("unknown")
+        self.assertEqual(self.index.within_radius(10, 10, 1), [])
+        self.assertEqual(len(self.index), 1999)
+
+
+class TestPlaceSearch(unittest.TestCase):
+    """
+    Tests for the place search through the facade and the API.
+
+    === Setup ===
+        - setUp(self): app, fresh facade and a few places in Bordeaux.
+
+    === Testing search ===
+        - test_01_facade_index_follows_updates(self): update and delete
+        - test_01b_deleted_place_skipped(self): no None for a removed place
+        - test_02_search_endpoints(self): radius, bbox and delete via the API
+        - test_03_invalid_parameters(self): 400 on bad input
+    """
+
+    def setUp(self):
+        self.facade = HBnBFacade()
+        self.owner = self.facade.create_user({
+            "first_name": "Geo", "last_name": "Owner",
+            "email": "geo.owner@example.com"})
+        self.near = self.facade.create_place({
+            "title": "Near", "price": 50.0, "latitude": 44.84,
+            "longitude": -0.58, "owner_id": self.owner.id})
+        self.far = self.facade.create_place({
+            "title": "Far", "price": 50.0, "latitude": 44.90,
+            "longitude": -0.50, "owner_id": self.owner.id})
+
+    def test_01_facade_index_follows_updates(self):
+        """Test that moving and deleting a place updates the index."""
+        results = self.facade.search_places_near(44.84, -0.58, 20)
+        self.assertEqual([p.id for p, _ in results],
+                         [self.near.id, self.far.id])
+        self.facade.update_place(self.far.id, {"latitude": 10.0})
+        self.assertEqual([p.id for p, _ in
+                          self.facade.search_places_near(44.84, -0.58, 20)],
+                         [self.near.id])
+        self.facade.delete_place(self.near.id)
+        self.assertEqual(self.facade.search_places_near(44.84, -0.58, 20), [])
+        with self.assertRaises(ValueError):
+            self.facade.get_place(self.near.id)
+
+    def test_01b_deleted_place_skipped(self):
+        """Test that a place gone from the repository is not returned."""
+        # As if deleted between the index read and the fetch
+        self.facade.place_repo.delete(self.near.id)
+        self.assertEqual([p.id for p, _ in
+                          self.facade.search_places_near(44.84, -0.58, 20)],
+                         [self.far.id])
+        self.assertEqual([p.id for p, _ in self.facade.search_places_in_box(
+            44.0, -1.0, 45.0, 0.0)], [self.far.id])
+
+    def test_02_search_endpoints(self):
+        """Test radius and box searches and deletion through the API."""
+        client = create_app().test_client()
+        owner = client.post('/api/v1/users/', json={
+            "first_name": "Geo", "last_name": "Api",
+            "email": "geo.api@example.com"}).json
+        for title, lat, lon in (("Far", 45.5, 1.0), ("Close", 45.0, 0.5)):
+            client.post('/api/v1/places/', json={
+                "title": title, "price": 10.0, "latitude": lat,
+                "longitude": lon, "owner_id": owner["id"]})
+        response = client.get(
+            '/api/v1/places/search?lat=45.0&lon=0.5&radius_km=100')
+        self.assertEqual(response.status_code, 200)
+        titles = [p["title"] for p in response.json]
+        self.assertEqual(titles[:2], ["Close", "Far"])
+        self.assertEqual(response.json[0]["distance_km"], 0.0)
+
+        response = client.get('/api/v1/places/search?bbox=0.9,45.4,1.1,45.6')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Far", [p["title"] for p in response.json])
+        self.assertNotIn("Close", [p["title"] for p in response.json])
+
+        place_id = next(p["id"] for p in response.json if p["title"] == "Far")
+        self.assertEqual(client.delete(f'/api/v1/places/{place_id}')
+                         .status_code, 200)
+        self.assertEqual(client.get(f'/api/v1/places/{place_id}').status_code,
+                         404)
+        self.assertEqual(client.delete(f'/api/v1/places/{place_id}')
+                         .status_code, 404)
+
+    def test_03_invalid_parameters(self):
+        """Test that malformed search parameters return 400."""
+        client = create_app().test_client()
+        for query in ('', 'lat=45&lon=0', 'lat=100&lon=0&radius_km=1',
+                      'lat=45&lon=0&radius_km=-1', 'bbox=1,2,3',
+                      'bbox=0,50,1,40', 'lat=45&lon=0&radius_km=1&limit=0'):
+            with self.subTest(query=query):
+                response = client.get(f'/api/v1/places/search?{query}')
+                self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from unittest import mock
+from config import Config
+from app import create_app
+from app.api.v1.pagination import decode_cursor
+from app.models import ids
+from app.models.ids import (
+    UUID4Generator, UUID7Generator, id_generator, id_time, set_id_generator)
+from app.services.facade import HBnBFacade
+
+
+class TestIdGenerators(unittest.TestCase):
+    """
+    Tests for the pluggable id generators.
+
+    === Setup ===
+        - setUp(self): restores the installed generator after each test.
+
+    === Testing the generators ===
+        - test_01_uuid7(self): version 7, time-ordered, time recovered
+        - test_02_batched_random(self): one os.urandom call per batch
+        - test_03_facade_config(self): HBNB_ID_GENERATOR picks the ids
+        - test_04_id_as_cursor(self): a UUIDv7 id pages like a cursor
+    """
+
+    def setUp(self):
+        self.addCleanup(set_id_generator, ids._generator)
+
+    def test_01_uuid7(self):
+        """Test that UUIDv7 ids sort like their (creation time, id)."""
+        generator = UUID7Generator(batch=32)
+        before = datetime.now()
+        generated = [generator() for _ in range(3000)]
+        after = datetime.now()
+        self.assertEqual(len(set(generated)), 3000)
+        for obj_id in generated[::100]:
+            value = uuid.UUID(obj_id)
+            self.assertEqual((value.version, value.variant),
+                             (7, uuid.RFC_4122))
+        times = [id_time(obj_id) for obj_id in generated]
+        self.assertEqual(times, sorted(times))
+        self.assertLessEqual(before - timedelta(milliseconds=1), times[0])
+        self.assertLessEqual(times[-1], after)
+        self.assertEqual(sorted(generated),
+                         sorted(generated, key=lambda i: (id_time(i), i)))
+        self.assertIsNone(id_time(str(uuid.uuid4())))
+        self.assertIsNone(id_time("not-an-id"))
+
+    def test_02_batched_random(self):
+        """Test that batched generators read the OS entropy once a batch."""
+        for name, size in (('uuid4', 16), ('uuid7', 8)):
+            with self.subTest(generator=name), \
+                    mock.patch('app.models.ids.os.urandom',
+                               wraps=os.urandom) as urandom:
+                generator = id_generator(name, batch=100)
+                generated = {generator() for _ in range(1000)}
+                self.assertEqual(len(generated), 1000)
+                self.assertEqual(urandom.call_count, 10)
+                urandom.assert_called_with(size * 100)
+        self.assertEqual(uuid.UUID(UUID4Generator(batch=8)()).version, 4)
+        with self.assertRaises(ValueError):
+            id_generator('uuid1')
+
+    def test_03_facade_config(self):
+        """Test that the facade installs the configured generator."""
+        class UUID7Config(Config):
+            ID_GENERATOR = 'uuid7'
+
+        class UUID4Config(Config):
+            ID_GENERATOR = 'uuid4'
+
+        facade = HBnBFacade(UUID7Config)
+        user = facade.create_user({"first_name": "Ids", "last_name": "Seven",
+                                   "email": "ids.seven@example.com"})
+        self.assertEqual(uuid.UUID(user.id).version, 7)
+        self.assertEqual(user.created_at, id_time(user.id))
+        HBnBFacade(UUID4Config)
+        self.assertEqual(uuid.UUID(facade.create_amenity(
+            {"name": "Ids four"}).id).version, 4)
+
+    def test_04_id_as_cursor(self):
+        """Test that a UUIDv7 id is accepted as a creation-order cursor."""
+        set_id_generator(UUID7Generator())
+        client = create_app().test_client()
+        created = [client.post('/api/v1/amenities/', json={
+            "name": f"{self._testMethodName[:7]} {i}"}).json["id"]
+            for i in range(3)]
+        self.assertEqual(decode_cursor(created[0]),
+                         (id_time(created[0]), created[0]))
+        response = client.get(
+            f'/api/v1/amenities/?limit=2&cursor={created[0]}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([a["id"] for a in response.json], created[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()
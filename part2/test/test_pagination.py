@@ -0,0 +1,195 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from app import create_app
+from app.models.amenity import Amenity
+from app.persistence.durable_repository import MappedDurableRepository
+from app.persistence.repository import InMemoryRepository, order_key
+from app.persistence.sharded_repository import ShardedRepository
+from app.persistence.sorted_index import SortedIndex
+from app.persistence.sqlite_repository import (
+    SQLiteConnectionPool, SQLiteRepository)
+
+
+class TestSortedIndex(unittest.TestCase):
+    """
+    Unit tests for the bisect-based ordered index.
+
+    === Testing SortedIndex ===
+        - test_01_insert_and_remove(self): keys stay sorted and unique
+        - test_02_range(self): bounds, inclusiveness, reverse and limit
+        - test_03_across_chunks(self): random churn over many small chunks
+    """
+
+    def test_01_insert_and_remove(self):
+        """Test that inserts keep the keys sorted and unique."""
+        index = SortedIndex([5, 1])
+        self.assertTrue(index.insert(3))
+        self.assertTrue(index.insert(9))
+        self.assertFalse(index.insert(3))
+        self.assertEqual(index.range(), [1, 3, 5, 9])
+        self.assertTrue(index.remove(5))
+        self.assertFalse(index.remove(5))
+        self.assertNotIn(5, index)
+        self.assertEqual(len(index), 3)
+
+    def test_02_range(self):
+        """Test range queries over the keys."""
+        index = SortedIndex(range(10))
+        self.assertEqual(index.range(3, 6), [3, 4, 5, 6])
+        self.assertEqual(index.range(3, 6, inclusive=(False, False)), [4, 5])
+        self.assertEqual(index.range(minimum=7), [7, 8, 9])
+        self.assertEqual(index.range(maximum=2, reverse=True), [2, 1, 0])
+        self.assertEqual(index.range(2, limit=3), [2, 3, 4])
+        self.assertEqual(index.range(2, 8, reverse=True, limit=2), [8, 7])
+        self.assertEqual(index.range(6, 3), [])
+
+    def test_03_across_chunks(self):
+        """Test that ranges spanning many chunks match a sorted list."""
+        class SmallChunks(SortedIndex):
+            LOAD = 4
+
+        rng = random.Random(11)
+        index, keys = SmallChunks(range(0, 300, 3)), set(range(0, 300, 3))
+        for _ in range(2000):
+            key = rng.randrange(300)
+            if rng.random() < 0.5:
+                self.assertEqual(index.insert(key), key not in keys)
+                keys.add(key)
+            else:
+                self.assertEqual(index.remove(key), key in keys)
+                keys.discard(key)
+        expected = sorted(keys)
+        self.assertEqual(index.range(), expected)
+        self.assertEqual(len(index), len(keys))
+        self.assertEqual(index.range(50, 250, inclusive=(False, True)),
+                         [k for k in expected if 50 < k <= 250])
+        self.assertEqual(index.range(50, 250, reverse=True, limit=30),
+                         [k for k in expected if 50 <= k <= 250][::-1][:30])
+
+
+class TestRepositoryPage(unittest.TestCase):
+    """
+    Unit tests for Repository.page() on every backend.
+
+    === Setup ===
+        - setUp(self): 25 amenities with increasing creation times.
+
+    === Testing page() ===
+        - test_01_pages_cover_everything_once(self): same walk on all backends
+        - test_02_stable_under_inserts(self): inserts do not shift the pages
+        - test_03_mapped_snapshot(self): cold records are paginated too
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        start = datetime(2024, 1, 1)
+        self.amenities = []
+        for i in range(25):
+            amenity = Amenity(name=f"Amenity {i}")
+            # Several entities share a timestamp; the id breaks the tie
+            amenity.created_at = start + timedelta(seconds=i // 3)
+            self.amenities.append(amenity)
+        self.expected = [a.id for a in sorted(self.amenities, key=order_key)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _walk(self, repo, limit):
+        ids, after = [], None
+        while True:
+            page = repo.page(limit, after)
+            if not page:
+                return ids
+            ids += [obj.id for obj in page]
+            after = order_key(page[-1])
+
+    def _backends(self):
+        pool = SQLiteConnectionPool(os.path.join(self.tmpdir, 'hbnb.db'))
+        self.addCleanup(pool.close)
+        return [InMemoryRepository(), ShardedRepository(shards=4),
+                SQLiteRepository(Amenity, pool)]
+
+    def test_01_pages_cover_everything_once(self):
+        """Test that walking the pages yields each entity once, in order."""
+        for repo in self._backends():
+            for amenity in reversed(self.amenities):
+                repo.add(amenity)
+            with self.subTest(backend=type(repo).__name__):
+                self.assertEqual(self._walk(repo, 4), self.expected)
+                self.assertEqual(len(repo.page(100)), 25)
+
+    def test_02_stable_under_inserts(self):
+        """Test that entities created between two pages do not shift them."""
+        for repo in self._backends():
+            for amenity in self.amenities:
+                repo.add(amenity)
+            with self.subTest(backend=type(repo).__name__):
+                first = repo.page(10)
+                repo.add(Amenity(name=f"Late {type(repo).__name__}"))
+                second = repo.page(10, order_key(first[-1]))
+                self.assertEqual([a.id for a in first + second],
+                                 self.expected[:20])
+
+    def test_03_mapped_snapshot(self):
+        """Test pagination over records still in a binary snapshot."""
+        repo = MappedDurableRepository(Amenity, self.tmpdir)
+        for amenity in self.amenities:
+            repo.add(amenity)
+        repo.snapshot()
+        repo.delete(self.amenities[0].id)
+        repo.close()
+
+        repo = MappedDurableRepository(Amenity, self.tmpdir)
+        self.assertEqual(self._walk(repo, 7),
+                         [obj_id for obj_id in self.expected
+                          if obj_id != self.amenities[0].id])
+        repo.close()
+
+
+class TestPaginationEndpoints(unittest.TestCase):
+    """
+    Tests for the limit/cursor query parameters of the list endpoints.
+
+    === Testing pagination ===
+        - test_01_cursor_walk(self): pages chained through X-Next-Cursor
+        - test_02_invalid_parameters(self): bad limit or cursor rejected
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app()
+        cls.client = cls.app.test_client()
+        for i in range(5):
+            cls.client.post('/api/v1/amenities/',
+                            json={"name": f"Paginated amenity {i}"})
+
+    def test_01_cursor_walk(self):
+        """Test that following X-Next-Cursor lists every amenity once."""
+        everything = [a["id"] for a in
+                      self.client.get('/api/v1/amenities/').json]
+        ids, url = [], '/api/v1/amenities/?limit=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.json), 2)
+            ids += [a["id"] for a in response.json]
+            cursor = response.headers.get("X-Next-Cursor")
+            url = cursor and f'/api/v1/amenities/?limit=2&cursor={cursor}'
+        self.assertEqual(sorted(ids), sorted(everything))
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_02_invalid_parameters(self):
+        """Test that malformed pagination parameters return 400."""
+        for query in ('limit=0', 'limit=abc', 'limit=5000',
+                      'cursor=not-a-cursor'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/v1/users/?{query}')
+                self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
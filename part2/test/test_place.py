@@ -30,6 +30,9 @@ class TestPlaceModel(unittest.TestCase):
         - test_10_update_place_success(self):
         - test_11_update_place_invalid_data(self):
 
+    === Testing the memory layout ===
+        - test_12_slotted_layout(self): no __dict__, lazy relationship lists
+
     """
 
     def setUp(self):
@@ -172,6 +175,21 @@ class TestPlaceModel(unittest.TestCase):
         self.assertEqual(self.valid_place.longitude, -74.0060)
         self.assertEqual(self.valid_place.description, "Updated description.")
 
+    def test_12_slotted_layout(self):
+        """Test that places have no __dict__ and allocate lists lazily."""
+        self.assertFalse(hasattr(self.valid_place, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.valid_place.nickname = "Cozy"
+        self.assertIsNone(self.valid_place._reviews)
+        self.assertEqual(self.valid_place.reviews, [])
+        self.valid_place.amenities = ["WiFi"]
+        self.assertEqual(self.valid_place.amenities, ["WiFi"])
+        self.assertIs(self.valid_place.created_at,
+                      self.valid_place.updated_at)
+        self.valid_place.update({"price": 99.0, "nickname": "ignored"})
+        self.assertEqual((self.valid_place.price, self.valid_place.version),
+                         (99.0, 2))
+
 
 if __name__ == "__main__":
     unittest.main()
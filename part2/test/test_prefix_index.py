@@ -0,0 +1,136 @@
+import random
+import string
+import unittest
+from app import create_app
+from app.persistence.prefix_index import PrefixIndex, normalize_prefix
+
+
+class TestPrefixIndex(unittest.TestCase):
+    """
+    Unit tests for the type-ahead prefix index.
+
+    === Setup ===
+        - setUp(self): 1000 ids with a name and a last name each.
+
+    === Testing PrefixIndex ===
+        - test_01_normalize(self): case, accents and spaces are folded
+        - test_02_complete_matches_scan(self): same ids as a full scan
+        - test_03_limit_counts_ids(self): several matching terms, one result
+        - test_04_replace_and_discard(self): terms follow changes
+    """
+
+    def setUp(self):
+        rng = random.Random(9)
+        self.index = PrefixIndex()
+        self.terms = {}
+        for i in range(1000):
+            first = ''.join(rng.choices(string.ascii_lowercase[:5], k=4))
+            last = ''.join(rng.choices(string.ascii_lowercase[:5], k=5))
+            self.terms[f"u{i:04}"] = (f"{first} {last}", last)
+            self.index.add(f"u{i:04}", f"{first} {last}", last)
+
+    def _expected(self, prefix):
+        return {obj_id for obj_id, terms in self.terms.items()
+                if any(t.startswith(prefix) for t in terms)}
+
+    def test_01_normalize(self):
+        """Test that prefixes are folded like the indexed terms."""
+        self.assertEqual(normalize_prefix("  Élodie   DURAND "), "elodie durand")
+        self.index.add("accent", "Chloé Noël")
+        self.assertEqual(self.index.complete("CHLOE no"), ["accent"])
+
+    def test_02_complete_matches_scan(self):
+        """Test completions against a brute-force prefix scan."""
+        for prefix in ("a", "ab", "cab", "dd", "abcd e", "eeeee"):
+            with self.subTest(prefix=prefix):
+                found = self.index.complete(prefix, limit=10000)
+                self.assertEqual(len(found), len(set(found)))
+                self.assertEqual(set(found), self._expected(prefix))
+                self.assertEqual(self.index.complete(prefix, limit=5),
+                                 found[:5])
+        self.assertEqual(self.index.complete("   "), [])
+
+    def test_03_limit_counts_ids(self):
+        """Test that an id matching through two terms is returned once."""
+        index = PrefixIndex()
+        index.add("a", "Anna Annan", "Annan")
+        index.add("b", "Annie Hall", "Hall")
+        self.assertEqual(index.complete("ann", limit=2), ["a", "b"])
+
+    def test_04_replace_and_discard(self):
+        """Test that re-adding replaces terms and discard removes them."""
+        self.index.add("u0000", "zed zulu")
+        self.index.discard("u0001")
+        self.index.discard("unknown")
+        self.assertEqual(self.index.complete("zed z"), ["u0000"])
+        first_term = self.terms.pop("u0000")[0]
+        del self.terms["u0001"]
+        self.assertNotIn("u0000", self.index.complete(first_term, 10000))
+        self.assertEqual(set(self.index.complete("a", 10000)),
+                         self._expected("a"))
+        self.assertEqual(len(self.index), 999)
+
+
+class TestAutocompleteEndpoints(unittest.TestCase):
+    """
+    Tests for /users/autocomplete and /amenities/autocomplete.
+
+    === Setup ===
+        - setUp(self): test client.
+
+    === Testing the endpoints ===
+        - test_01_users(self): names and emails, updates, limit
+        - test_02_amenities(self): any word of the name, updates
+        - test_03_invalid_parameters(self): 400 on bad input
+    """
+
+    def setUp(self):
+        self.client = create_app().test_client()
+
+    def test_01_users(self):
+        """Test user completion by name, last name and email."""
+        ids = [self.client.post('/api/v1/users/', json={
+            "first_name": first, "last_name": last, "email": email}).json["id"]
+            for first, last, email in (
+                ("Xavière", "Quimper", "xq@example.com"),
+                ("Xavier", "Quilt", "quiz@example.com"))]
+        response = self.client.get('/api/v1/users/autocomplete?q=xavie')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({u["id"] for u in response.json}, set(ids))
+        self.assertEqual([u["id"] for u in self.client.get(
+            '/api/v1/users/autocomplete?q=QUIM').json], ids[:1])
+        self.assertEqual(len(self.client.get(
+            '/api/v1/users/autocomplete?q=qui&limit=1').json), 1)
+        self.assertEqual(self.client.put(f'/api/v1/users/{ids[0]}', json={
+            "first_name": "Xavière", "last_name": "Brest",
+            "email": "xq@example.com"}).status_code, 200)
+        self.assertEqual(self.client.get(
+            '/api/v1/users/autocomplete?q=quimper').json, [])
+
+    def test_02_amenities(self):
+        """Test amenity completion from any word of the name."""
+        amenity_id = self.client.post('/api/v1/amenities/', json={
+            "name": "Heated Zanzibar pool"}).json["id"]
+        for prefix in ("heat", "zanz", "zanzibar p"):
+            with self.subTest(prefix=prefix):
+                self.assertEqual([a["id"] for a in self.client.get(
+                    f'/api/v1/amenities/autocomplete?q={prefix}').json],
+                    [amenity_id])
+        self.client.put(f'/api/v1/amenities/{amenity_id}',
+                        json={"name": "Sauna"})
+        self.assertEqual(self.client.get(
+            '/api/v1/amenities/autocomplete?q=zanz').json, [])
+
+    def test_03_invalid_parameters(self):
+        """Test that a missing prefix or bad limit returns 400."""
+        for url in ('/api/v1/users/autocomplete',
+                    '/api/v1/users/autocomplete?q=%20',
+                    '/api/v1/users/autocomplete?q=a&limit=0',
+                    '/api/v1/amenities/autocomplete?q=a&limit=x',
+                    '/api/v1/amenities/autocomplete?q=a&limit=101'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import random
+import unittest
+from app import create_app
+from app.persistence.sorted_index import OrderedIndex
+
+
+class TestOrderedIndex(unittest.TestCase):
+    """
+    Unit tests for the (value, id) ordered index.
+
+    === Setup ===
+        - setUp(self): 500 ids with repeated random prices.
+
+    === Testing OrderedIndex ===
+        - test_01_range_matches_scan(self): bounds are inclusive
+        - test_02_pages_cover_range(self): `after` resumes in both orders
+        - test_03_update_and_discard(self): values follow changes
+    """
+
+    def setUp(self):
+        rng = random.Random(3)
+        self.index = OrderedIndex()
+        self.values = {}
+        for i in range(500):
+            price = float(rng.randrange(0, 200, 5))
+            self.values[f"p{i:03}"] = price
+            self.index.add(f"p{i:03}", price)
+
+    def _expected(self, low=None, high=None):
+        return sorted((price, obj_id) for obj_id, price in self.values.items()
+                      if (low is None or price >= low)
+                      and (high is None or price <= high))
+
+    def test_01_range_matches_scan(self):
+        """Test ranges against a brute-force filter and sort."""
+        for low, high in ((None, None), (50.0, 100.0), (None, 20.0),
+                          (150.0, None), (42.0, 43.0), (100.0, 100.0)):
+            with self.subTest(low=low, high=high):
+                self.assertEqual(self.index.range(low, high),
+                                 self._expected(low, high))
+                self.assertEqual(self.index.range(low, high, reverse=True),
+                                 self._expected(low, high)[::-1])
+
+    def test_02_pages_cover_range(self):
+        """Test that pages resumed with `after` cover the range exactly."""
+        for reverse in (False, True):
+            keys, after = [], None
+            while True:
+                page = self.index.range(50.0, 100.0, after=after,
+                                        reverse=reverse, limit=7)
+                if not page:
+                    break
+                keys += page
+                after = page[-1]
+            expected = self._expected(50.0, 100.0)
+            self.assertEqual(keys, expected[::-1] if reverse else expected)
+
+    def test_03_update_and_discard(self):
+        """Test that re-adding moves an id and discard removes it."""
+        self.index.add("p000", 1000.0)
+        self.values["p000"] = 1000.0
+        self.index.discard("p001")
+        self.index.discard("unknown")
+        del self.values["p001"]
+        self.assertEqual(self.index.range(), self._expected())
+        self.assertEqual(len(self.index), 499)
+
+
+class TestPriceEndpoints(unittest.TestCase):
+    """
+    Tests for the price parameters of GET /api/v1/places/.
+
+    === Setup ===
+        - setUp(self): test client and an owner.
+
+    === Testing the endpoint ===
+        - test_01_filter_and_sort(self): ranges, both orders, updates
+        - test_02_paginated(self): cursors follow the price order
+        - test_03_invalid_parameters(self): 400 on bad input
+    """
+
+    def setUp(self):
+        self.client = create_app().test_client()
+        self.owner_id = self.client.post('/api/v1/users/', json={
+            "first_name": "Price", "last_name": "Owner",
+            "email": f"{self.id()}@example.com"}).json["id"]
+
+    def _create(self, title, price):
+        return self.client.post('/api/v1/places/', json={
+            "title": title, "price": price, "latitude": 10.0,
+            "longitude": 10.0, "owner_id": self.owner_id}).json["id"]
+
+    def _titles(self, query):
+        response = self.client.get(f'/api/v1/places/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return [p["title"] for p in response.json]
+
+    def test_01_filter_and_sort(self):
+        """Test price ranges in both orders, after an update."""
+        for title, price in (("Mid", 91500.0), ("Low", 91000.0),
+                             ("High", 92000.0)):
+            self._create(title, price)
+        self.assertEqual(self._titles('min_price=91000&max_price=91500'),
+                         ["Low", "Mid"])
+        self.assertEqual(
+            self._titles('min_price=91000&max_price=92000&sort=-price'),
+            ["High", "Mid", "Low"])
+        place_id = next(p["id"] for p in self.client.get(
+            '/api/v1/places/?min_price=92000&max_price=92000').json)
+        self.client.put(f'/api/v1/places/{place_id}', json={"price": 90900.0})
+        self.assertEqual(self._titles('min_price=90000&max_price=99999'),
+                         ["High", "Low", "Mid"])
+        prices = [p["price"] for p in
+                  self.client.get('/api/v1/places/?sort=price').json]
+        self.assertEqual(prices, sorted(prices))
+
+    def test_02_paginated(self):
+        """Test that cursor pages walk a price range in order."""
+        for i in range(7):
+            self._create(f"Paged {i}", 80000.0 + (i % 3))
+        url = '/api/v1/places/?min_price=80000&max_price=80002&sort=-price'
+        prices, cursor = [], ''
+        while cursor is not None:
+            response = self.client.get(f'{url}&limit=3&cursor={cursor}'
+                                       if cursor else f'{url}&limit=3')
+            self.assertLessEqual(len(response.json), 3)
+            prices += [p["price"] for p in response.json]
+            cursor = response.headers.get('X-Next-Cursor')
+        self.assertEqual(len(prices), 7)
+        self.assertEqual(prices, sorted(prices, reverse=True))
+
+    def test_03_invalid_parameters(self):
+        """Test that malformed price parameters return 400."""
+        created_cursor = self.client.get(
+            '/api/v1/places/?limit=1').headers.get('X-Next-Cursor', 'x')
+        for query in ('min_price=abc', 'max_price=nan', 'sort=title',
+                      'min_price=10&max_price=5', 'sort=price&stream=true',
+                      f'sort=price&cursor={created_cursor}'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/v1/places/?{query}')
+                self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+import random
+import unittest
+from app import create_app
+from app.persistence.geo_index import haversine_km
+from app.services.facade import HBnBFacade
+from app.services.ranking import CompositeScore, top_k
+
+
+class TestTopK(unittest.TestCase):
+    """
+    Unit tests for the bounded-heap top-K and the composite score.
+
+    === Testing ranking ===
+        - test_01_top_k_matches_sort(self): same result as a full sort
+        - test_02_early_termination(self): the bound stops the scan
+        - test_03_composite_score(self): weights and their validation
+    """
+
+    def test_01_top_k_matches_sort(self):
+        """Test top_k against sorting every candidate."""
+        rng = random.Random(19)
+        values = {f"id{i:04}": rng.randint(0, 50) for i in range(2000)}
+        candidates = [(None, obj_id) for obj_id in values]
+        for k in (1, 5, 100, 5000):
+            with self.subTest(k=k):
+                expected = sorted(((v, i) for i, v in values.items()
+                                   if v % 7), reverse=True)[:k]
+                self.assertEqual(
+                    top_k(candidates, k,
+                          lambda i: values[i] if values[i] % 7 else None),
+                    expected)
+
+    def test_02_early_termination(self):
+        """Test that candidates in bound order stop once the heap wins."""
+        candidates = [(value, f"id{value:04}") for value in range(999, -1, -1)]
+        scored = []
+
+        def score(obj_id):
+            scored.append(obj_id)
+            return int(obj_id[2:])
+
+        found = top_k(iter(candidates), 10, score, bound=lambda key: key)
+        self.assertEqual([v for v, _ in found], list(range(999, 989, -1)))
+        self.assertEqual(len(scored), 10)
+
+    def test_03_composite_score(self):
+        """Test the weighted components and the bound."""
+        score = CompositeScore({'rating': 1, 'reviews': 0, 'price': 0})
+        self.assertEqual(score(4.0, 3, 80.0), 0.8)
+        self.assertEqual(score.weights['distance'], 0.0)
+        score = CompositeScore({'price': 1, 'distance': 1}, has_origin=True)
+        self.assertGreater(score(0, 0, 10.0, 1.0), score(0, 0, 10.0, 2.0))
+        self.assertGreaterEqual(score.bound('price', 0.5),
+                                score(5.0, 1000, 100.0, 0.0))
+        for weights, has_origin in (({'distance': 1}, False),
+                                    ({'stars': 1}, False),
+                                    ({'rating': -1}, False),
+                                    ({'rating': 0, 'reviews': 0,
+                                      'price': 0}, False)):
+            with self.subTest(weights=weights):
+                with self.assertRaises(ValueError):
+                    CompositeScore(weights, has_origin)
+
+
+class TestTopPlaces(unittest.TestCase):
+    """
+    Tests for top places through the facade and the API.
+
+    === Setup ===
+        - setUp(self): fresh facade, 300 random places, random reviews.
+
+    === Testing top places ===
+        - test_01_facade_matches_scan(self): every driver, vs a full scan
+        - test_02_follows_updates(self): price changes and deletes
+        - test_03_endpoint(self): /places/top, scores and distances
+        - test_04_invalid_parameters(self): 400 and 404 on bad input
+    """
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.facade = HBnBFacade()
+        owner = self.facade.create_user({
+            "first_name": "Top", "last_name": "Owner",
+            "email": "top.owner@example.com"})
+        reviewers = [self.facade.create_user({
+            "first_name": "Top", "last_name": f"Reviewer{i}",
+            "email": f"top.reviewer{i}@example.com"}) for i in range(8)]
+        self.amenity = self.facade.create_amenity({"name": "Top wifi"})
+        self.places = []
+        for i in range(300):
+            place = self.facade.create_place({
+                "title": f"Top {i}", "price": float(rng.randint(20, 400)),
+                "latitude": 48.8 + rng.random() / 5,
+                "longitude": 2.3 + rng.random() / 5, "owner_id": owner.id})
+            self.places.append(place)
+            for reviewer in rng.sample(reviewers, rng.randint(0, 4)):
+                self.facade.create_review({
+                    "text": "Fine", "rating": rng.randint(1, 5),
+                    "user_id": reviewer.id, "place_id": place.id})
+            if i % 3 == 0:
+                self.facade.add_amenities_to_place(place.id,
+                                                   [self.amenity.id])
+
+    def _scan(self, k, weights=None, latitude=None, longitude=None,
+              radius_km=None, min_price=None, max_price=None,
+              amenity_ids=None):
+        """Top places by scoring every place and sorting."""
+        has_origin = latitude is not None
+        score = CompositeScore(weights, has_origin)
+        ranked = []
+        for place in self.facade.get_all_places():
+            distance = (haversine_km(latitude, longitude, place.latitude,
+                                     place.longitude) if has_origin else None)
+            if radius_km is not None and distance > radius_km:
+                continue
+            if (min_price is not None and place.price < min_price) or \
+                    (max_price is not None and place.price > max_price):
+                continue
+            linked = {a.id for a in self.facade.get_place_amenities(place.id)}
+            if amenity_ids and not set(amenity_ids) <= linked:
+                continue
+            rating = self.facade.get_place_rating(place.id)
+            ranked.append((score(rating['average'] or 0.0, rating['count'],
+                                 place.price, distance), place.id))
+        return sorted(ranked, reverse=True)[:k]
+
+    def _top(self, k, **kwargs):
+        return [(score, place.id) for place, score, _ in
+                self.facade.get_top_places(k, **kwargs)]
+
+    def _assert_same(self, found, expected):
+        self.assertEqual([i for _, i in found], [i for _, i in expected])
+        for (score, _), (expected_score, _) in zip(found, expected):
+            self.assertAlmostEqual(score, expected_score)
+
+    def test_01_facade_matches_scan(self):
+        """Test every candidate source against a full scan."""
+        paris = {'latitude': 48.9, 'longitude': 2.4}
+        for kwargs in ({},
+                       {'weights': {'price': 1.0}},
+                       {'weights': {'rating': 1.0, 'price': 0.1}},
+                       {'min_price': 100.0, 'max_price': 200.0},
+                       {'weights': {'rating': 1.0}, 'min_price': 300.0},
+                       dict(paris),
+                       dict(paris, radius_km=5.0),
+                       dict(paris, weights={'distance': 2.0}),
+                       {'amenity_ids': [self.amenity.id]}):
+            for k in (1, 20):
+                with self.subTest(k=k, **kwargs):
+                    self._assert_same(self._top(k, **kwargs),
+                                      self._scan(k, **kwargs))
+
+    def test_02_follows_updates(self):
+        """Test that a price change and a delete update the top."""
+        place = self.places[5]
+        self.facade.update_place(place.id, {"price": 1.0})
+        top = self._top(1, weights={'price': 1.0, 'rating': 0,
+                                    'reviews': 0})
+        self.assertEqual(top[0][1], place.id)
+        self.facade.delete_place(place.id)
+        self.assertNotIn(place.id, [i for _, i in self._top(
+            300, weights={'price': 1.0})])
+
+    def test_03_endpoint(self):
+        """Test /places/top through the API."""
+        client = create_app().test_client()
+        owner_id = client.post('/api/v1/users/', json={
+            "first_name": "Top", "last_name": "Api",
+            "email": f"{self.id()}@example.com"}).json["id"]
+        ids = [client.post('/api/v1/places/', json={
+            "title": f"Top api {i}", "price": price, "latitude": -60.0,
+            "longitude": -60.0 + i / 100, "owner_id": owner_id}).json["id"]
+            for i, price in enumerate((90.0, 10.0))]
+        response = client.get('/api/v1/places/top?lat=-60&lon=-60'
+                              '&radius_km=10&k=5')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p["id"] for p in response.json], ids[::-1])
+        self.assertEqual(response.json[1]["distance_km"], 0.0)
+        self.assertGreater(response.json[0]["score"],
+                           response.json[1]["score"])
+        response = client.get('/api/v1/places/top?lat=-60&lon=-60'
+                              '&radius_km=10&w_distance=5')
+        self.assertEqual([p["id"] for p in response.json], ids)
+        self.assertEqual(len(client.get('/api/v1/places/top?k=1').json), 1)
+
+    def test_04_invalid_parameters(self):
+        """Test that bad ranking parameters return 400 or 404."""
+        client = create_app().test_client()
+        for url, status in (('k=0', 400), ('k=101', 400), ('k=x', 400),
+                            ('lat=10', 400), ('radius_km=5', 400),
+                            ('w_distance=1', 400), ('w_price=-1', 400),
+                            ('w_rating=nan', 400),
+                            ('w_rating=0&w_reviews=0&w_price=0', 400),
+                            ('min_price=5&max_price=1', 400),
+                            ('amenities=unknown', 404)):
+            with self.subTest(url=url):
+                self.assertEqual(client.get(
+                    f'/api/v1/places/top?{url}').status_code, status)
+
+
+if __name__ == "__main__":
+    unittest.main()
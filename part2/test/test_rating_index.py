@@ -0,0 +1,185 @@
+import random
+import unittest
+from app import create_app
+from app.persistence.rating_index import RatingIndex
+
+
+class TestRatingIndex(unittest.TestCase):
+    """
+    Unit tests for the per-place rating aggregates.
+
+    === Setup ===
+        - setUp(self): 20 places and a reference list of review ratings.
+
+    === Testing RatingIndex ===
+        - test_01_aggregates_after_churn(self): adds, changes and removes
+        - test_02_order_by_average(self): unrated places count as 0
+        - test_03_discard_place(self): a deleted place leaves the order
+        - test_04_max_count(self): follows added and removed reviews
+    """
+
+    def setUp(self):
+        self.index = RatingIndex()
+        self.reviews = {f"place{i:02}": [] for i in range(20)}
+        for place_id in self.reviews:
+            self.index.add_place(place_id)
+
+    def _expected(self, place_id):
+        ratings = self.reviews[place_id]
+        return {'count': len(ratings),
+                'average': sum(ratings) / len(ratings) if ratings else None,
+                'histogram': {str(r): ratings.count(r) for r in range(1, 6)}}
+
+    def test_01_aggregates_after_churn(self):
+        """Test aggregates against ratings recomputed from scratch."""
+        rng = random.Random(4)
+        places = sorted(self.reviews)
+        for _ in range(500):
+            place_id = rng.choice(places)
+            ratings = self.reviews[place_id]
+            roll = rng.random()
+            if roll < 0.5 or not ratings:
+                rating = rng.randint(1, 5)
+                self.index.add(place_id, rating)
+                ratings.append(rating)
+            elif roll < 0.8:
+                i = rng.randrange(len(ratings))
+                new = rng.randint(1, 5)
+                self.index.change(place_id, ratings[i], new)
+                ratings[i] = new
+            else:
+                self.index.remove(place_id, ratings.pop())
+        for place_id in places:
+            expected = self._expected(place_id)
+            actual = self.index.get(place_id)
+            self.assertEqual(actual['count'], expected['count'])
+            self.assertEqual(actual['histogram'], expected['histogram'])
+            if expected['average'] is None:
+                self.assertIsNone(actual['average'])
+            else:
+                self.assertAlmostEqual(actual['average'], expected['average'])
+
+    def test_02_order_by_average(self):
+        """Test that places are ordered by average rating."""
+        self.index.add("place01", 5)
+        self.index.add("place02", 2)
+        self.index.add("place02", 4)
+        self.index.add("place03", 1)
+        best = [place_id for _, place_id in
+                self.index.range(reverse=True, limit=3)]
+        self.assertEqual(best, ["place01", "place02", "place03"])
+        worst = self.index.range(limit=2)
+        self.assertEqual([average for average, _ in worst], [0.0, 0.0])
+        after = self.index.range(after=(3.0, "place02"))
+        self.assertEqual([place_id for _, place_id in after], ["place01"])
+
+    def test_03_discard_place(self):
+        """Test that a discarded place is no longer ordered."""
+        self.index.add("place05", 3)
+        self.index.discard_place("place05")
+        self.index.discard_place("unknown")
+        self.assertNotIn("place05",
+                         [place_id for _, place_id in self.index.range()])
+        self.assertEqual(self.index.get("place05")['count'], 0)
+        self.assertEqual(len(self.index), 19)
+
+    def test_04_max_count(self):
+        """Test the highest review count after adds, removes and discards."""
+        self.assertEqual(self.index.max_count(), 0)
+        for rating in (1, 2, 3):
+            self.index.add("place07", rating)
+        self.index.add("place08", 4)
+        self.assertEqual(self.index.max_count(), 3)
+        self.assertEqual(self.index.summary("place07"), (3, 2.0))
+        self.index.remove("place07", 3)
+        self.assertEqual(self.index.max_count(), 2)
+        self.index.discard_place("place07")
+        self.assertEqual(self.index.max_count(), 1)
+
+
+class TestRatingEndpoints(unittest.TestCase):
+    """
+    Tests for ratings in the place representation and sort=rating.
+
+    === Setup ===
+        - setUp(self): test client, an owner, two reviewers, two places.
+
+    === Testing the endpoints ===
+        - test_01_rating_follows_reviews(self): create, update and delete
+        - test_02_sort_by_rating(self): best rated first, paginated
+        - test_03_invalid_parameters(self): 400 on conflicting parameters
+    """
+
+    def setUp(self):
+        self.client = create_app().test_client()
+        name = self.id()
+        self.user_ids = [self.client.post('/api/v1/users/', json={
+            "first_name": "Rating", "last_name": role,
+            "email": f"{name}.{role}@example.com"}).json["id"]
+            for role in ("owner", "alice", "bob")]
+        self.place_ids = [self.client.post('/api/v1/places/', json={
+            "title": title, "price": 10.0, "latitude": 1.0,
+            "longitude": 1.0, "owner_id": self.user_ids[0]}).json["id"]
+            for title in ("Rated A", "Rated B")]
+
+    def _review(self, user_id, place_id, rating):
+        return self.client.post('/api/v1/reviews/', json={
+            "text": "Stayed here", "rating": rating, "user_id": user_id,
+            "place_id": place_id}).json["id"]
+
+    def _rating(self, place_id):
+        return self.client.get(f'/api/v1/places/{place_id}').json["rating"]
+
+    def test_01_rating_follows_reviews(self):
+        """Test that the place rating follows its reviews."""
+        place_id = self.place_ids[0]
+        self.assertEqual(self._rating(place_id),
+                         {"count": 0, "average": None, "histogram": {
+                             "1": 0, "2": 0, "3": 0, "4": 0, "5": 0}})
+        review_id = self._review(self.user_ids[1], place_id, 5)
+        self._review(self.user_ids[2], place_id, 2)
+        rating = self._rating(place_id)
+        self.assertEqual((rating["count"], rating["average"]), (2, 3.5))
+        self.client.put(f'/api/v1/reviews/{review_id}',
+                        json={"text": "Less great", "rating": 3})
+        rating = self._rating(place_id)
+        self.assertEqual(rating["average"], 2.5)
+        self.assertEqual((rating["histogram"]["3"], rating["histogram"]["5"]),
+                         (1, 0))
+        self.client.delete(f'/api/v1/reviews/{review_id}')
+        rating = self._rating(place_id)
+        self.assertEqual((rating["count"], rating["average"]), (1, 2.0))
+
+    def test_02_sort_by_rating(self):
+        """Test that sort=-rating lists the best rated places first."""
+        self._review(self.user_ids[1], self.place_ids[0], 1)
+        self._review(self.user_ids[1], self.place_ids[1], 4)
+        places = self.client.get('/api/v1/places/?sort=-rating').json
+        averages = [p["rating"]["average"] or 0 for p in places]
+        self.assertEqual(averages, sorted(averages, reverse=True))
+        ids = [p["id"] for p in places]
+        self.assertLess(ids.index(self.place_ids[1]),
+                        ids.index(self.place_ids[0]))
+
+        walked, cursor = [], None
+        while True:
+            url = '/api/v1/places/?sort=rating&limit=2'
+            response = self.client.get(f'{url}&cursor={cursor}'
+                                       if cursor else url)
+            walked += [p["id"] for p in response.json]
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+        self.assertEqual(walked, ids[::-1])
+
+    def test_03_invalid_parameters(self):
+        """Test that rating sorts reject conflicting parameters."""
+        for query in ('sort=rating&min_price=1', 'sort=-rating&q=rated',
+                      'sort=rating&stream=true', 'sort=stars'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/v1/places/?{query}')
+                self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+import unittest
+from app.models.user import User
+from app.models.place import Place
+from app.models.amenity import Amenity
+from app.models.review import Review
+from app.persistence.repository import (
+    InMemoryRepository, UniqueConstraint, DuplicateEntryError,
+    VersionConflict, casefold)
+
+
+class TestInMemoryRepository(unittest.TestCase):
+    """
+    Unit tests for the InMemoryRepository secondary indexes.
+
+    === Setup ===
+        - setUp(self): creates a repository indexed on email and a sample user.
+
+    === Testing indexed lookups ===
+        - test_01_get_by_indexed_attribute(self): lookup through the index
+        - test_02_index_follows_update(self): index refreshed on update
+        - test_03_index_follows_in_place_add(self): re-adding a mutated object
+        - test_04_index_follows_delete(self): index cleared on delete
+        - test_05_get_by_unindexed_attribute(self): fallback to a scan
+        - test_06_non_unique_index(self): several objects under the same value
+        - test_07_get_all_by_attribute(self): reverse index listing
+
+    === Testing versions ===
+        - test_08_version_bumped_on_update(self): every update saves a version
+        - test_08b_protected_fields_ignored(self): id, version, times kept
+        - test_09_expected_version(self): stale updates are refused
+    """
+
+    def setUp(self):
+        self.repo = InMemoryRepository(indexes=('email',))
+        self.user = User(first_name="John", last_name="Doe",
+                         email="john.doe@example.com")
+        self.repo.add(self.user)
+
+    def test_01_get_by_indexed_attribute(self):
+        """Test that an indexed attribute is found without scanning."""
+        found = self.repo.get_by_attribute('email', "john.doe@example.com")
+        self.assertIs(found, self.user)
+        self.assertIsNone(
+            self.repo.get_by_attribute('email', "nobody@example.com"))
+
+    def test_02_index_follows_update(self):
+        """Test that update() moves the object to its new index key."""
+        self.repo.update(self.user.id, {"email": "jane.doe@example.com"})
+        self.assertIsNone(
+            self.repo.get_by_attribute('email', "john.doe@example.com"))
+        self.assertIs(
+            self.repo.get_by_attribute('email', "jane.doe@example.com"),
+            self.user)
+
+    def test_03_index_follows_in_place_add(self):
+        """Test that re-adding an object mutated in place reindexes it."""
+        self.user.email = "jane.doe@example.com"
+        self.repo.add(self.user)
+        self.assertIsNone(
+            self.repo.get_by_attribute('email', "john.doe@example.com"))
+        self.assertIs(
+            self.repo.get_by_attribute('email', "jane.doe@example.com"),
+            self.user)
+
+    def test_04_index_follows_delete(self):
+        """Test that delete() removes the index entry."""
+        self.repo.delete(self.user.id)
+        self.assertIsNone(
+            self.repo.get_by_attribute('email', "john.doe@example.com"))
+
+    def test_05_get_by_unindexed_attribute(self):
+        """Test that unindexed attributes are still found by scanning."""
+        found = self.repo.get_by_attribute('first_name', "John")
+        self.assertIs(found, self.user)
+
+    def test_06_non_unique_index(self):
+        """Test an index where several objects share the same value."""
+        repo = InMemoryRepository(indexes=('owner_id',))
+        first = Place(title="First", price=10, latitude=0, longitude=0,
+                      owner_id=self.user.id)
+        second = Place(title="Second", price=20, latitude=0, longitude=0,
+                       owner_id=self.user.id)
+        repo.add(first)
+        repo.add(second)
+        self.assertIs(repo.get_by_attribute('owner_id', self.user.id), first)
+        repo.delete(first.id)
+        self.assertIs(repo.get_by_attribute('owner_id', self.user.id), second)
+
+    def test_07_get_all_by_attribute(self):
+        """Test listing every child of a parent through the index."""
+        repo = InMemoryRepository(indexes=('place_id',))
+        first = Review(text="Nice", rating=4, place_id="p1", user_id="u1")
+        second = Review(text="Good", rating=5, place_id="p1", user_id="u2")
+        other = Review(text="Meh", rating=2, place_id="p2", user_id="u1")
+        for review in (first, second, other):
+            repo.add(review)
+        self.assertEqual(repo.get_all_by_attribute('place_id', "p1"),
+                         [first, second])
+        repo.update(second.id, {"place_id": "p2"})
+        self.assertEqual(repo.get_all_by_attribute('place_id', "p1"), [first])
+        self.assertEqual(repo.get_all_by_attribute('place_id', "p3"), [])
+        # Unindexed attributes are answered by a scan
+        self.assertEqual(repo.get_all_by_attribute('user_id', "u1"),
+                         [first, other])
+
+    def test_08_version_bumped_on_update(self):
+        """Test that each update increments the version."""
+        self.assertEqual(self.user.version, 1)
+        self.repo.update(self.user.id, {"first_name": "Jane"})
+        self.assertEqual(self.user.version, 2)
+
+    def test_08b_protected_fields_ignored(self):
+        """Test that an update payload cannot set the id, version or times."""
+        user_id, created_at = self.user.id, self.user.created_at
+        self.repo.update(self.user.id, {"first_name": "Jane", "version": 1,
+                                        "id": "other", "created_at": None,
+                                        "updated_at": None})
+        self.assertEqual((self.user.id, self.user.version), (user_id, 2))
+        self.assertEqual(self.user.created_at, created_at)
+        self.assertIsNotNone(self.user.updated_at)
+        self.repo.update(self.user.id, {"version": "abc"})
+        self.assertEqual(self.user.version, 3)
+
+    def test_09_expected_version(self):
+        """Test that an update against an old version is refused."""
+        self.repo.update(self.user.id, {"first_name": "Jane"},
+                         expected_version=1)
+        with self.assertRaises(VersionConflict) as context:
+            self.repo.update(self.user.id, {"first_name": "Lost"},
+                             expected_version=1)
+        self.assertEqual(context.exception.current_version, 2)
+        self.assertEqual(self.user.first_name, "Jane")
+
+
+class TestUniqueConstraint(unittest.TestCase):
+    """
+    Unit tests for the InMemoryRepository unique constraints.
+
+    === Testing uniqueness ===
+        - test_01_duplicate_add_rejected(self): duplicate key on add
+        - test_02_normalized_duplicate_rejected(self): casefold normalizer
+        - test_03_duplicate_update_rejected(self): duplicate key on update
+        - test_04_key_released_on_delete(self): key reusable after delete
+        - test_05_composite_constraint(self): one review per user/place
+        - test_06_find_unique(self): O(1) probe through the constraint
+    """
+
+    def setUp(self):
+        self.repo = InMemoryRepository(
+            unique=(UniqueConstraint('name', normalize=casefold),))
+        self.wifi = Amenity(name="WiFi")
+        self.repo.add(self.wifi)
+
+    def test_01_duplicate_add_rejected(self):
+        """Test that adding a second object with the same key fails."""
+        with self.assertRaises(DuplicateEntryError) as context:
+            self.repo.add(Amenity(name="WiFi"))
+        self.assertEqual(context.exception.existing_id, self.wifi.id)
+        self.assertEqual(len(self.repo.get_all()), 1)
+
+    def test_02_normalized_duplicate_rejected(self):
+        """Test that the normalizer makes differently cased names collide."""
+        with self.assertRaises(DuplicateEntryError):
+            self.repo.add(Amenity(name="wifi"))
+
+    def test_03_duplicate_update_rejected(self):
+        """Test that an update cannot steal another object's key."""
+        pool = Amenity(name="Pool")
+        self.repo.add(pool)
+        with self.assertRaises(DuplicateEntryError):
+            self.repo.update(pool.id, {"name": "WIFI"})
+        self.assertEqual(pool.name, "Pool")
+        # Renaming an object onto its own key is allowed
+        self.repo.update(self.wifi.id, {"name": "wifi"})
+        self.assertEqual(self.wifi.name, "wifi")
+
+    def test_04_key_released_on_delete(self):
+        """Test that a deleted object's key can be reused."""
+        self.repo.delete(self.wifi.id)
+        self.repo.add(Amenity(name="WiFi"))
+        self.assertEqual(len(self.repo.get_all()), 1)
+
+    def test_05_composite_constraint(self):
+        """Test a constraint spanning two attributes."""
+        repo = InMemoryRepository(
+            unique=(UniqueConstraint('user_id', 'place_id'),))
+        repo.add(Review(text="Nice", rating=4, place_id="p1", user_id="u1"))
+        repo.add(Review(text="Nice", rating=4, place_id="p2", user_id="u1"))
+        with self.assertRaises(DuplicateEntryError):
+            repo.add(Review(text="Again", rating=2,
+                            place_id="p1", user_id="u1"))
+
+    def test_06_find_unique(self):
+        """Test probing a constraint with a non-normalized value."""
+        self.assertIs(self.repo.find_unique('name', " wIfI "), self.wifi)
+        self.assertIsNone(self.repo.find_unique('name', "Pool"))
+
+
+if __name__ == "__main__":
+    unittest.main()
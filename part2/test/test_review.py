@@ -19,6 +19,9 @@ class TestReviewModel(unittest.TestCase):
 
     === Testing to_dict method ===
         - test_07_to_dict_method(self): valid request
+
+    === Testing the memory layout ===
+        - test_08_interned_foreign_keys(self): ids are shared, not copied
     """
 
     def setUp(self):
@@ -112,5 +115,15 @@ class TestReviewModel(unittest.TestCase):
         self.assertIn("updated_at", review_dict)
         
 
+    def test_08_interned_foreign_keys(self):
+        """Test that foreign keys share the string of the referenced id."""
+        # Ids decoded from a request body are new string objects
+        place_id = "".join(list(self.place_id))
+        self.assertIsNot(place_id, self.place_id)
+        review = Review(text="Again!", user_id=self.user_id,
+                        place_id=place_id, rating=4)
+        self.assertIs(review.place_id, self.place_id)
+        self.assertFalse(hasattr(review, '__dict__'))
+
 if __name__ == "__main__":
     unittest.main()
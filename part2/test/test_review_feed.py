@@ -0,0 +1,150 @@
+import unittest
+from app import create_app
+from app.persistence.repository import order_key
+from app.services.facade import HBnBFacade
+
+
+class TestReviewTimeIndex(unittest.TestCase):
+    """
+    Tests for the time-ordered review indexes of the facade.
+
+    === Setup ===
+        - setUp(self): fresh facade, two places and their reviews.
+
+    === Testing the indexes ===
+        - test_01_newest_first(self): every review, newest first, paged
+        - test_02_since_until(self): inclusive bounds, per place
+        - test_03_follows_deletes(self): deleted reviews and places
+    """
+
+    def setUp(self):
+        self.facade = HBnBFacade()
+        owner = self.facade.create_user({
+            "first_name": "Feed", "last_name": "Owner",
+            "email": "feed.owner@example.com"})
+        reviewers = [self.facade.create_user({
+            "first_name": "Feed", "last_name": f"Reviewer{i}",
+            "email": f"feed.reviewer{i}@example.com"}) for i in range(6)]
+        self.places = [self.facade.create_place({
+            "title": f"Feed {i}", "price": 10.0, "latitude": 1.0,
+            "longitude": 1.0, "owner_id": owner.id}) for i in range(2)]
+        self.reviews = {place.id: [] for place in self.places}
+        for i, reviewer in enumerate(reviewers):
+            for place in self.places[:1 + i % 2]:
+                self.reviews[place.id].append(self.facade.create_review({
+                    "text": "Fine", "rating": 4, "user_id": reviewer.id,
+                    "place_id": place.id}))
+
+    def _ids(self, reviews):
+        return [review.id for review in reviews]
+
+    def test_01_newest_first(self):
+        """Test that the global index lists every review newest first."""
+        expected = sorted((r for reviews in self.reviews.values()
+                           for r in reviews), key=order_key, reverse=True)
+        self.assertEqual(
+            self._ids(self.facade.get_reviews_by_time(newest_first=True)),
+            self._ids(expected))
+        page = self.facade.get_reviews_by_time(3, newest_first=True)
+        after = order_key(page[-1])
+        self.assertEqual(self._ids(self.facade.get_reviews_by_time(
+            3, after, newest_first=True)), self._ids(expected[3:6]))
+
+    def test_02_since_until(self):
+        """Test inclusive time bounds on the reviews of one place."""
+        place_id = self.places[0].id
+        reviews = sorted(self.reviews[place_id], key=order_key)
+        since, until = reviews[1].created_at, reviews[4].created_at
+        found = self.facade.get_reviews_by_time(since=since, until=until,
+                                                place_id=place_id)
+        self.assertEqual(self._ids(found), self._ids(
+            r for r in reviews if since <= r.created_at <= until))
+        self.assertEqual(found[0].id, reviews[1].id)
+        self.assertEqual(found[-1].id, reviews[4].id)
+        with self.assertRaises(ValueError):
+            self.facade.get_reviews_by_time(place_id="unknown")
+
+    def test_03_follows_deletes(self):
+        """Test that deleted reviews and places leave the indexes."""
+        first, second = self.places
+        review = self.reviews[first.id][0]
+        self.facade.delete_review(review.id)
+        self.assertNotIn(review.id, self._ids(
+            self.facade.get_reviews_by_time(place_id=first.id)))
+        self.facade.delete_place(second.id)
+        self.assertEqual(self._ids(self.facade.get_reviews_by_time()),
+                         self._ids(sorted(self.reviews[first.id][1:],
+                                          key=order_key)))
+
+
+class TestReviewFeedEndpoints(unittest.TestCase):
+    """
+    Tests for since, until and order on the review listings.
+
+    === Setup ===
+        - setUp(self): test client, an owner, four reviewers, one place.
+
+    === Testing the endpoints ===
+        - test_01_newest_first(self): order=newest, paged with cursors
+        - test_02_place_reviews(self): since/until on a place's reviews
+        - test_03_invalid_parameters(self): 400 on bad input
+    """
+
+    def setUp(self):
+        self.client = create_app().test_client()
+        name = self.id()
+        users = [self.client.post('/api/v1/users/', json={
+            "first_name": "Feed", "last_name": f"User{i}",
+            "email": f"{name}.{i}@example.com"}).json["id"]
+            for i in range(5)]
+        self.place_id = self.client.post('/api/v1/places/', json={
+            "title": "Feed place", "price": 10.0, "latitude": 1.0,
+            "longitude": 1.0, "owner_id": users[0]}).json["id"]
+        self.reviews = [self.client.post('/api/v1/reviews/', json={
+            "text": "Fine", "rating": 3, "user_id": user_id,
+            "place_id": self.place_id}).json for user_id in users[1:]]
+
+    def test_01_newest_first(self):
+        """Test that order=newest starts with the latest reviews."""
+        response = self.client.get('/api/v1/reviews/?order=newest&limit=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["id"] for r in response.json],
+                         [r["id"] for r in self.reviews[:-3:-1]])
+        cursor = response.headers['X-Next-Cursor']
+        second = self.client.get(
+            f'/api/v1/reviews/?order=newest&limit=2&cursor={cursor}').json
+        self.assertEqual([r["id"] for r in second],
+                         [r["id"] for r in self.reviews[1::-1]])
+        since = self.reviews[2]["created_at"]
+        self.assertEqual([r["id"] for r in self.client.get(
+            f'/api/v1/reviews/?since={since}').json],
+            [r["id"] for r in self.reviews[2:]])
+
+    def test_02_place_reviews(self):
+        """Test time bounds on the reviews of a place."""
+        url = f'/api/v1/reviews/places/{self.place_id}/reviews'
+        since = self.reviews[1]["created_at"]
+        until = self.reviews[2]["created_at"]
+        response = self.client.get(f'{url}?since={since}&until={until}'
+                                   '&order=newest')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["id"] for r in response.json],
+                         [self.reviews[2]["id"], self.reviews[1]["id"]])
+        self.assertEqual(len(self.client.get(f'{url}?limit=3').json), 3)
+        self.assertEqual(len(self.client.get(url).json), 4)
+
+    def test_03_invalid_parameters(self):
+        """Test that malformed time parameters return 400."""
+        for url in ('/api/v1/reviews/?order=latest',
+                    '/api/v1/reviews/?since=yesterday',
+                    '/api/v1/reviews/?since=2030-01-02&until=2030-01-01',
+                    '/api/v1/reviews/?order=newest&q=fine',
+                    '/api/v1/reviews/?since=2030-01-01&stream=true',
+                    f'/api/v1/reviews/places/{self.place_id}/reviews'
+                    '?order=up'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
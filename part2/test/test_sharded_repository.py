@@ -0,0 +1,269 @@
+import threading
+import time
+import unittest
+from app.models.user import User
+from app.models.review import Review
+from app.persistence.repository import UniqueConstraint, DuplicateEntryError
+from app.persistence.sharded_repository import (
+    ReadWriteLock, ShardedRepository)
+from app.services.facade import HBnBFacade
+from config import Config
+
+
+class ShardedConfig(Config):
+    REPOSITORY = 'sharded'
+    REPOSITORY_SHARDS = 4
+
+
+class TestShardedRepository(unittest.TestCase):
+    """
+    Unit tests for the lock-striped sharded repository.
+
+    === Setup ===
+        - setUp(self): creates a repository with a unique email constraint.
+
+    === Testing the Repository interface ===
+        - test_01_add_get_update_delete(self): basic operations across shards
+        - test_02_indexed_lookups(self): striped secondary index
+        - test_03_unique_constraint(self): duplicates rejected on add and update
+        - test_04_failed_update_keeps_index(self): index follows the object
+
+    === Testing concurrency ===
+        - test_05_concurrent_duplicate_inserts(self): only one insert wins
+        - test_05b_concurrent_add_and_update(self): one owner per unique key
+        - test_06_consistent_iteration(self): writers wait for the view
+        - test_07_read_write_lock(self): readers share, writers exclude
+        - test_08_facade_backend(self): facade built from config
+        - test_09_concurrent_review_writes(self): ratings counted once
+    """
+
+    def setUp(self):
+        self.repo = ShardedRepository(shards=4, index_stripes=8,
+                                      unique=(UniqueConstraint('email'),))
+
+    def _user(self, i):
+        return User(first_name="User", last_name=str(i),
+                    email=f"user{i}@example.com")
+
+    def test_01_add_get_update_delete(self):
+        """Test the basic operations over users spread across shards."""
+        users = [self._user(i) for i in range(50)]
+        for user in users:
+            self.repo.add(user)
+        self.assertEqual(len(self.repo), 50)
+        self.assertEqual({u.id for u in self.repo.get_all()},
+                         {u.id for u in users})
+        self.assertEqual({u.id for u in self.repo.scan()},
+                         {u.id for u in users})
+        self.assertIs(self.repo.get(users[7].id), users[7])
+
+        updated = self.repo.update(users[7].id, {"first_name": "Jane"})
+        self.assertEqual(updated.first_name, "Jane")
+        self.assertIsNone(self.repo.update("nonexistent", {}))
+
+        self.repo.delete(users[7].id)
+        self.assertIsNone(self.repo.get(users[7].id))
+        self.assertIsNone(self.repo.get_by_attribute(
+            'email', "user7@example.com"))
+        self.assertEqual(len(self.repo), 49)
+
+    def test_02_indexed_lookups(self):
+        """Test lookups through the striped secondary index."""
+        reviews = ShardedRepository(shards=4, indexes=('place_id',))
+        for i in range(10):
+            reviews.add(Review(text="Nice", rating=4, user_id=f"user-{i}",
+                               place_id=f"place-{i % 2}"))
+        self.assertEqual(len(reviews.get_all_by_attribute('place_id',
+                                                          "place-0")), 5)
+        self.assertEqual(reviews.get_by_attribute('user_id', "user-3").rating,
+                         4)
+        self.assertEqual(reviews.get_all_by_attribute('place_id', "none"), [])
+
+    def test_03_unique_constraint(self):
+        """Test that duplicates are rejected on add and update."""
+        first, second = self._user(1), self._user(2)
+        self.repo.add(first)
+        self.repo.add(second)
+        with self.assertRaises(DuplicateEntryError) as context:
+            self.repo.add(User(first_name="Dup", last_name="Dup",
+                               email="user1@example.com"))
+        self.assertEqual(context.exception.existing_id, first.id)
+        with self.assertRaises(DuplicateEntryError):
+            self.repo.update(second.id, {"email": "user1@example.com"})
+        self.assertEqual(second.email, "user2@example.com")
+        self.assertEqual(self.repo.find_unique('email', "user2@example.com").id,
+                         second.id)
+
+    def test_04_failed_update_keeps_index(self):
+        """Test that a rejected update leaves the index matching the object."""
+        user = self._user(1)
+        self.repo.add(user)
+        with self.assertRaises(ValueError):
+            self.repo.update(user.id, {"email": "invalid-email"})
+        self.assertIs(self.repo.get_by_attribute('email', user.email), user)
+
+    def test_05_concurrent_duplicate_inserts(self):
+        """Test that concurrent check-then-insert lets exactly one through."""
+        barrier = threading.Barrier(8)
+        results = []
+
+        def insert():
+            barrier.wait()
+            try:
+                self.repo.add(User(first_name="Race", last_name="Race",
+                                   email="race@example.com"))
+                results.append(True)
+            except DuplicateEntryError:
+                results.append(False)
+
+        threads = [threading.Thread(target=insert) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(len(self.repo), 1)
+
+    def test_05b_concurrent_add_and_update(self):
+        """Test that an add and an update racing for one email keep it unique."""
+        entries = self.repo._entries
+
+        def slow_entries(get_value):
+            # Widen any window between the unique check and the index write
+            time.sleep(0.001)
+            return entries(get_value)
+
+        self.repo._entries = slow_entries
+        for i in range(20):
+            email = f"dup{i}@example.com"
+            user = self._user(1000 + i)
+            self.repo.add(user)
+            barrier = threading.Barrier(2)
+
+            def update():
+                barrier.wait()
+                try:
+                    self.repo.update(user.id, {"email": email})
+                except DuplicateEntryError:
+                    pass
+
+            def add():
+                barrier.wait()
+                try:
+                    self.repo.add(User(first_name="Race", last_name="Race",
+                                       email=email))
+                except DuplicateEntryError:
+                    pass
+
+            threads = [threading.Thread(target=update),
+                       threading.Thread(target=add)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            owners = [u for u in self.repo.get_all() if u.email == email]
+            self.assertEqual(len(owners), 1, email)
+            self.assertIs(self.repo.get_by_attribute('email', email),
+                          owners[0])
+
+    def test_06_consistent_iteration(self):
+        """Test that writers wait until a consistent view is released."""
+        for i in range(10):
+            self.repo.add(self._user(i))
+        writer = threading.Thread(target=self.repo.add,
+                                  args=(self._user(10),))
+        with self.repo.consistent() as objects:
+            writer.start()
+            writer.join(0.1)
+            self.assertTrue(writer.is_alive())
+            self.assertEqual(len(list(objects)), 10)
+        writer.join()
+        self.assertEqual(len(self.repo), 11)
+
+    def test_07_read_write_lock(self):
+        """Test that readers share the lock and a writer excludes them."""
+        lock = ReadWriteLock()
+        lock.acquire_read()
+        reader = threading.Thread(target=lambda: (lock.acquire_read(),
+                                                  lock.release_read()))
+        reader.start()
+        reader.join(1)
+        self.assertFalse(reader.is_alive())
+
+        writer = threading.Thread(target=lambda: (lock.acquire_write(),
+                                                  lock.release_write()))
+        writer.start()
+        writer.join(0.1)
+        self.assertTrue(writer.is_alive())
+        lock.release_read()
+        writer.join(1)
+        self.assertFalse(writer.is_alive())
+
+    def test_08_facade_backend(self):
+        """Test that the facade uses sharded repositories when configured."""
+        facade = HBnBFacade(ShardedConfig)
+        self.assertIsInstance(facade.user_repo, ShardedRepository)
+        user = facade.create_user({"first_name": "Jane", "last_name": "Doe",
+                                   "email": "jane.doe@example.com"})
+        with self.assertRaises(ValueError):
+            facade.create_user({"first_name": "Jane", "last_name": "Doe",
+                                "email": "jane.doe@example.com"})
+        self.assertEqual(facade.get_user_by_email("jane.doe@example.com").id,
+                         user.id)
+
+    def test_09_concurrent_review_writes(self):
+        """Test that racing review updates and deletes keep ratings exact."""
+        facade = HBnBFacade(ShardedConfig)
+        owner, guest = (facade.create_user({
+            "first_name": name, "last_name": "Race",
+            "email": f"{name.lower()}.race@example.com"})
+            for name in ("Owner", "Guest"))
+        place = facade.create_place({
+            "title": "Race", "price": 10.0, "latitude": 1.0,
+            "longitude": 1.0, "owner_id": owner.id})
+        review = facade.create_review({
+            "text": "Racing", "rating": 1, "user_id": guest.id,
+            "place_id": place.id})
+        get = facade.review_repo.get
+
+        def slow_get(review_id):
+            # Widen any window between the read and the write
+            found = get(review_id)
+            time.sleep(0.001)
+            return found
+
+        facade.review_repo.get = slow_get
+
+        def race(*calls):
+            barrier = threading.Barrier(len(calls))
+
+            def run(call):
+                barrier.wait()
+                try:
+                    call()
+                except ValueError:
+                    pass
+
+            threads = [threading.Thread(target=run, args=(call,))
+                       for call in calls]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        race(*(lambda r=rating: facade.update_review(
+            review.id, {"text": "Raced", "rating": r})
+            for rating in range(2, 6)))
+        rating = facade.get_place_rating(place.id)
+        self.assertEqual((rating['count'], rating['average']),
+                         (1, get(review.id).rating))
+        self.assertEqual(sum(rating['histogram'].values()), 1)
+        race(*[lambda: facade.delete_review(review.id)] * 4)
+        rating = facade.get_place_rating(place.id)
+        self.assertEqual((rating['count'], sum(rating['histogram'].values())),
+                         (0, 0))
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import multiprocessing
+import os
+import random
+import unittest
+from config import Config
+from app.persistence.column_store import COLUMNS_AVAILABLE, PlaceColumns
+from app.services.column_loader import place_rows
+from app.services.facade import HBnBFacade
+
+if COLUMNS_AVAILABLE:
+    from app.persistence.shared_columns import (
+        SharedColumnPublisher, SharedPlaceColumns)
+
+
+def _filter_in_worker(name, kwargs):
+    """Attach from a new process and run one filter."""
+    columns = SharedPlaceColumns(name)
+    try:
+        count, ids = columns.filter(**kwargs)
+        return columns.version, count, sorted(ids)
+    finally:
+        columns.close()
+
+
+def _rows(rng, count):
+    return [(f"p{i:04}", float(rng.randint(10, 500)),
+             rng.uniform(-60, 60), rng.uniform(-180, 180),
+             f"owner{rng.randrange(30)}", 1, round(rng.uniform(1, 5), 2))
+            for i in range(count)]
+
+
+@unittest.skipUnless(COLUMNS_AVAILABLE, "NumPy is not installed")
+class TestSharedColumns(unittest.TestCase):
+    """
+    Unit tests for the place columns shared through shared memory.
+
+    === Setup ===
+        - setUp(self): a publisher and a reader of 2000 random places.
+
+    === Testing the snapshots ===
+        - test_01_matches_place_columns(self): same places as PlaceColumns
+        - test_02_versioned_swap(self): readers follow new versions
+        - test_03_other_process(self): a spawned process attaches
+    """
+
+    def setUp(self):
+        self.name = f"hbnb_test_{os.getpid()}_{self._testMethodName[5:7]}"
+        self.rows = _rows(random.Random(23), 2000)
+        self.publisher = SharedColumnPublisher(self.name)
+        self.addCleanup(self.publisher.close)
+        self.reader = SharedPlaceColumns(self.name)
+        self.addCleanup(self.reader.close)
+
+    def test_01_matches_place_columns(self):
+        """Test the snapshot filter against PlaceColumns."""
+        self.assertIsNone(self.reader.filter())
+        self.publisher.publish(self.rows)
+        columns = PlaceColumns()
+        for place_id, price, lat, lon, owner_id, count, rating in self.rows:
+            columns.add(place_id, price, lat, lon, owner_id)
+            columns.set_rating(place_id, count, rating)
+        for kwargs in ({}, {'min_price': 100.0, 'max_price': 150.0},
+                       {'box': (-60.0, 170.0, 60.0, -170.0)},
+                       {'min_rating': 4.0, 'max_price': 300.0},
+                       {'owner_id': "owner3", 'min_rating': 2.5},
+                       {'owner_id': "nobody"}, {'min_price': 600.0},
+                       {'min_price': 13.0, 'max_price': 13.0}):
+            with self.subTest(**kwargs):
+                count, ids = columns.filter(**kwargs)
+                found = self.reader.filter(**kwargs)
+                self.assertEqual((found[0], set(found[1])), (count, set(ids)))
+                count, ids = self.reader.filter(limit=5, **kwargs)
+                self.assertEqual(len(ids), min(5, count))
+                self.assertLessEqual(set(ids), set(found[1]))
+
+    def test_02_versioned_swap(self):
+        """Test that readers switch to new snapshots, old ones stay valid."""
+        self.publisher.publish(self.rows)
+        old = self.reader.snapshot()
+        self.assertEqual(old.filter()[0], 2000)
+        for size in (10, 20, 30, 40):
+            version = self.publisher.publish(self.rows[:size])
+        self.assertEqual(self.reader.filter()[0], 40)
+        self.assertEqual(self.reader.version, version)
+        # Unlinked by now, still mapped while in use
+        self.assertEqual(old.filter(max_price=100.0)[0], sum(
+            1 for row in self.rows if row[1] <= 100.0))
+        self.assertEqual(len(self.reader._retired), 1)
+        del old
+        self.publisher.publish([])
+        self.assertEqual(self.reader.filter(), (0, []))
+        self.assertEqual(self.reader._retired, [])
+
+    def test_03_other_process(self):
+        """Test that a process started afterwards reads the snapshot."""
+        self.publisher.publish(self.rows)
+        kwargs = {'min_price': 50.0, 'max_price': 200.0, 'min_rating': 3.0}
+        count, ids = self.reader.filter(**kwargs)
+        with multiprocessing.get_context('spawn').Pool(1) as pool:
+            found = pool.apply(_filter_in_worker, (self.name, kwargs))
+        self.assertEqual(found, (1, count, sorted(ids)))
+
+
+@unittest.skipUnless(COLUMNS_AVAILABLE, "NumPy is not installed")
+class TestSharedPlaceFilter(unittest.TestCase):
+    """
+    Tests for a facade reading shared columns.
+
+    === Setup ===
+        - setUp(self): a facade with 50 places, a shared columns facade.
+
+    === Testing the facade ===
+        - test_01_published_places(self): filters the loader's snapshot
+    """
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.facade = HBnBFacade()
+        owner = self.facade.create_user({
+            "first_name": "Shared", "last_name": "Owner",
+            "email": "shared.owner@example.com"})
+        reviewer = self.facade.create_user({
+            "first_name": "Shared", "last_name": "Reviewer",
+            "email": "shared.reviewer@example.com"})
+        for i in range(50):
+            place = self.facade.create_place({
+                "title": f"Shared {i}", "price": float(rng.randint(10, 300)),
+                "latitude": rng.uniform(40, 50),
+                "longitude": rng.uniform(-5, 10), "owner_id": owner.id})
+            if i % 3 == 0:
+                self.facade.create_review({
+                    "text": "Fine", "rating": rng.randint(1, 5),
+                    "user_id": reviewer.id, "place_id": place.id})
+        name = f"hbnb_test_{os.getpid()}_facade"
+
+        class SharedConfig(Config):
+            SHARED_COLUMNS = name
+
+        self.publisher = SharedColumnPublisher(name)
+        self.addCleanup(self.publisher.close)
+        # The worker shares the repositories of the loader's facade
+        self.worker = HBnBFacade(SharedConfig)
+        self.addCleanup(self.worker.shared_columns.close)
+        self.worker.place_repo = self.facade.place_repo
+
+    def test_01_published_places(self):
+        """Test that shared and local columns return the same places."""
+        self.assertIsNone(self.worker.place_columns)
+        queries = ({'min_price': 50.0, 'max_price': 120.0},
+                   {'box': (42.0, 0.0, 47.0, 5.0), 'min_rating': 3.0},
+                   {'max_price': 200.0, 'limit': 4},
+                   {'min_price': 50.0, 'max_price': 60.0, 'limit': 100})
+        self.publisher.publish(place_rows(self.facade.place_repo,
+                                          self.facade.review_repo))
+        for kwargs in queries:
+            with self.subTest(**kwargs):
+                count, places = self.facade.filter_places(**kwargs)
+                found, shared = self.worker.filter_places(**kwargs)
+                self.assertEqual(found, count)
+                self.assertEqual(len(shared), len(places))
+                # Limited queries keep a subset of the matching places
+                matching = self.facade.filter_places(
+                    **dict(kwargs, limit=None))[1]
+                shared_ids = {p.id for p in shared}
+                self.assertLessEqual(shared_ids, {p.id for p in matching})
+                if len(matching) <= kwargs.get('limit', len(matching)):
+                    self.assertEqual(shared_ids, {p.id for p in places})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from app.models.user import User
+from app.models.place import Place
+from app.models.amenity import Amenity
+from app.persistence.repository import (
+    UniqueConstraint, DuplicateEntryError, VersionConflict, casefold)
+from app.persistence.sqlite_repository import (
+    SQLiteConnectionPool, SQLiteRepository)
+from app.persistence.schema import from_record, to_record
+from app.services.facade import HBnBFacade
+from config import Config
+
+
+class SQLiteConfig(Config):
+    REPOSITORY = 'sqlite'
+
+
+class TestSQLiteRepository(unittest.TestCase):
+    """
+    Unit tests for the SQLite-backed repository.
+
+    === Setup ===
+        - setUp(self): opens a repository on a temporary database file.
+
+    === Testing the Repository interface ===
+        - test_01_add_and_get(self): round trip of every stored attribute
+        - test_02_update(self): update through the repository
+        - test_03_delete(self): delete through the repository
+        - test_04_get_by_attribute(self): indexed lookups
+        - test_05_unique_constraint(self): duplicate email rejected
+        - test_06_normalized_unique_constraint(self): casefold normalizer
+        - test_07_persistence_across_pools(self): data survives a reopen
+        - test_08_connection_per_thread(self): one connection per thread
+        - test_09_facade_backend(self): facade built from config
+        - test_10_version_check(self): stored version and conflicts
+        - test_11_load_without_new_ids(self): rows keep their id, mint none
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'hbnb.sqlite3')
+        self.pool = SQLiteConnectionPool(self.path)
+        self.repo = SQLiteRepository(User, self.pool,
+                                     unique=(UniqueConstraint('email'),))
+        self.user = User(first_name="John", last_name="Doe",
+                         email="john.doe@example.com")
+        self.repo.add(self.user)
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_01_add_and_get(self):
+        """Test that a stored user comes back with the same attributes."""
+        user = self.repo.get(self.user.id)
+        self.assertEqual(user.to_dict(), self.user.to_dict())
+        self.assertIsNone(self.repo.get("nonexistent"))
+
+    def test_02_update(self):
+        """Test that update() validates and persists the new values."""
+        updated = self.repo.update(self.user.id, {"first_name": "Jane"})
+        self.assertEqual(updated.first_name, "Jane")
+        self.assertEqual(self.repo.get(self.user.id).first_name, "Jane")
+        with self.assertRaises(ValueError):
+            self.repo.update(self.user.id, {"email": "invalid-email"})
+        self.assertEqual(self.repo.get(self.user.id).email,
+                         "john.doe@example.com")
+
+    def test_03_delete(self):
+        """Test that delete() removes the row."""
+        self.repo.delete(self.user.id)
+        self.assertIsNone(self.repo.get(self.user.id))
+        self.assertEqual(self.repo.get_all(), [])
+
+    def test_04_get_by_attribute(self):
+        """Test attribute lookups on an indexed column."""
+        places = SQLiteRepository(Place, self.pool, indexes=('owner_id',))
+        first = Place(title="First", price=10, latitude=0, longitude=0,
+                      owner_id=self.user.id, description="A description")
+        second = Place(title="Second", price=20, latitude=1, longitude=1,
+                       owner_id=self.user.id)
+        places.add(first)
+        places.add(second)
+        self.assertEqual(places.get_by_attribute('owner_id', self.user.id).id,
+                         first.id)
+        self.assertEqual(
+            [p.id for p in places.get_all_by_attribute('owner_id',
+                                                       self.user.id)],
+            [first.id, second.id])
+        self.assertEqual(places.get(first.id).description, "A description")
+        with self.assertRaises(ValueError):
+            places.get_by_attribute('owner_id; DROP TABLE places', "x")
+
+    def test_05_unique_constraint(self):
+        """Test that the unique index rejects a duplicate email."""
+        with self.assertRaises(DuplicateEntryError) as context:
+            self.repo.add(User(first_name="Jane", last_name="Doe",
+                               email="john.doe@example.com"))
+        self.assertEqual(context.exception.existing_id, self.user.id)
+        self.assertEqual(len(self.repo.get_all()), 1)
+
+    def test_06_normalized_unique_constraint(self):
+        """Test a casefold constraint backed by a hidden key column."""
+        amenities = SQLiteRepository(
+            Amenity, self.pool,
+            unique=(UniqueConstraint('name', normalize=casefold),))
+        wifi = Amenity(name="WiFi")
+        amenities.add(wifi)
+        with self.assertRaises(DuplicateEntryError):
+            amenities.add(Amenity(name="wifi"))
+        self.assertEqual(amenities.find_unique('name', "WIFI").id, wifi.id)
+
+    def test_07_persistence_across_pools(self):
+        """Test that data is still there after reopening the database."""
+        self.pool.close()
+        self.pool = SQLiteConnectionPool(self.path)
+        repo = SQLiteRepository(User, self.pool,
+                                unique=(UniqueConstraint('email'),))
+        self.assertEqual(repo.get(self.user.id).email, self.user.email)
+
+    def test_08_connection_per_thread(self):
+        """Test that each thread gets its own connection."""
+        connections = []
+        thread = threading.Thread(
+            target=lambda: connections.append(self.pool.connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(connections[0], self.pool.connection())
+        self.assertIs(self.pool.connection(), self.pool.connection())
+        mode = self.pool.connection().execute(
+            'PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def test_09_facade_backend(self):
+        """Test that the facade uses SQLite when configured to."""
+        SQLiteConfig.DATABASE_PATH = os.path.join(self.tmpdir, 'facade.db')
+        facade = HBnBFacade(SQLiteConfig)
+        user = facade.create_user({"first_name": "Jane", "last_name": "Doe",
+                                   "email": "jane.doe@example.com"})
+        place = facade.create_place({
+            "title": "Flat", "price": 80.0, "latitude": 1.0,
+            "longitude": 2.0, "owner_id": user.id})
+        wifi = facade.create_amenity({"name": "WiFi"})
+        facade.add_amenities_to_place(place.id, [wifi.id])
+        with self.assertRaises(ValueError):
+            facade.create_user({"first_name": "Jane", "last_name": "Doe",
+                                "email": "jane.doe@example.com"})
+
+        reopened = HBnBFacade(SQLiteConfig)
+        self.assertEqual(reopened.get_user(user.id).email,
+                         "jane.doe@example.com")
+        self.assertEqual([a.id for a in reopened.get_place(place.id).amenities],
+                         [wifi.id])
+        reopened.close()
+        facade.close()
+
+    def test_10_version_check(self):
+        """Test that versions are stored and checked in the transaction."""
+        self.repo.update(self.user.id, {"first_name": "Jane"},
+                         expected_version=1)
+        self.assertEqual(self.repo.get(self.user.id).version, 2)
+        with self.assertRaises(VersionConflict):
+            self.repo.update(self.user.id, {"first_name": "Lost"},
+                             expected_version=1)
+        self.assertEqual(self.repo.get(self.user.id).first_name, "Jane")
+
+    def test_11_load_without_new_ids(self):
+        """Test that loading rows does not generate and discard ids."""
+        place = Place(title="Loaded", price=10.0, latitude=1.0,
+                      longitude=2.0, owner_id=self.user.id)
+        places = SQLiteRepository(Place, self.pool)
+        places.add(place)
+        with mock.patch('app.models.basemodel.new_id') as new_id:
+            user = self.repo.get(self.user.id)
+            loaded = places.get(place.id)
+        new_id.assert_not_called()
+        self.assertEqual(user.to_dict(), self.user.to_dict())
+        self.assertEqual((loaded.id, loaded.created_at, loaded.version),
+                         (place.id, place.created_at, 1))
+        self.assertEqual(loaded.amenities, [])
+        with self.assertRaises(ValueError):
+            from_record(Place, dict(to_record(place), price=-1.0))
+
+
+
+if __name__ == "__main__":
+    unittest.main()
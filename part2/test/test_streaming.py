@@ -0,0 +1,70 @@
+import json
+import unittest
+from app import create_app
+from app.api.v1.streaming import iter_pages, json_array
+from app.models.amenity import Amenity
+from app.persistence.repository import InMemoryRepository
+
+
+class TestStreaming(unittest.TestCase):
+    """
+    Tests for the streamed list responses.
+
+    === Setup ===
+        - setUpClass(cls): creates the app and a few users.
+
+    === Testing the generators ===
+        - test_01_one_chunk_per_page(self): the body is built page by page
+        - test_02_empty_collection(self): an empty array is still valid JSON
+
+    === Testing the endpoints ===
+        - test_03_stream_matches_list(self): same content as the plain list
+        - test_04_stream_with_limit_rejected(self): stream excludes paging
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app()
+        cls.client = cls.app.test_client()
+        for i in range(3):
+            cls.client.post('/api/v1/users/', json={
+                "first_name": "Stream", "last_name": str(i),
+                "email": f"stream{i}@example.com"})
+
+    def test_01_one_chunk_per_page(self):
+        """Test that entities are encoded a page at a time."""
+        repo = InMemoryRepository()
+        for i in range(7):
+            repo.add(Amenity(name=f"Amenity {i}"))
+        pages = list(iter_pages(repo.page, batch_size=3))
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        chunks = list(json_array(iter(pages), lambda a: a.name))
+        self.assertEqual(len(chunks), 5)
+        self.assertEqual(json.loads(''.join(chunks)),
+                         [a.name for a in repo.page(10)])
+
+    def test_02_empty_collection(self):
+        """Test that an empty repository streams an empty array."""
+        body = ''.join(json_array(iter_pages(InMemoryRepository().page),
+                                  lambda a: a))
+        self.assertEqual(json.loads(body), [])
+
+    def test_03_stream_matches_list(self):
+        """Test that the streamed body lists the same users."""
+        response = self.client.get('/api/v1/users/?stream=true')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.mimetype, 'application/json')
+        streamed = json.loads(response.get_data(as_text=True))
+        listed = self.client.get('/api/v1/users/').json
+        self.assertEqual(sorted(u["id"] for u in streamed),
+                         sorted(u["id"] for u in listed))
+
+    def test_04_stream_with_limit_rejected(self):
+        """Test that stream cannot be combined with pagination."""
+        response = self.client.get('/api/v1/places/?stream=true&limit=2')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
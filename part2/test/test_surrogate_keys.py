@@ -0,0 +1,119 @@
+import unittest
+from app.persistence.bitset_index import BitsetIndex
+from app.persistence.column_store import COLUMNS_AVAILABLE, PlaceColumns
+from app.persistence.surrogate_keys import SurrogateKeys
+from app.services.facade import HBnBFacade
+
+
+class TestSurrogateKeys(unittest.TestCase):
+    """
+    Tests for the dense integer keys of the places.
+
+    === Setup ===
+        - setUp(self): fresh facade, an owner and three places.
+
+    === Testing SurrogateKeys ===
+        - test_01_dense_keys(self): keys count up, ids map back
+        - test_02_shared_by_indexes(self): one key space per facade
+        - test_03_compaction(self): mostly discarded keys are renumbered
+        - test_04_facade_compaction(self): deleted places free their keys
+    """
+
+    def setUp(self):
+        self.facade = HBnBFacade()
+        owner = self.facade.create_user({
+            "first_name": "Keys", "last_name": "Owner",
+            "email": "keys.owner@example.com"})
+        self.places = [self.facade.create_place({
+            "title": f"Keys {i}", "price": 10.0 + i, "latitude": 1.0,
+            "longitude": 1.0, "owner_id": owner.id}) for i in range(3)]
+
+    def test_01_dense_keys(self):
+        """Test that keys follow first sight and are never reused."""
+        keys = SurrogateKeys()
+        self.assertEqual([keys.key(i) for i in ("a", "b", "a", "c")],
+                         [0, 1, 0, 2])
+        self.assertEqual((len(keys), keys.get("b"), keys.get("d")),
+                         (3, 1, None))
+        self.assertEqual(keys.ids([2, 0]), ["c", "a"])
+        self.assertEqual(keys.id(1), "b")
+
+    def test_02_shared_by_indexes(self):
+        """Test that the bitsets and the columns use the facade's keys."""
+        keys = self.facade.place_keys
+        self.assertEqual([keys.get(place.id) for place in self.places],
+                         [0, 1, 2])
+        self.assertIs(self.facade.place_amenity_bits._keys, keys)
+        if self.facade.place_columns is not None:
+            self.assertIs(self.facade.place_columns._keys, keys)
+        self.facade.delete_place(self.places[1].id)
+        self.assertEqual(keys.get(self.places[1].id), 1)
+        self.assertEqual(len(self.facade.place_amenity_bits), 2)
+        self.assertEqual(self.facade.filter_places()[0], 2)
+        self.assertEqual(
+            [place.id for place in self.facade.get_places_with_amenities([])],
+            [self.places[0].id, self.places[2].id])
+
+    def test_03_compaction(self):
+        """Test that compaction keeps the order and remaps the indexes."""
+        keys = SurrogateKeys(compact_min=4)
+        bits = BitsetIndex(keys)
+        columns = PlaceColumns(capacity=16, keys=keys) \
+            if COLUMNS_AVAILABLE else None
+        ids = [f"p{i}" for i in range(10)]
+        for i, place_id in enumerate(ids):
+            bits.add_place(place_id)
+            if i % 2:
+                bits.link(place_id, "odd")
+            if columns is not None:
+                columns.add(place_id, float(i), 0.0, 0.0, "owner")
+        removed = ["p0", "p1", "p2", "p4", "p5"]
+        for place_id in removed:
+            bits.discard_place(place_id)
+            if columns is not None:
+                columns.discard(place_id)
+            keys.discard(place_id)
+        # Not yet: 5 discarded out of 10
+        self.assertEqual((len(keys), keys.get("p0")), (10, 0))
+        bits.discard_place("p6")
+        if columns is not None:
+            columns.discard("p6")
+        keys.discard("p6")
+        live = ["p3", "p7", "p8", "p9"]
+        self.assertEqual([keys.get(i) for i in live], [0, 1, 2, 3])
+        self.assertEqual((len(keys), keys.get("p0")), (4, None))
+        self.assertEqual(bits.match([]), live)
+        self.assertEqual(bits.match(["odd"]), ["p3", "p7", "p9"])
+        self.assertEqual(bits.match([], after="p5"), ["p7", "p8", "p9"])
+        self.assertEqual(bits.match([], after="p1"), live)
+        if columns is not None:
+            self.assertEqual(columns.filter(), (4, live))
+            self.assertEqual(columns.filter(min_price=8.0), (2, ["p8", "p9"]))
+            self.assertEqual(columns._size, 4)
+        bits.add_place("new")
+        self.assertEqual(keys.get("new"), 4)
+        self.assertEqual(bits.match([], after="p9"), ["new"])
+
+    def test_04_facade_compaction(self):
+        """Test that create/delete churn does not grow the place keys."""
+        keys = self.facade.place_keys
+        keys._compact_min = 2
+        owner_id = self.places[0].owner_id
+        for i in range(50):
+            place = self.facade.create_place({
+                "title": f"Churn {i}", "price": 5.0, "latitude": 1.0,
+                "longitude": 1.0, "owner_id": owner_id})
+            self.facade.delete_place(place.id)
+        self.assertLessEqual(len(keys), 2 * len(self.places))
+        self.assertEqual([keys.get(place.id) for place in self.places],
+                         [0, 1, 2])
+        self.assertEqual(
+            [p.id for p in self.facade.get_places_with_amenities([])],
+            [place.id for place in self.places])
+        self.assertEqual(self.facade.filter_places()[0], 3)
+        if self.facade.place_columns is not None:
+            self.assertLessEqual(self.facade.place_columns._size, len(keys))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import math
+import random
+import unittest
+from app import create_app
+from app.persistence.text_index import TextIndex, tokenize
+
+
+class TestTextIndex(unittest.TestCase):
+    """
+    Unit tests for the BM25 inverted index.
+
+    === Setup ===
+        - setUp(self): 300 random documents over a small vocabulary.
+
+    === Testing TextIndex ===
+        - test_01_tokenize(self): case and accents are folded
+        - test_02_scores_match_bm25(self): same scores as a full scan
+        - test_03_ranking(self): rarer and denser terms rank first
+        - test_04_replace_and_discard(self): postings follow changes
+        - test_05_pages(self): `after` resumes a ranking
+    """
+
+    VOCABULARY = ["quiet", "beach", "flat", "garden", "view", "loft",
+                  "centre", "cosy", "parking", "sea"]
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.index = TextIndex()
+        self.documents = {}
+        for i in range(300):
+            text = " ".join(rng.choice(self.VOCABULARY)
+                            for _ in range(rng.randint(1, 12)))
+            self.documents[f"d{i:03}"] = text
+            self.index.add(f"d{i:03}", text)
+
+    def _bm25(self, query, k1=1.2, b=0.75):
+        """Scores computed from scratch over every document."""
+        docs = {doc_id: tokenize(text)
+                for doc_id, text in self.documents.items()}
+        average = sum(map(len, docs.values())) / len(docs)
+        scores = {}
+        for term in set(tokenize(query)):
+            matching = [d for d, terms in docs.items() if term in terms]
+            idf = math.log(1 + (len(docs) - len(matching) + 0.5)
+                           / (len(matching) + 0.5))
+            for doc_id in matching:
+                tf = docs[doc_id].count(term)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * (
+                    tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(docs[doc_id])
+                                                / average)))
+        return scores
+
+    def test_01_tokenize(self):
+        """Test that tokens are lower-cased words without accents."""
+        self.assertEqual(tokenize("Café, CRÈME-brûlée & 2 rooms!"),
+                         ["cafe", "creme", "brulee", "2", "rooms"])
+        self.assertEqual(tokenize(None), [])
+
+    def test_02_scores_match_bm25(self):
+        """Test scores against a brute-force BM25 computation."""
+        for query in ("beach", "quiet garden", "SEA view sea", "unknown"):
+            with self.subTest(query=query):
+                expected = self._bm25(query)
+                found = self.index.search(query)
+                self.assertEqual({d for _, d in found}, set(expected))
+                for score, doc_id in found:
+                    self.assertAlmostEqual(score, expected[doc_id])
+                self.assertEqual(found, sorted(found, reverse=True))
+
+    def test_03_ranking(self):
+        """Test that a short document full of a rare term ranks first."""
+        self.index.add("best", "zebra zebra loft")
+        self.index.add("other", "zebra " + " ".join(self.VOCABULARY))
+        self.assertEqual([d for _, d in self.index.search("zebra")],
+                         ["best", "other"])
+        self.assertEqual(self.index.search("zebra", limit=1)[0][1], "best")
+
+    def test_04_replace_and_discard(self):
+        """Test that replacing or discarding a document updates postings."""
+        self.index.add("d000", "penthouse")
+        self.documents["d000"] = "penthouse"
+        self.index.discard("d001")
+        self.index.discard("unknown")
+        del self.documents["d001"]
+        self.assertEqual([d for _, d in self.index.search("penthouse")],
+                         ["d000"])
+        found = self.index.search("beach")
+        self.assertNotIn("d000", [d for _, d in found])
+        self.assertEqual(len(self.index), 299)
+        for score, doc_id in found:
+            self.assertAlmostEqual(score, self._bm25("beach")[doc_id])
+
+    def test_05_pages(self):
+        """Test that pages resumed with `after` cover the ranking."""
+        found, after = [], None
+        while True:
+            page = self.index.search("cosy parking", limit=9, after=after)
+            if not page:
+                break
+            found += page
+            after = page[-1]
+        self.assertEqual(found, self.index.search("cosy parking"))
+
+
+class TestTextSearchEndpoints(unittest.TestCase):
+    """
+    Tests for the q parameter of the places and reviews lists.
+
+    === Setup ===
+        - setUp(self): test client, an owner, a reviewer and two places.
+
+    === Testing the endpoints ===
+        - test_01_search_places(self): ranked matches, updates, pages
+        - test_02_search_reviews(self): reviews follow updates and deletes
+        - test_03_invalid_parameters(self): 400 on bad input
+    """
+
+    def setUp(self):
+        self.client = create_app().test_client()
+        name = self.id()
+        self.owner_id = self.client.post('/api/v1/users/', json={
+            "first_name": "Text", "last_name": "Owner",
+            "email": f"{name}.owner@example.com"}).json["id"]
+        self.reviewer_id = self.client.post('/api/v1/users/', json={
+            "first_name": "Text", "last_name": "Reviewer",
+            "email": f"{name}.reviewer@example.com"}).json["id"]
+        self.place_ids = [self.client.post('/api/v1/places/', json={
+            "title": title, "description": description, "price": 10.0,
+            "latitude": 1.0, "longitude": 1.0,
+            "owner_id": self.owner_id}).json["id"]
+            for title, description in (
+                ("Quokka loft", "Bright loft near the quokka park"),
+                ("Wombat house", "Garden, and a quokka mural"))]
+
+    def test_01_search_places(self):
+        """Test that places are ranked and follow updates."""
+        response = self.client.get('/api/v1/places/?q=Quokka')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p["id"] for p in response.json], self.place_ids)
+        self.assertGreater(response.json[0]["score"],
+                           response.json[1]["score"])
+
+        self.client.put(f'/api/v1/places/{self.place_ids[1]}',
+                        json={"description": "Garden"})
+        self.assertEqual([p["id"] for p in self.client.get(
+            '/api/v1/places/?q=quokka').json], self.place_ids[:1])
+
+        response = self.client.get('/api/v1/places/?q=loft+wombat&limit=1')
+        self.assertEqual(len(response.json), 1)
+        cursor = response.headers['X-Next-Cursor']
+        second = self.client.get(
+            f'/api/v1/places/?q=loft+wombat&limit=1&cursor={cursor}').json
+        self.assertEqual({response.json[0]["id"], second[0]["id"]},
+                         set(self.place_ids))
+
+    def test_02_search_reviews(self):
+        """Test that review search follows updates and deletes."""
+        review_id = self.client.post('/api/v1/reviews/', json={
+            "text": "The axolotl pond was lovely", "rating": 5,
+            "user_id": self.reviewer_id,
+            "place_id": self.place_ids[0]}).json["id"]
+        self.assertEqual([r["id"] for r in self.client.get(
+            '/api/v1/reviews/?q=axolotl').json], [review_id])
+        self.client.put(f'/api/v1/reviews/{review_id}',
+                        json={"text": "The capybara pond was lovely"})
+        self.assertEqual(self.client.get('/api/v1/reviews/?q=axolotl').json,
+                         [])
+        self.client.delete(f'/api/v1/reviews/{review_id}')
+        self.assertEqual(self.client.get('/api/v1/reviews/?q=capybara').json,
+                         [])
+
+    def test_03_invalid_parameters(self):
+        """Test that malformed search parameters return 400."""
+        for url in ('/api/v1/places/?q=', '/api/v1/places/?q=!!',
+                    '/api/v1/places/?q=loft&sort=price',
+                    '/api/v1/places/?q=loft&stream=true',
+                    '/api/v1/reviews/?q=loft&stream=true',
+                    '/api/v1/reviews/?q=loft&cursor=abc'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()